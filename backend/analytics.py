@@ -0,0 +1,163 @@
+from collections import Counter
+from sqlalchemy import func, distinct, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models import DashboardCounter, Employee, Certification, Skill, Project, ProjectRole, RoleDeveloper
+
+# Agregados del dashboard en la tabla DashboardCounter (scope, metric, key) -> value.
+# Cada escritura en auth/profile/skills/certifications/projects/staffing suma sus
+# deltas en la misma transacción, así leer el dashboard es un solo SELECT por índice.
+# rebuild_dashboard() los recalcula desde cero (primera vez o para corregir) desde
+# POST /dashboard/rebuild o `python jobs.py dashboard-rebuild`; leer nunca escribe: sin
+# construir, el dashboard se calcula al vuelo con las mismas consultas.
+
+ORG = 0
+EMPLOYEE_METRICS = {
+    "employees_by_role": "role",
+    "employees_by_capability": "capability",
+    "employees_by_location": "location",
+}
+# Marca de que la tabla ya se construyó por completo
+_BUILT = (ORG, "_meta", "built")
+_built = False
+
+
+def _key(value) -> str:
+    if value is None:
+        return ""
+    return str(value.value if hasattr(value, "value") else value)
+
+
+def employee_deltas(values: dict, sign: int = 1) -> Counter:
+    """Deltas de las métricas de empleados para un empleado con `values` (alta: +1, baja: -1)."""
+    return Counter({(ORG, metric, _key(values[field])): sign for metric, field in EMPLOYEE_METRICS.items()})
+
+
+def certification_deltas(employee_id: int, type: str, sign: int = 1) -> Counter:
+    return Counter({
+        (ORG, "certifications_by_type", type): sign,
+        (employee_id, "certifications_by_type", type): sign,
+    })
+
+
+def skill_deltas(type, sign: int = 1) -> Counter:
+    return Counter({(ORG, "skills_by_type", _key(type)): sign})
+
+
+def project_deltas(client: str | None, employees_req: int | None, staffed: int, sign: int = 1) -> Counter:
+    required = employees_req or 0
+    return Counter({
+        (ORG, "projects_by_client", _key(client)): sign,
+        (ORG, "staffing", "required"): sign * required,
+        (ORG, "staffing", "filled"): sign * min(staffed, required),
+    })
+
+
+def staffing_deltas(filled: int) -> Counter:
+    return Counter({(ORG, "staffing", "filled"): filled})
+
+
+def project_staffed(db: Session, project_id: int) -> int:
+    return (
+        db.query(func.count(distinct(RoleDeveloper.developer_id)))
+        .join(ProjectRole, ProjectRole.role_id == RoleDeveloper.project_role_id)
+        .filter(ProjectRole.project_id == project_id)
+        .scalar()
+    )
+
+
+def _upsert(db: Session, rows: list[dict], replace: bool = False):
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(DashboardCounter).values(rows)
+    value = statement.excluded.value if replace else DashboardCounter.value + statement.excluded.value
+    db.execute(statement.on_conflict_do_update(index_elements=["scope", "metric", "key"], set_={"value": value}))
+
+
+def apply_deltas(db: Session, deltas: Counter):
+    """Suma `deltas` a los contadores en un solo INSERT ... ON CONFLICT; no hace commit."""
+    rows = [
+        {"scope": scope, "metric": metric, "key": key, "value": delta}
+        for (scope, metric, key), delta in deltas.items()
+        if delta
+    ]
+    if rows:
+        _upsert(db, rows)
+
+
+def _count(db: Session) -> Counter:
+    counts: Counter = Counter()
+    for metric, field in EMPLOYEE_METRICS.items():
+        column = getattr(Employee, field)
+        for value, count in db.query(column, func.count()).group_by(column):
+            counts[(ORG, metric, _key(value))] = count
+    for employee_id, type, count in db.query(Certification.employee_id, Certification.type, func.count()).group_by(Certification.employee_id, Certification.type):
+        counts[(ORG, "certifications_by_type", type)] += count
+        counts[(employee_id, "certifications_by_type", type)] = count
+    for type, count in db.query(Skill.type, func.count()).group_by(Skill.type):
+        counts[(ORG, "skills_by_type", _key(type))] = count
+
+    staffed = dict(
+        db.query(ProjectRole.project_id, func.count(distinct(RoleDeveloper.developer_id)))
+        .join(RoleDeveloper, RoleDeveloper.project_role_id == ProjectRole.role_id)
+        .group_by(ProjectRole.project_id)
+    )
+    counts[(ORG, "staffing", "required")] = 0
+    counts[(ORG, "staffing", "filled")] = 0
+    for project_id, client, employees_req in db.query(Project.project_id, Project.client, Project.employees_req):
+        counts.update(project_deltas(client, employees_req, staffed.get(project_id, 0)))
+    return counts
+
+
+def rebuild_dashboard(db: Session):
+    """Recalcula los contadores en una transacción que excluye a apply_deltas de principio a fin."""
+    global _built
+    # Primero se bloquea la tabla: las escrituras concurrentes esperan en su apply_deltas y
+    # suman su delta sobre el resultado, sin perderse ni contarse dos veces. En PostgreSQL
+    # EXCLUSIVE deja leer el dashboard; en SQLite el DELETE toma el lock de escritura.
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text('LOCK TABLE "DashboardCounter" IN EXCLUSIVE MODE'))
+    db.query(DashboardCounter).delete(synchronize_session=False)
+    db.flush()
+    counts = _count(db)
+    counts[_BUILT] = 1
+    rows = [{"scope": scope, "metric": metric, "key": key, "value": value} for (scope, metric, key), value in counts.items()]
+    for start in range(0, len(rows), 1000):
+        _upsert(db, rows[start:start + 1000], replace=True)
+    db.commit()
+    _built = True
+
+
+def dashboard_built(db: Session) -> bool:
+    global _built
+    if not _built:
+        _built = db.get(DashboardCounter, _BUILT) is not None
+    return _built
+
+
+def read_counters(db: Session, scope: int = ORG, metric: str | None = None) -> dict[str, dict[str, int]]:
+    result: dict[str, dict[str, int]] = {}
+    if not dashboard_built(db):
+        if scope == ORG:
+            counts = _count(db)
+        else:
+            # Por empleado solo hay certificaciones: no hace falta contar toda la organización
+            counts = Counter({
+                (scope, "certifications_by_type", type): count
+                for type, count in db.query(Certification.type, func.count()).filter(Certification.employee_id == scope).group_by(Certification.type)
+            })
+        for (row_scope, row_metric, key), value in counts.items():
+            if row_scope == scope and value and metric in (None, row_metric):
+                result.setdefault(row_metric, {})[key] = value
+        return result
+
+    query = db.query(DashboardCounter.metric, DashboardCounter.key, DashboardCounter.value).filter(
+        DashboardCounter.scope == scope,
+        DashboardCounter.metric != "_meta",
+        DashboardCounter.value != 0,
+    )
+    if metric is not None:
+        query = query.filter(DashboardCounter.metric == metric)
+    for metric, key, value in query:
+        result.setdefault(metric, {})[key] = value
+    return result
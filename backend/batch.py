@@ -0,0 +1,112 @@
+from dataclasses import dataclass, field
+from typing import Callable
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from config import settings
+from schemas import BatchItemResult, BatchResult
+
+# Lotes de create/update/delete sobre las filas de un empleado (skills, metas,
+# certificaciones). Un SELECT para validar propiedad y, como máximo, un DELETE,
+# un UPDATE (executemany por llave primaria) y un INSERT ... RETURNING.
+# Los errores se reportan por elemento; el resto del lote se aplica igual.
+
+_OPS = ("create", "update", "delete")
+
+
+@dataclass
+class BatchOutcome:
+    results: list[BatchItemResult] = field(default_factory=list)
+    # Valores insertados (con su llave primaria), pares (fila anterior, valores nuevos) y filas borradas
+    created: list[dict] = field(default_factory=list)
+    updated: list[tuple[Row, dict]] = field(default_factory=list)
+    deleted: list[Row] = field(default_factory=list)
+
+    def summary(self) -> BatchResult:
+        return BatchResult(
+            created=len(self.created),
+            updated=len(self.updated),
+            deleted=len(self.deleted),
+            failed=sum(not result.ok for result in self.results),
+            results=sorted(self.results, key=lambda result: (_OPS.index(result.op), result.index)),
+        )
+
+
+def apply_batch(
+    db: Session,
+    model,
+    employee_id: int,
+    batch,
+    values: Callable[[dict], dict] = lambda value: value,
+    reject: Callable[[dict, Row | None], str | None] | None = None,
+) -> BatchOutcome:
+    """Aplica el lote de `employee_id`; no hace commit.
+
+    `values` completa los valores de cada create/update (p. ej. el estado de una
+    certificación) y `reject(valores, fila anterior o None)` devuelve un motivo para
+    descartar un update o un create. Se llama en el orden del lote: updates y luego creates.
+    """
+    if len(batch.create) + len(batch.update) + len(batch.delete) > settings.BULK_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {settings.BULK_BATCH_SIZE} operations")
+
+    pk = model.__mapper__.primary_key[0]
+    ids = {getattr(item, pk.key) for item in batch.update} | set(batch.delete)
+    owned = {}
+    if ids:
+        owned = {
+            getattr(row, pk.key): row
+            for row in db.execute(select(*model.__table__.c).where(pk.in_(ids), model.employee_id == employee_id))
+        }
+
+    outcome = BatchOutcome()
+    deleting = set()
+    for index, item_id in enumerate(batch.delete):
+        if item_id not in owned or item_id in deleting:
+            outcome.results.append(BatchItemResult(op="delete", index=index, id=item_id, ok=False, detail="Not found"))
+            continue
+        deleting.add(item_id)
+        outcome.deleted.append(owned[item_id])
+        outcome.results.append(BatchItemResult(op="delete", index=index, id=item_id, ok=True))
+
+    updating = set()
+    for index, item in enumerate(batch.update):
+        item_id = getattr(item, pk.key)
+        if item_id not in owned:
+            detail = "Not found"
+        elif item_id in deleting:
+            detail = "Deleted in the same batch"
+        elif item_id in updating:
+            detail = "Duplicate id in batch"
+        else:
+            value = values(item.model_dump(exclude={pk.key}))
+            detail = reject(value, owned[item_id]) if reject is not None else None
+            if detail is None:
+                updating.add(item_id)
+                outcome.updated.append((owned[item_id], value))
+                outcome.results.append(BatchItemResult(op="update", index=index, id=item_id, ok=True))
+                continue
+        outcome.results.append(BatchItemResult(op="update", index=index, id=item_id, ok=False, detail=detail))
+
+    created = []
+    for index, item in enumerate(batch.create):
+        value = values(item.model_dump())
+        detail = reject(value, None) if reject is not None else None
+        if detail is not None:
+            outcome.results.append(BatchItemResult(op="create", index=index, ok=False, detail=detail))
+            continue
+        created.append((index, value))
+
+    if outcome.deleted:
+        db.execute(delete(model).where(pk.in_(deleting)).execution_options(synchronize_session=False))
+    if outcome.updated:
+        db.execute(update(model), [{pk.key: getattr(row, pk.key), **value} for row, value in outcome.updated])
+    if created:
+        new_ids = db.execute(
+            insert(model).returning(pk, sort_by_parameter_order=True),
+            [{"employee_id": employee_id, **value} for _, value in created],
+        ).scalars().all()
+        for (index, value), new_id in zip(created, new_ids):
+            outcome.created.append({pk.key: new_id, **value})
+            outcome.results.append(BatchItemResult(op="create", index=index, id=new_id, ok=True))
+    return outcome
@@ -0,0 +1,230 @@
+# Escenarios de carga sobre la API completa: throughput, p50/p95/p99 y consultas SQL por
+# operación (leídas de GET /metrics). Guarda una línea base en JSON para comparar commits.
+#
+#   cd backend && python benchmarks/api_benchmark.py --users 2000 --operations 300 --save baseline.json
+#   cd backend && python benchmarks/api_benchmark.py --compare baseline.json
+#
+# Usa DATABASE_URL (SQLite o PostgreSQL) y la siembra con benchmarks/seed.py si hace falta.
+# Sin --url la app corre en el mismo proceso (TestClient); con --url se mide un servidor
+# ya levantado (uvicorn main:app) con la misma DATABASE_URL y SECRET_KEY, y con
+# RATE_LIMIT_ENABLED=false: todos los clientes del benchmark salen de la misma IP.
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx
+from sqlalchemy.orm import Session
+from config import settings
+from dependencies import engine
+from models import User, Employee, Skill
+from schemas import EmployeeRole
+from utils import create_access_token
+from seed import EMAIL, PASSWORD, seed
+
+SEARCH_TERMS = ["rob", "lopez", "ana gar", "monterrey", "cloud", "secur", "81", "zzz"]
+PROFILE_PATHS = ["/profile/my-info", "/skills/my-skills", "/goals/my-goals", "/certifications/my-certifications", "/certifications/types/count"]
+
+
+class Context:
+    """Tokens y datos sembrados que usan los escenarios."""
+
+    def __init__(self, users: int):
+        with Session(engine) as db:
+            rows = db.query(User.id, Employee.employee_id, Employee.role).join(Employee, Employee.user_id == User.id).all()
+            self.managers = [create_access_token({"id": user_id}) for user_id, _, role in rows if role == EmployeeRole.Manager]
+            developers = [(user_id, employee_id) for user_id, employee_id, role in rows if role == EmployeeRole.Developer][:200]
+            self.developers = [create_access_token({"id": user_id}) for user_id, _ in developers]
+            skills: dict[int, list] = {}
+            for skill_id, employee_id, name, level, type in db.query(Skill.skill_id, Skill.employee_id, Skill.name, Skill.level, Skill.type).filter(
+                Skill.employee_id.in_([employee_id for _, employee_id in developers])
+            ):
+                skills.setdefault(employee_id, []).append({"skill_id": skill_id, "name": name, "level": level, "type": type.value})
+            self.skills = [skills.get(employee_id, []) for _, employee_id in developers]
+        self.users = users
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+# Cada escenario es una operación (una o varias peticiones) que devuelve los códigos de estado
+def login_storm(client, ctx: Context, rng: random.Random):
+    response = client.post("/auth/token", data={"username": EMAIL.format(rng.randrange(ctx.users)), "password": PASSWORD})
+    return [response.status_code]
+
+
+def directory_search(client, ctx: Context, rng: random.Random):
+    response = client.get("/users", params={"search": rng.choice(SEARCH_TERMS), "size": 50}, headers=_auth(rng.choice(ctx.managers)))
+    return [response.status_code]
+
+
+def project_listing(client, ctx: Context, rng: random.Random):
+    params = {"page": rng.randint(1, 5), "size": 50, "alphabetical": rng.random() < 0.5}
+    response = client.get("/projects", params=params, headers=_auth(rng.choice(ctx.managers)))
+    return [response.status_code]
+
+
+def profile_page(client, ctx: Context, rng: random.Random):
+    response = client.get("/profile/full", headers=_auth(rng.choice(ctx.developers)))
+    return [response.status_code]
+
+
+def profile_page_legacy(client, ctx: Context, rng: random.Random):
+    # Las cinco llamadas que hacía el frontend antes de /profile/full
+    headers = _auth(rng.choice(ctx.developers))
+    return [client.get(path, headers=headers).status_code for path in PROFILE_PATHS]
+
+
+def bulk_edits(client, ctx: Context, rng: random.Random):
+    index = rng.randrange(len(ctx.developers))
+    updates = [{**skill, "level": rng.randint(1, 5)} for skill in ctx.skills[index]]
+    response = client.post("/skills/batch", json={"update": updates}, headers=_auth(ctx.developers[index]))
+    return [response.status_code]
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "directory_search": directory_search,
+    "project_listing": project_listing,
+    "profile_page": profile_page,
+    "profile_page_legacy": profile_page_legacy,
+    "bulk_edits": bulk_edits,
+}
+
+
+def _queries_total(client) -> float:
+    # Suma de db_queries_total de todas las rutas (sin el trabajo en segundo plano)
+    total = 0.0
+    headers = {"Authorization": f"Bearer {settings.METRICS_TOKEN}"} if settings.METRICS_TOKEN else {}
+    for line in client.get("/metrics", headers=headers).text.splitlines():
+        if line.startswith("db_queries_total{") and 'route="background"' not in line and 'route="/metrics"' not in line:
+            total += float(line.rsplit(" ", 1)[1])
+    return total
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(p * len(sorted_values)) - 1))]
+
+
+def run_scenario(make_client, ctx: Context, scenario, operations: int, concurrency: int, warmup: int) -> dict:
+    clients = [make_client() for _ in range(concurrency)]
+    warm = random.Random(0)
+    for _ in range(warmup):
+        scenario(clients[0], ctx, warm)
+
+    def worker(index: int) -> list[tuple[float, bool]]:
+        rng = random.Random(index)
+        client = clients[index]
+        samples = []
+        for _ in range(operations // concurrency + (index < operations % concurrency)):
+            start = time.perf_counter()
+            statuses = scenario(client, ctx, rng)
+            samples.append((time.perf_counter() - start, all(status < 400 for status in statuses)))
+        return samples
+
+    queries_before = _queries_total(clients[0])
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = [sample for result in pool.map(worker, range(concurrency)) for sample in result]
+    elapsed = time.perf_counter() - start
+    queries = _queries_total(clients[0]) - queries_before
+
+    timings = sorted(seconds * 1000 for seconds, _ in samples)
+    return {
+        "operations": len(samples),
+        "errors": sum(not ok for _, ok in samples),
+        "throughput": round(len(samples) / elapsed, 2),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "queries_per_op": round(queries / len(samples), 2),
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Imprime la diferencia contra la línea base; True si algún escenario empeoró más de `tolerance`."""
+    print(f"\nvs baseline {baseline.get('commit')} ({baseline.get('database')}), tolerance {tolerance:.0%}")
+    regressed = False
+    for name, result in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        problems = []
+        if result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            problems.append("p95")
+        if result["throughput"] < previous["throughput"] * (1 - tolerance):
+            problems.append("throughput")
+        # Las consultas por operación varían poco (caches calientes o fríos), no son exactas
+        if result["queries_per_op"] > previous["queries_per_op"] * (1 + tolerance):
+            problems.append("queries")
+        regressed |= bool(problems)
+        print(
+            f"{name:>20}: p95 {previous['p95_ms']:8.2f} -> {result['p95_ms']:8.2f} ms  "
+            f"{previous['throughput']:8.1f} -> {result['throughput']:8.1f} op/s  "
+            f"queries {previous['queries_per_op']:6.2f} -> {result['queries_per_op']:6.2f}"
+            + (f"  REGRESSION ({', '.join(problems)})" if problems else "")
+        )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="servidor a medir; sin esto la app corre en el mismo proceso")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--operations", type=int, default=300, help="operaciones por escenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="repetible; por defecto todos")
+    parser.add_argument("--save", help="guarda los resultados como línea base (JSON)")
+    parser.add_argument("--compare", help="línea base contra la cual comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    seed(engine, args.users, args.projects)
+    ctx = Context(args.users)
+    if args.url:
+        make_client = lambda: httpx.Client(base_url=args.url, timeout=30)
+    else:
+        from fastapi.testclient import TestClient
+        from main import app
+        make_client = lambda: TestClient(app)
+
+    results = {"commit": _commit(), "database": engine.dialect.name, "users": args.users, "projects": args.projects,
+               "concurrency": args.concurrency, "scenarios": {}}
+    print(f"{engine.dialect.name}, {args.users} users, {args.projects} projects, {args.operations} operations x {args.concurrency} clients")
+    for name in args.scenario or SCENARIOS:
+        result = run_scenario(make_client, ctx, SCENARIOS[name], args.operations, args.concurrency, args.warmup)
+        results["scenarios"][name] = result
+        print(
+            f"{name:>20}: {result['throughput']:8.1f} op/s  p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  "
+            f"p99 {result['p99_ms']:8.2f} ms  {result['queries_per_op']:6.2f} queries/op  {result['errors']} errors"
+        )
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            if compare(results, json.load(file), args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
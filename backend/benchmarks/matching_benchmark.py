@@ -0,0 +1,57 @@
+# Latencia de GET /project-roles/{role_id}/candidates sobre una matriz sintética de skills.
+#
+#   cd backend && python benchmarks/matching_benchmark.py --employees 100000 --top-k 50
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matching import SkillMatrix, _Levels
+from schemas import EmployeeRole
+
+
+def build(employees: int, skills: int, per_employee: int) -> SkillMatrix:
+    rng = random.Random(42)
+    names = [f"skill-{i}" for i in range(skills)]
+    levels = _Levels()
+    for employee_id in range(1, employees + 1):
+        role = EmployeeRole.Developer if rng.random() < 0.8 else EmployeeRole.TFS
+        owned = [(name, rng.randint(1, 5)) for name in rng.sample(names, per_employee)]
+        levels.set_employee(employee_id, role, owned)
+    # Matriz armada a mano y sin vencimiento: no hace falta base de datos
+    matrix = SkillMatrix(ttl=float("inf"))
+    matrix.install(levels)
+    return matrix
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--skills", type=int, default=500)
+    parser.add_argument("--per-employee", type=int, default=10)
+    parser.add_argument("--required", type=int, default=6)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    matrix = build(args.employees, args.skills, args.per_employee)
+    print(f"{args.employees} employees x {args.skills} skills built in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(7)
+    timings = []
+    for _ in range(args.queries):
+        requirements = [(f"skill-{rng.randrange(args.skills)}", rng.randint(1, 5)) for _ in range(args.required)]
+        start = time.perf_counter()
+        matrix.top_candidates(None, requirements, args.top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"top-{args.top_k}: median {statistics.median(timings):.2f} ms  p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
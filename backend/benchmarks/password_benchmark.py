@@ -0,0 +1,51 @@
+# Logins por segundo (verificación bcrypt) según número de workers del pool de contraseñas.
+#
+#   cd backend && python benchmarks/password_benchmark.py --rounds 12 --workers 1 2 4
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+import utils
+
+
+def run(workers: int, logins: int, hashed: bytes) -> float:
+    utils.shutdown_password_executor()
+    settings.BCRYPT_WORKERS = workers
+    settings.BCRYPT_MAX_PENDING = logins
+    utils.verify_password("password", hashed)  # calentamiento: arranca el pool
+
+    # Muchos clientes concurrentes, como el threadpool de FastAPI en una ráfaga de logins
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers * 4) as clients:
+        results = list(clients.map(lambda _: utils.verify_password("password", hashed), range(logins)))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=settings.BCRYPT_ROUNDS)
+    parser.add_argument("--executor", choices=["process", "thread", "inline"], default=settings.BCRYPT_EXECUTOR)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--logins", type=int, default=64)
+    args = parser.parse_args()
+
+    settings.BCRYPT_ROUNDS = args.rounds
+    settings.BCRYPT_EXECUTOR = args.executor
+    hashed = utils.hash_password("password")
+
+    print(f"bcrypt cost {args.rounds}, executor {args.executor}, {os.cpu_count()} cpus")
+    for workers in sorted(set(args.workers)):
+        throughput = run(workers, args.logins, hashed)
+        print(f"workers {workers:>2}: {throughput:8.1f} logins/s  {throughput / workers:8.1f} logins/s per core")
+    utils.shutdown_password_executor()
+
+
+if __name__ == "__main__":
+    main()
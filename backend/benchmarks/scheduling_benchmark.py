@@ -0,0 +1,74 @@
+# Consultas de disponibilidad, proyectos con falta de personal y auto-asignación sobre datos sintéticos.
+#
+#   cd backend && python benchmarks/scheduling_benchmark.py --projects 10000 --developers 20000
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduling import Schedule, plan_assignments
+
+
+def synthetic(projects: int, developers: int, staffed_ratio: float):
+    rng = random.Random(42)
+    origin = date(2025, 1, 1)
+    rows, assignments = [], []
+    developer_ids = list(range(1, developers + 1))
+    for project_id in range(1, projects + 1):
+        start = origin + timedelta(days=rng.randrange(730))
+        end = start + timedelta(days=rng.randint(14, 180))
+        required = rng.randint(1, 6)
+        rows.append((project_id, start, end, required))
+        for developer_id in rng.sample(developer_ids, int(required * staffed_ratio)):
+            assignments.append((developer_id, project_id))
+    return rows, assignments, developer_ids
+
+
+def timed(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=10_000)
+    parser.add_argument("--developers", type=int, default=20_000)
+    parser.add_argument("--staffed-ratio", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    projects, assignments, developers = synthetic(args.projects, args.developers, args.staffed_ratio)
+    start = time.perf_counter()
+    schedule = Schedule(projects, assignments, developers)
+    print(f"{args.projects} projects, {len(assignments)} assignments, {args.developers} developers")
+    print(f"build:          {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    rng = random.Random(7)
+    def window():
+        first = date(2025, 1, 1) + timedelta(days=rng.randrange(700))
+        return first, first + timedelta(days=14)
+
+    print(f"overlapping:    {timed(lambda: schedule.assignments.overlapping(*window()), args.repeat):8.3f} ms")
+    print(f"available(100): {timed(lambda: schedule.available(*window(), 100), args.repeat):8.3f} ms")
+    print(f"understaffed:   {timed(lambda: schedule.understaffed_projects(*window()), args.repeat):8.3f} ms")
+
+    # Un rol por proyecto y sin requisitos de skills: asignación por menor carga
+    targets = schedule.understaffed_projects()
+    roles = {project_id: [project_id] for project_id in targets}
+    start = time.perf_counter()
+    planned, unfilled = plan_assignments(schedule, targets, roles)
+    elapsed = time.perf_counter() - start
+    print(f"auto-assign:    {elapsed * 1000:8.1f} ms  ({len(planned)} assignments over {len(targets)} projects, {sum(unfilled.values())} unfilled)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Compara la búsqueda indexada de search.py con la cadena de ILIKE anterior.
+#
+#   cd backend && python benchmarks/search_benchmark.py --employees 100000
+#
+# Usa DATABASE_URL (o --database-url). En PostgreSQL crea pg_trgm y los índices GIN.
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, or_
+from sqlalchemy.orm import Session
+from config import settings
+from dependencies import Base
+from models import Employee
+from schemas import EmployeeRole
+import search
+
+NAMES = ["Ana", "Roberto", "Lucia", "Carlos", "Sofia", "Miguel", "Valeria", "Jorge", "Fernanda", "Diego"]
+LAST_NAMES = ["Lopez", "Garcia", "Martinez", "Hernandez", "Gonzalez", "Perez", "Sanchez", "Ramirez", "Torres", "Flores"]
+LOCATIONS = ["Monterrey", "CDMX", "Guadalajara", "Madrid", "Buenos Aires"]
+CAPABILITIES = ["Cloud", "Data & AI", "Security", "Software Engineering", "Consulting"]
+POSITIONS = ["Analyst", "Consultant", "Engineer", "Manager", "Architect"]
+TERMS = ["rob", "lopez", "ana gar", "monterrey", "cloud", "secur", "81", "zzz"]
+
+
+def seed(engine, employees: int):
+    rng = random.Random(42)
+    with Session(engine) as db:
+        if db.query(func.count(Employee.employee_id)).scalar() >= employees:
+            return
+        db.query(Employee).delete()
+        batch = []
+        for i in range(employees):
+            batch.append({
+                "name": rng.choice(NAMES) + str(i % 97),
+                "last_name_1": rng.choice(LAST_NAMES),
+                "last_name_2": rng.choice(LAST_NAMES + [None]),
+                "phone_number": f"81{rng.randint(10000000, 99999999)}",
+                "location": rng.choice(LOCATIONS),
+                "capability": rng.choice(CAPABILITIES),
+                "position": rng.choice(POSITIONS),
+                "seniority": rng.randint(1, 10),
+                "role": rng.choice(list(EmployeeRole)),
+            })
+            if len(batch) == 5000:
+                db.execute(insert(Employee), batch)
+                batch = []
+        if batch:
+            db.execute(insert(Employee), batch)
+        db.commit()
+
+
+def legacy_condition(term: str):
+    search_term = f"%{term.lower()}%"
+    # Mismo predicado que routers/users.py usaba; `||` en lugar de concat() para que corra también en SQLite
+    full_name = func.lower(Employee.name + ' ' + Employee.last_name_1 + ' ' + func.coalesce(Employee.last_name_2, ''))
+    return or_(
+        func.lower(Employee.name).ilike(search_term),
+        func.lower(Employee.last_name_1).ilike(search_term),
+        func.lower(Employee.last_name_2).ilike(search_term),
+        func.lower(Employee.phone_number).ilike(search_term),
+        func.lower(Employee.location).ilike(search_term),
+        func.lower(Employee.capability).ilike(search_term),
+        func.lower(Employee.position).ilike(search_term),
+        full_name.ilike(search_term)
+    )
+
+
+def page(db: Session, term: str, indexed: bool):
+    query = db.query(Employee)
+    if indexed:
+        condition, ranking = search.employee_search(db, term)
+        query = query.filter(condition).order_by(*ranking, Employee.employee_id)
+    else:
+        query = query.filter(legacy_condition(term)).order_by(Employee.employee_id)
+    return query.limit(50).all()
+
+
+def measure(engine, indexed: bool, repeat: int) -> list[float]:
+    timings = []
+    with Session(engine) as db:
+        page(db, TERMS[0], indexed)  # calentamiento (y construcción del índice en memoria)
+        for _ in range(repeat):
+            for term in TERMS:
+                start = time.perf_counter()
+                page(db, term, indexed)
+                timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    if engine.dialect.name == "postgresql":
+        search.create_search_indexes(engine)
+    seed(engine, args.employees)
+
+    print(f"{engine.dialect.name}, {args.employees} employees, {len(TERMS)} terms x {args.repeat}")
+    for label, indexed in (("ilike chain", False), ("search index", True)):
+        timings = sorted(measure(engine, indexed, args.repeat))
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"{label:>12}: p50 {statistics.median(timings):8.2f} ms  p95 {p95:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
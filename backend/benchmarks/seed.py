@@ -0,0 +1,177 @@
+# Genera datos sintéticos para los benchmarks de la API: usuarios/empleados (con sus
+# subtablas de rol), skills, metas, certificaciones, proyectos, roles y asignaciones.
+#
+#   cd backend && python benchmarks/seed.py --users 2000 --projects 500 --reset
+#
+# Usa DATABASE_URL (o --database-url). Todos los usuarios tienen la contraseña "password".
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import Session
+from config import settings
+from dependencies import Base
+from models import (
+    User, Employee, Manager, Developer, TFS, Skill, Goal, Certification,
+    Project, ProjectRole, RoleDeveloper, RoleSkill,
+)
+from schemas import EmployeeRole, SkillType
+from analytics import rebuild_dashboard
+from jobs import certification_status
+from reports import build_certification_digest
+import search
+
+PASSWORD = "password"
+EMAIL = "user{}@bench.local"
+NAMES = ["Ana", "Roberto", "Lucia", "Carlos", "Sofia", "Miguel", "Valeria", "Jorge", "Fernanda", "Diego"]
+LAST_NAMES = ["Lopez", "Garcia", "Martinez", "Hernandez", "Gonzalez", "Perez", "Sanchez", "Ramirez", "Torres", "Flores"]
+LOCATIONS = ["Monterrey", "CDMX", "Guadalajara", "Madrid", "Buenos Aires"]
+CAPABILITIES = ["Cloud", "Data & AI", "Security", "Software Engineering", "Consulting"]
+POSITIONS = ["Analyst", "Consultant", "Engineer", "Manager", "Architect"]
+CLIENTS = ["Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Acme", "Soylent"]
+SKILLS = [f"skill-{i}" for i in range(60)]
+CERTIFICATIONS = ["AWS", "GCP", "Azure", "Scrum", "ITIL", "CISSP", "PMP", "Kubernetes"]
+BATCH = 2000
+
+
+def _role(i: int) -> EmployeeRole:
+    # ~5% managers, ~10% TFS, el resto developers
+    if i % 20 == 0:
+        return EmployeeRole.Manager
+    if i % 10 == 1:
+        return EmployeeRole.TFS
+    return EmployeeRole.Developer
+
+
+def _insert(db: Session, model, rows: list[dict]):
+    for start in range(0, len(rows), BATCH):
+        db.execute(insert(model), rows[start:start + BATCH])
+
+
+def _insert_returning(db: Session, column, rows: list[dict]) -> list[int]:
+    ids = []
+    for start in range(0, len(rows), BATCH):
+        ids += db.execute(
+            insert(column.class_).returning(column, sort_by_parameter_order=True), rows[start:start + BATCH]
+        ).scalars().all()
+    return ids
+
+
+def seed(engine, users: int, projects: int, skills: int = 15, goals: int = 3, certifications: int = 4, reset: bool = False) -> bool:
+    """Siembra la base si tiene menos de `users` usuarios; devuelve False si ya estaba sembrada."""
+    if reset:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    if engine.dialect.name == "postgresql":
+        search.create_search_indexes(engine)
+
+    rng = random.Random(42)
+    today = date.today()
+    with Session(engine) as db:
+        if db.query(func.count(User.id)).scalar() >= users:
+            return False
+
+        # Un solo hash para todos: sembrar no debe costar `users` veces bcrypt
+        hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
+        user_ids = _insert_returning(db, User.id, [{"email": EMAIL.format(i), "hashed_password": hashed} for i in range(users)])
+        roles = [_role(i) for i in range(users)]
+        employee_ids = _insert_returning(db, Employee.employee_id, [
+            {
+                "user_id": user_id,
+                "name": rng.choice(NAMES) + str(i % 97),
+                "last_name_1": rng.choice(LAST_NAMES),
+                "last_name_2": rng.choice(LAST_NAMES + [None]),
+                "phone_number": f"81{rng.randint(10000000, 99999999)}",
+                "location": rng.choice(LOCATIONS),
+                "capability": rng.choice(CAPABILITIES),
+                "position": rng.choice(POSITIONS),
+                "seniority": rng.randint(1, 10),
+                "role": role,
+            }
+            for i, (user_id, role) in enumerate(zip(user_ids, roles))
+        ])
+        managers = [employee_id for employee_id, role in zip(employee_ids, roles) if role == EmployeeRole.Manager]
+        developers = [employee_id for employee_id, role in zip(employee_ids, roles) if role == EmployeeRole.Developer]
+        _insert(db, Manager, [{"employee_id": employee_id, "staff_days": rng.randint(0, 200)} for employee_id in managers])
+        _insert(db, Developer, [{"employee_id": employee_id, "staff_days": rng.randint(0, 200)} for employee_id in developers])
+        _insert(db, TFS, [
+            {"employee_id": employee_id, "speciality_area": rng.choice(CAPABILITIES)}
+            for employee_id, role in zip(employee_ids, roles) if role == EmployeeRole.TFS
+        ])
+
+        skill_rows, goal_rows, certification_rows = [], [], []
+        for employee_id in employee_ids:
+            for name in rng.sample(SKILLS, skills):
+                skill_rows.append({"employee_id": employee_id, "name": name, "level": rng.randint(1, 5), "type": rng.choice(list(SkillType))})
+            for g in range(goals):
+                goal_rows.append({"employee_id": employee_id, "title": f"Goal {g}", "category": "Growth", "description": "Benchmark goal", "term": rng.choice(["short", "long"])})
+            for name in rng.sample(CERTIFICATIONS, min(certifications, len(CERTIFICATIONS))):
+                obtained = today - timedelta(days=rng.randint(30, 1500))
+                expiration = today + timedelta(days=rng.randint(-700, 900))
+                certification_rows.append({
+                    "employee_id": employee_id, "name": name, "type": name, "description": None,
+                    "certification_date": obtained, "expiration_date": expiration, "status": certification_status(expiration, today),
+                })
+        _insert(db, Skill, skill_rows)
+        _insert(db, Goal, goal_rows)
+        _insert(db, Certification, certification_rows)
+
+        project_rows = []
+        for i in range(projects):
+            start = today + timedelta(days=rng.randint(-365, 365))
+            project_rows.append({
+                "projectname": f"Project {i}",
+                "client": rng.choice(CLIENTS),
+                "description": f"Benchmark project {i} for {rng.choice(CAPABILITIES)}",
+                "startdate": start,
+                "enddate": start + timedelta(days=rng.randint(14, 240)),
+                "manager_id": rng.choice(managers) if managers else None,
+                "employees_req": rng.randint(1, 6),
+            })
+        project_ids = _insert_returning(db, Project.project_id, project_rows)
+        role_rows = [
+            {"project_id": project_id, "name": f"Role {r}", "description": "Benchmark role", "feedback": None}
+            for project_id in project_ids for r in range(rng.randint(1, 3))
+        ]
+        role_ids = _insert_returning(db, ProjectRole.role_id, role_rows)
+        _insert(db, RoleSkill, [
+            {"role_id": role_id, "name": name, "level": rng.randint(1, 5)}
+            for role_id in role_ids for name in rng.sample(SKILLS, 3)
+        ])
+        if developers:
+            _insert(db, RoleDeveloper, [
+                {"developer_id": rng.choice(developers), "project_role_id": role_id}
+                for role_id in role_ids if rng.random() < 0.5
+            ])
+        build_certification_digest(db, today)
+        db.commit()
+        rebuild_dashboard(db)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--skills", type=int, default=15, help="skills por empleado")
+    parser.add_argument("--goals", type=int, default=3, help="metas por empleado")
+    parser.add_argument("--certifications", type=int, default=4, help="certificaciones por empleado")
+    parser.add_argument("--reset", action="store_true", help="borra y recrea todas las tablas")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if seed(engine, args.users, args.projects, args.skills, args.goals, args.certifications, args.reset):
+        print(f"{engine.dialect.name}: seeded {args.users} users and {args.projects} projects")
+    else:
+        print(f"{engine.dialect.name}: already seeded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# Costo por cada 1000 filas de las respuestas de listas (/projects, /users, my-skills,
+# my-certifications): consulta, construcción de modelos y serialización a JSON, antes
+# (objetos ORM y modelos armados a mano) y después (columnas del schema -> dicts, ver
+# serialization.py). Si orjson está instalado, también mide serializar con orjson como
+# haría un ORJSONResponse.
+#
+#   cd backend && python benchmarks/serialization_benchmark.py --rows 1000
+#
+# Usa DATABASE_URL (o --database-url) y la siembra con benchmarks/seed.py si hace falta.
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from config import settings
+from models import Employee, Project, Skill, Certification
+from schemas import EmployeeList, ProjectRegistered, SkillResponse, CertificationResponse
+from serialization import adapter, as_dicts
+from routers.projects import PROJECT_COLUMNS
+from routers.users import DIRECTORY_COLUMNS
+from routers.skills import SKILL_COLUMNS
+from routers.certifications import CERTIFICATION_COLUMNS
+from seed import seed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _legacy_project(p: Project, e: Employee) -> ProjectRegistered:
+    # Como routers/projects.py construía cada fila antes de serialization.py
+    return ProjectRegistered(
+        project_id=p.project_id, projectName=p.projectname, client=p.client, description=p.description,
+        startDate=p.startdate, endDate=p.enddate, employees_req=p.employees_req, manager_id=p.manager_id,
+        manager=e.name + " " + e.last_name_1,
+    )
+
+
+# nombre -> (modelo de respuesta, consulta de objetos ORM y armado anterior, consulta de columnas)
+CASES = {
+    "projects": (
+        ProjectRegistered,
+        lambda db, n: [_legacy_project(p, e) for p, e in db.query(Project, Employee).join(Employee, Project.manager_id == Employee.employee_id).order_by(Project.project_id).limit(n)],
+        lambda db, n: db.query(*PROJECT_COLUMNS).select_from(Project).join(Employee, Project.manager_id == Employee.employee_id).order_by(Project.project_id).limit(n).all(),
+    ),
+    "users": (
+        EmployeeList,
+        lambda db, n: db.query(Employee).order_by(Employee.employee_id).limit(n).all(),
+        lambda db, n: db.query(*DIRECTORY_COLUMNS).order_by(Employee.employee_id).limit(n).all(),
+    ),
+    "skills": (
+        SkillResponse,
+        lambda db, n: db.query(Skill).order_by(Skill.skill_id).limit(n).all(),
+        lambda db, n: db.query(*SKILL_COLUMNS).order_by(Skill.skill_id).limit(n).all(),
+    ),
+    "certifications": (
+        CertificationResponse,
+        lambda db, n: db.query(Certification).order_by(Certification.certification_id).limit(n).all(),
+        lambda db, n: db.query(*CERTIFICATION_COLUMNS).order_by(Certification.certification_id).limit(n).all(),
+    ),
+}
+
+
+def measure(engine, fetch, build, serialize, repeat: int) -> dict:
+    """Mediana en ms de cada etapa; cada repetición usa una sesión nueva."""
+    stages = {"fetch": [], "build": [], "serialize": []}
+    for _ in range(repeat + 1):
+        with Session(engine) as db:
+            start = time.perf_counter()
+            rows = fetch(db)
+            fetched = time.perf_counter()
+            value = build(rows)
+            built = time.perf_counter()
+            serialize(value)
+            done = time.perf_counter()
+        stages["fetch"].append(fetched - start)
+        stages["build"].append(built - fetched)
+        stages["serialize"].append(done - built)
+    # La primera repetición calienta caches (compilación de la consulta, TypeAdapter)
+    return {stage: statistics.median(times[1:]) * 1000 for stage, times in stages.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    seed(engine, args.rows, args.rows, skills=2, goals=0, certifications=2)
+
+    per = 1000 / args.rows
+    print(f"{engine.dialect.name}, {args.rows} rows, ms per 1k rows (fetch + build + serialize)")
+    for name, (model, legacy, projected) in CASES.items():
+        serializer = adapter(List[model])
+        variants = {
+            # response_model: FastAPI valida (from_attributes) y serializa con dump_json
+            "before": (lambda db: legacy(db, args.rows), lambda rows: serializer.validate_python(rows, from_attributes=True), serializer.dump_json),
+            "after": (lambda db: projected(db, args.rows), lambda rows: serializer.validate_python(as_dicts(rows)), serializer.dump_json),
+        }
+        if orjson is not None:
+            variants["after+orjson"] = (
+                lambda db: projected(db, args.rows),
+                lambda rows: serializer.validate_python(as_dicts(rows)),
+                lambda value: orjson.dumps([item.model_dump() for item in value]),
+            )
+        results = {label: measure(engine, *variant, args.repeat) for label, variant in variants.items()}
+        baseline = sum(results["before"].values())
+        for label, stages in results.items():
+            total = sum(stages.values())
+            print(
+                f"{name:>15} {label:>13}: {stages['fetch'] * per:7.2f} + {stages['build'] * per:7.2f} + "
+                f"{stages['serialize'] * per:7.2f} = {total * per:7.2f} ms  ({baseline / total:4.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
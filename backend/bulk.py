@@ -0,0 +1,296 @@
+# Importación y exportación masiva de empleados, skills y certificaciones.
+#
+#   python bulk.py import employees empleados.csv
+#   python bulk.py export skills --format jsonl > skills.jsonl
+import argparse
+import csv
+import io
+import json
+import sys
+from collections import Counter
+from datetime import date
+from typing import Iterable, Iterator
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from config import settings
+from models import User, Employee, Skill, Certification
+from schemas import UserCreate, SkillCreate, CertificationCreate
+from search import invalidate_employee_search
+from directory import directory_snapshot
+from matching import skill_matrix
+from scheduling import schedule_cache
+from analytics import apply_deltas, employee_deltas, skill_deltas, certification_deltas
+from jobs import certification_status
+from reports import build_certification_digest
+from utils import hash_passwords
+from cache import bump_all
+
+KINDS = ("employees", "skills", "certifications")
+FORMATS = ("csv", "jsonl")
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EMPLOYEE_FIELDS = ["email", "name", "last_name_1", "last_name_2", "phone_number", "location", "capability", "position", "seniority", "role"]
+SKILL_FIELDS = ["email", "name", "type", "level"]
+CERTIFICATION_FIELDS = ["email", "name", "type", "description", "certification_date", "expiration_date", "status"]
+
+
+class SkillRow(SkillCreate):
+    email: str
+
+class CertificationRow(CertificationCreate):
+    email: str
+
+
+class ParseError:
+    """Fila que no se pudo leer; se reporta en `errors` como una fila inválida."""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+def read_rows(stream: Iterable[str], fmt: str) -> Iterator[dict | ParseError]:
+    """Lee filas de CSV (con encabezado) o JSON Lines sin cargar el archivo completo. Una
+    fila mal formada se entrega como ParseError; un error de codificación termina la lectura."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield ParseError(f"Invalid CSV: {e}")
+                continue
+            except UnicodeDecodeError as e:
+                yield ParseError(f"Invalid encoding, reading stopped here: {e}")
+                return
+            # En CSV una celda vacía significa "sin valor"
+            yield {key: (value if value != "" else None) for key, value in row.items()}
+    elif fmt == "jsonl":
+        lines = iter(stream)
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            except UnicodeDecodeError as e:
+                yield ParseError(f"Invalid encoding, reading stopped here: {e}")
+                return
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield ParseError(f"Invalid JSON: {e}")
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _batches(rows: Iterator[dict], size: int) -> Iterator[list[tuple[int, dict]]]:
+    batch = []
+    for number, row in enumerate(rows, start=1):
+        batch.append((number, row))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate(batch, model: type[BaseModel], errors: list[dict]) -> list[tuple[int, BaseModel]]:
+    valid = []
+    for number, row in batch:
+        if isinstance(row, ParseError):
+            errors.append({"row": number, "error": row.error})
+            continue
+        try:
+            valid.append((number, model.model_validate(row)))
+        except ValidationError as e:
+            errors.append({"row": number, "error": "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())})
+    return valid
+
+
+def _employee_ids(db: Session, emails: set[str]) -> dict[str, int]:
+    rows = db.query(User.email, Employee.employee_id).join(Employee, Employee.user_id == User.id).filter(User.email.in_(emails))
+    return {email: employee_id for email, employee_id in rows}
+
+
+def _import_employees(db: Session, valid, errors: list[dict]) -> int:
+    seen, candidates = set(), []
+    for number, user in valid:
+        email = user.email.strip().lower()
+        if email in seen:
+            errors.append({"row": number, "error": "Duplicate email in input"})
+            continue
+        seen.add(email)
+        candidates.append((number, email, user))
+
+    existing = {email for (email,) in db.query(User.email).filter(User.email.in_(seen))} if seen else set()
+    rows = []
+    for number, email, user in candidates:
+        if email in existing:
+            errors.append({"row": number, "error": "User already exists"})
+        else:
+            rows.append((email, user))
+    if not rows:
+        return 0
+
+    hashes = hash_passwords([user.password for _, user in rows])
+    user_ids = db.execute(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [{"email": email, "hashed_password": hashed.decode("utf-8")} for (email, _), hashed in zip(rows, hashes)],
+    ).scalars().all()
+    db.execute(insert(Employee), [
+        {"user_id": user_id, **user.model_dump(include=set(EMPLOYEE_FIELDS) - {"email"})}
+        for user_id, (_, user) in zip(user_ids, rows)
+    ])
+    deltas = Counter()
+    for _, user in rows:
+        deltas.update(employee_deltas(user.model_dump()))
+    apply_deltas(db, deltas)
+    return len(rows)
+
+
+def _import_owned(db: Session, valid, errors: list[dict], model) -> int:
+    employee_ids = _employee_ids(db, {row.email.strip().lower() for _, row in valid})
+    values = []
+    for number, row in valid:
+        employee_id = employee_ids.get(row.email.strip().lower())
+        if employee_id is None:
+            errors.append({"row": number, "error": "Employee not found"})
+            continue
+        value = {"employee_id": employee_id, **row.model_dump(exclude={"email"})}
+        if model is Certification:
+            value["status"] = certification_status(row.expiration_date)
+        values.append(value)
+    if values:
+        db.execute(insert(model), values)
+        deltas = Counter()
+        for value in values:
+            if model is Skill:
+                deltas.update(skill_deltas(value["type"]))
+            else:
+                deltas.update(certification_deltas(value["employee_id"], value["type"]))
+        apply_deltas(db, deltas)
+    return len(values)
+
+
+def _after_import(db: Session, kind: str):
+    """Invalida los caches que dependen de lo importado."""
+    if kind == "employees":
+        invalidate_employee_search()
+        directory_snapshot.invalidate()
+        schedule_cache.invalidate()
+    if kind in ("employees", "skills"):
+        skill_matrix.invalidate()
+    if kind == "certifications":
+        build_certification_digest(db, date.today())
+        db.commit()
+    if kind != "employees":
+        bump_all()
+
+
+def import_rows(db: Session, kind: str, rows: Iterator[dict | ParseError]) -> dict:
+    """Valida e inserta por lotes de BULK_BATCH_SIZE, un commit por lote; devuelve errores por fila."""
+    if kind not in KINDS:
+        raise ValueError(f"Unsupported kind: {kind}")
+    inserted, errors = 0, []
+    try:
+        for batch in _batches(rows, settings.BULK_BATCH_SIZE):
+            if kind == "employees":
+                count = _import_employees(db, _validate(batch, UserCreate, errors), errors)
+            elif kind == "skills":
+                count = _import_owned(db, _validate(batch, SkillRow, errors), errors, Skill)
+            else:
+                count = _import_owned(db, _validate(batch, CertificationRow, errors), errors, Certification)
+            db.commit()
+            inserted += count
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        # Los lotes ya confirmados quedan aunque uno posterior falle: los caches se invalidan igual
+        if inserted:
+            _after_import(db, kind)
+    errors.sort(key=lambda error: error["row"])
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
+
+
+def _export_query(db: Session, kind: str):
+    if kind == "employees":
+        columns = [getattr(Employee, field) for field in EMPLOYEE_FIELDS if field != "email"]
+        return EMPLOYEE_FIELDS, db.query(User.email, *columns).join(Employee, Employee.user_id == User.id).order_by(Employee.employee_id)
+    model, fields = (Skill, SKILL_FIELDS) if kind == "skills" else (Certification, CERTIFICATION_FIELDS)
+    columns = [getattr(model, field) for field in fields if field != "email"]
+    return fields, (
+        db.query(User.email, *columns)
+        .join(Employee, Employee.employee_id == model.employee_id)
+        .join(User, User.id == Employee.user_id)
+        .order_by(model.employee_id)
+    )
+
+
+def _plain(value):
+    if hasattr(value, "value"):
+        return value.value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(fields: list[str], query, fmt: str) -> Iterator[str]:
+    """Serializa `query` como CSV o JSON Lines leyendo con cursor de servidor (yield_per)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(fields)
+    for row in query.execution_options(stream_results=True).yield_per(settings.BULK_BATCH_SIZE):
+        values = [_plain(value) for value in row]
+        if fmt == "csv":
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(fields, values)), ensure_ascii=False) + "\n")
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_rows(db: Session, kind: str, fmt: str) -> Iterator[str]:
+    if kind not in KINDS:
+        raise ValueError(f"Unsupported kind: {kind}")
+    fields, query = _export_query(db, kind)
+    return stream_rows(fields, query, fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import/export for PathExplorer")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import")
+    import_parser.add_argument("kind", choices=KINDS)
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=FORMATS)
+    export_parser = subparsers.add_parser("export")
+    export_parser.add_argument("kind", choices=KINDS)
+    export_parser.add_argument("--format", choices=FORMATS, default="csv")
+    args = parser.parse_args()
+
+    from dependencies import SessionLocal
+
+    with SessionLocal() as db:
+        if args.command == "import":
+            fmt = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+            with open(args.path, newline="", encoding="utf-8") as stream:
+                result = import_rows(db, args.kind, read_rows(stream, fmt))
+            json.dump(result, sys.stdout, indent=2, ensure_ascii=False)
+            print()
+        else:
+            for chunk in export_rows(db, args.kind, args.format):
+                sys.stdout.write(chunk)
+
+
+if __name__ == "__main__":
+    main()
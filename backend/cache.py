@@ -0,0 +1,172 @@
+import hashlib
+import secrets
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Protocol
+from fastapi import Request, Response
+from config import settings
+from serialization import adapter
+
+# Cache de respuestas de lectura por empleado (my-info, my-skills, my-goals, ...).
+# Cada usuario tiene una versión en el backend que los endpoints de escritura cambian;
+# el ETag se calcula solo con la versión, así un If-None-Match vigente responde 304
+# sin consultar la base. Los cuerpos serializados se guardan con TTL bajo su ETag.
+#
+# Con el backend en memoria cada instancia tiene sus propias versiones: también expiran
+# a los CACHE_TTL_SECONDS, lo que acota cuánto puede tardar otra instancia en ver un cambio.
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Any | None: ...
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None: ...
+    def delete(self, key: str) -> None: ...
+    def clear(self) -> None: ...
+
+
+class MemoryCache:
+    """Diccionario LRU con expiración por entrada, seguro entre hilos."""
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        expires = self.clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FakeCache(MemoryCache):
+    """Backend para pruebas: reloj manual (`advance`) y conteo de aciertos y fallos."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.now = 0.0
+        self.hits = 0
+        self.misses = 0
+        super().__init__(max_entries, clock=lambda: self.now)
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def get(self, key: str) -> Any | None:
+        value = super().get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+class NullCache:
+    """Desactiva el cache: cada lectura calcula la respuesta y un ETag nuevo."""
+
+    def get(self, key: str) -> Any | None:
+        return None
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        pass
+
+    def delete(self, key: str):
+        pass
+
+    def clear(self):
+        pass
+
+
+def _default_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "none":
+        return NullCache()
+    return MemoryCache(settings.CACHE_MAX_ENTRIES)
+
+
+_backend: CacheBackend = _default_backend()
+
+
+def set_backend(backend: CacheBackend):
+    """Cambia el backend (otro store compartido, o FakeCache en pruebas)."""
+    global _backend
+    _backend = backend
+
+
+def get_backend() -> CacheBackend:
+    return _backend
+
+
+def _version(key: str) -> str:
+    # Una versión ausente (nueva, expirada o desalojada) se reemplaza por un token
+    # aleatorio, nunca por un contador que pueda repetir un ETag ya entregado.
+    version = _backend.get(key)
+    if version is None:
+        version = secrets.token_hex(8)
+        _backend.set(key, version, settings.CACHE_TTL_SECONDS)
+    return version
+
+
+def bump(user_id: int):
+    """Invalida las respuestas cacheadas del usuario; llamar después del commit."""
+    _backend.set(f"version:{user_id}", secrets.token_hex(8), settings.CACHE_TTL_SECONDS)
+
+
+def bump_all():
+    """Invalida las respuestas de todos los usuarios (importaciones masivas)."""
+    _backend.set("version:*", secrets.token_hex(8), settings.CACHE_TTL_SECONDS)
+
+
+def etag(resource: str, user_id: int, *params) -> str:
+    raw = "|".join([resource, str(user_id), *map(str, params), _version("version:*"), _version(f"version:{user_id}")])
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest() + '"'
+
+
+def _matches(request: Request, tag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match usa comparación débil: W/"x" coincide con "x"
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in header.split(","))
+
+
+def cached_response(request: Request, resource: str, user_id: int, model, build: Callable[[], Any], *params, exclude_unset: bool = False) -> Response:
+    """Responde 304 si el cliente ya tiene la versión vigente; si no, sirve el cuerpo
+    cacheado o lo construye con `build()` y lo serializa con `model` (el response_model)."""
+    tag = etag(resource, user_id, *params)
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if _matches(request, tag):
+        return Response(status_code=304, headers=headers)
+
+    body = _backend.get(f"body:{tag}")
+    if body is None:
+        serializer = adapter(model)
+        body = serializer.dump_json(serializer.validate_python(build(), from_attributes=True), exclude_unset=exclude_unset)
+        _backend.set(f"body:{tag}", body, settings.CACHE_TTL_SECONDS)
+    return Response(content=body, media_type="application/json", headers=headers)
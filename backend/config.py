@@ -4,11 +4,82 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    # Llaves PEM para ALGORITHM asimétrico (RS256/ES256); en línea o como ruta a archivo
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PRIVATE_KEY_FILE: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    JWT_PUBLIC_KEY_FILE: str | None = None
+    JWT_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # Cache de respuestas con ETag (ver cache.py): "memory" o "none"
+    CACHE_BACKEND: str = "memory"
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_TTL_SECONDS: int = 300
+    # Foto en memoria del directorio (ver directory.py): vigencia máxima antes de
+    # reconstruirla con lo que escribieron otras instancias; 0 la desactiva
+    DIRECTORY_SNAPSHOT_TTL_SECONDS: int = 60
+    # Igual para la matriz de skills de los candidatos (ver matching.py)
+    SKILL_MATRIX_TTL_SECONDS: int = 60
+    # y para el calendario de asignaciones de staffing (ver scheduling.py)
+    SCHEDULE_CACHE_TTL_SECONDS: int = 60
+    # bcrypt: costo, ejecutor ("process", "thread" o "inline"), workers y cola máxima.
+    # Cada hash pendiente ocupa un hilo del threadpool de las rutas (40 en AnyIO) mientras
+    # espera, así que la cola debe quedar muy por debajo de ese límite.
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_EXECUTOR: str = "process"
+    BCRYPT_WORKERS: int = 2
+    BCRYPT_MAX_PENDING: int = 8
     DATABASE_URL: str
+    # Pool de conexiones. "null" abre/cierra una conexión por uso: para Vercel o
+    # cuando ya hay un pooler externo (PgBouncer, Supabase pooler) delante de la base.
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Instrumentación (ver metrics.py): umbral del log de consultas lentas y cuántas
+    # repeticiones de la misma sentencia en una petición se reportan como posible N+1
+    SLOW_QUERY_SECONDS: float = 0.5
+    N_PLUS_ONE_THRESHOLD: int = 10
+    # Bearer token que debe enviar el scraper a GET /metrics (sin definir, queda abierto);
+    # /metrics/pool y /metrics/tokens son solo para Managers
+    METRICS_TOKEN: str | None = None
+    # Límites por cliente de las rutas caras (ver ratelimit.py). RATE_LIMITS ajusta reglas por
+    # nombre como "peticiones/segundos", p. ej. {"login": "30/60"}. RATE_LIMIT_TRUST_PROXY
+    # toma la IP de X-Forwarded-For (solo detrás de un proxy propio, como en Vercel)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: dict[str, str] = {}
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_PROXY: bool = False
+    # Peticiones en curso antes de responder 503 (0 = sin límite); por defecto el tamaño
+    # del threadpool de AnyIO, más allá del cual las rutas síncronas solo harían cola
+    MAX_IN_FLIGHT_REQUESTS: int = 40
     smtp_port: int
     smtp_server: str
     smtp_user: str
     smtp_password: str
+    # "queue" entrega el correo en segundo plano; "inline" dentro de la petición (serverless)
+    MAIL_DELIVERY: str = "queue"
+    MAIL_WORKERS: int = 2
+    MAIL_MAX_RETRIES: int = 3
+    MAIL_RETRY_BACKOFF_SECONDS: float = 1.0
+    MAIL_STARTTLS: bool = True
+    # Códigos OTP: vigencia, intentos fallidos por código, envíos por correo dentro de la
+    # ventana y cada cuánto se borran los códigos vencidos
+    OTP_TTL_MINUTES: int = 60
+    OTP_MAX_ATTEMPTS: int = 5
+    OTP_SEND_LIMIT: int = 3
+    OTP_SEND_WINDOW_MINUTES: int = 60
+    OTP_SWEEP_SECONDS: int = 900
+    BULK_BATCH_SIZE: int = 1000
+    # Estado de certificaciones: "scheduled" lo recalcula un job diario dentro de la app;
+    # "legacy" conserva POST /certifications/refresh-status con update_certification_status()
+    CERTIFICATION_STATUS_MODE: str = "scheduled"
+    CERTIFICATION_STATUS_CHECK_SECONDS: int = 3600
+    # Días hacia adelante que cubre el digest diario de certificaciones por vencer
+    CERTIFICATION_DIGEST_DAYS: int = 30
     class Config:
         env_file = ".env"
 
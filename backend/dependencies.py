@@ -1,16 +1,39 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from utils import verify_token
-from schemas import TokenData
+from schemas import TokenData, Principal
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 from config import settings
+from metrics import pool_metrics, request_metrics, instrumented_pool
+from threading import Lock
+import time
 
-SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL 
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def engine_options(url: str) -> dict:
+    # SQLite (pruebas) conserva el pool por defecto de SQLAlchemy
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    if settings.DB_POOL_MODE == "null":
+        return {"poolclass": instrumented_pool(NullPool)}
+    return {
+        "poolclass": instrumented_pool(QueuePool),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autoflush=False, bind=engine)
+pool_metrics.attach(engine.pool)
+# Conteo y tiempo de SQL por petición; SessionLocal (jobs, streaming) cuenta como background
+request_metrics.attach(engine)
 
 Base = declarative_base()
 
@@ -34,4 +57,45 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
-    return TokenData(id=user_id)
\ No newline at end of file
+    return TokenData(id=user_id)
+
+
+# Cache de principals por proceso: user_id -> (expira_en, Principal)
+_principal_cache: dict[int, tuple[float, Principal]] = {}
+_principal_lock = Lock()
+
+def invalidate_principal(user_id: int):
+    with _principal_lock:
+        _principal_cache.pop(user_id, None)
+
+def get_current_principal(current_user: TokenData = Depends(get_current_user), db=Depends(get_db)) -> Principal:
+    now = time.monotonic()
+    with _principal_lock:
+        cached = _principal_cache.get(current_user.id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    # Import local para evitar el ciclo models -> dependencies
+    from models import User, Employee
+
+    row = (
+        db.query(User.id, User.email, Employee.employee_id, Employee.role, Employee.name, Employee.last_name_1)
+        .outerjoin(Employee, Employee.user_id == User.id)
+        .filter(User.id == current_user.id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if row.employee_id is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    principal = Principal(
+        user_id=row.id,
+        employee_id=row.employee_id,
+        email=row.email,
+        role=row.role,
+        display_name=row.name + " " + row.last_name_1,
+    )
+    with _principal_lock:
+        _principal_cache[current_user.id] = (now + settings.PRINCIPAL_CACHE_TTL_SECONDS, principal)
+    return principal
@@ -0,0 +1,220 @@
+import logging
+import math
+import time
+import numpy as np
+from threading import Lock, Thread
+from typing import Callable
+from pydantic import TypeAdapter
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from config import settings
+from dependencies import SessionLocal
+from models import Employee
+from schemas import EmployeeList
+
+# Foto en memoria del directorio de empleados para GET /users sin búsqueda. Columnas en
+# arreglos: rol, ubicación y capability codificados como enteros pequeños contra un
+# diccionario, y cada fila ya serializada como JSON de EmployeeList, así filtrar, ordenar
+# y paginar no tocan la base ni pydantic. El orden por id se calcula una vez y se reutiliza
+# hasta que cambia un empleado; el alfabético es el de la base (ALPHABETICAL_ORDER, con su
+# lower() y su collation), leído al reconstruir: un alta o un cambio de apellido lo
+# invalida y esas páginas van por SQL hasta la siguiente reconstrucción.
+#
+# Se actualiza por empleado desde las escrituras de esta instancia (registro y edición de
+# perfil). Las de otras instancias no llegan: la foto vence a los
+# DIRECTORY_SNAPSHOT_TTL_SECONDS y, mientras está vencida o invalidada, GET /users usa la
+# consulta SQL y la foto se reconstruye en segundo plano.
+
+logger = logging.getLogger(__name__)
+
+FIELDS = list(EmployeeList.model_fields)
+# Orden de GET /users?alphabetical=true, aquí y en la consulta SQL de routers/users.py
+ALPHABETICAL_ORDER = (func.lower(Employee.last_name_1), Employee.employee_id)
+_adapter = TypeAdapter(EmployeeList)
+
+
+class Dictionary:
+    """Valor -> código (posición en `values`), en orden de aparición."""
+
+    def __init__(self):
+        self.values: list = []
+        self.codes: dict = {}
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class _Columns:
+    def __init__(self):
+        self.rows: dict[int, int] = {}       # employee_id -> fila
+        self.size = 0
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.roles = np.zeros(0, dtype=np.uint8)
+        self.locations = np.zeros(0, dtype=np.uint16)
+        self.capabilities = np.zeros(0, dtype=np.uint16)
+        self.role_codes = Dictionary()
+        self.location_codes = Dictionary()
+        self.capability_codes = Dictionary()
+        self.last_names: list[str] = []
+        self.documents: list[bytes] = []
+        # alphabetical -> filas en orden; True solo existe si viene de la base
+        self.orders: dict[bool, np.ndarray] = {}
+
+    def _ensure_capacity(self, rows: int):
+        # Crece al doble para que las altas incrementales no copien los arreglos cada vez
+        if rows <= len(self.ids):
+            return
+        capacity = max(rows, len(self.ids) * 2, 64)
+        for name in ("ids", "roles", "locations", "capabilities"):
+            current = getattr(self, name)
+            grown = np.zeros(capacity, dtype=current.dtype)
+            grown[:self.size] = current[:self.size]
+            setattr(self, name, grown)
+
+    def _encode(self, column: str, codes: Dictionary, value) -> int:
+        code = codes.encode(value)
+        array = getattr(self, column)
+        if code > np.iinfo(array.dtype).max:
+            # Más valores distintos de los que caben: se ensancha la columna
+            setattr(self, column, array.astype(np.uint32))
+        return code
+
+    def set(self, employee_id: int, values: dict):
+        row = self.rows.get(employee_id)
+        if row is None:
+            row = self.rows[employee_id] = self.size
+            self._ensure_capacity(row + 1)
+            self.size += 1
+            self.last_names.append(values["last_name_1"])
+            self.documents.append(b"")
+            self.orders.clear()
+        elif self.last_names[row] != values["last_name_1"]:
+            self.last_names[row] = values["last_name_1"]
+            self.orders.pop(True, None)
+        self.ids[row] = employee_id
+        self.roles[row] = self._encode("roles", self.role_codes, values["role"])
+        self.locations[row] = self._encode("locations", self.location_codes, values["location"])
+        self.capabilities[row] = self._encode("capabilities", self.capability_codes, values["capability"])
+        self.documents[row] = _adapter.dump_json(EmployeeList.model_validate({field: values[field] for field in FIELDS}))
+
+    def order(self, alphabetical: bool) -> np.ndarray | None:
+        """Filas en el orden pedido, o None si el alfabético ya no coincide con el de la base."""
+        order = self.orders.get(alphabetical)
+        if order is None and not alphabetical:
+            order = self.orders[False] = np.argsort(self.ids[:self.size], kind="stable")
+        return order
+
+    def select(self, order: np.ndarray, filters: list[tuple[np.ndarray, Dictionary, object]]) -> np.ndarray:
+        """Filas de `order` que pasan los filtros de igualdad."""
+        for column, codes, value in filters:
+            if value is None:
+                continue
+            code = codes.codes.get(value)
+            if code is None:
+                return order[:0]
+            order = order[column[order] == code]
+        return order
+
+
+class DirectorySnapshot:
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = Lock()
+        self._columns = _Columns()
+        self._stale = True
+        self._built_at = 0.0
+        self._invalidations = 0
+        self._rebuilding = False
+        # Altas y cambios que llegan mientras se lee la base; se aplican a la foto nueva
+        self._pending: dict[int, dict] | None = None
+
+    def invalidate(self):
+        with self._lock:
+            self._stale = True
+            self._invalidations += 1
+
+    def _fresh(self) -> bool:
+        return not self._stale and self.clock() - self._built_at < self.ttl
+
+    def rebuild(self, db: Session):
+        with self._lock:
+            invalidations = self._invalidations
+            self._pending = {}
+        columns = _Columns()
+        # En el orden alfabético de la base: la fila i es la posición i
+        query = db.query(Employee.employee_id, *[getattr(Employee, field) for field in FIELDS]).order_by(*ALPHABETICAL_ORDER)
+        for row in query:
+            values = row._asdict()
+            columns.set(values.pop("employee_id"), values)
+        columns.orders[True] = np.arange(columns.size, dtype=np.int64)
+        with self._lock:
+            for employee_id, values in self._pending.items():
+                columns.set(employee_id, values)
+            self._pending = None
+            self._columns = columns
+            self._built_at = self.clock()
+            self._stale = self._invalidations != invalidations
+
+    def _rebuild_in_background(self):
+        try:
+            with SessionLocal() as db:
+                self.rebuild(db)
+        except Exception:
+            logger.exception("Directory snapshot rebuild failed")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                self._pending = None
+
+    def _schedule_rebuild(self):
+        # Se llama con el lock tomado
+        if not self._rebuilding:
+            self._rebuilding = True
+            Thread(target=self._rebuild_in_background, name="directory-snapshot", daemon=True).start()
+
+    def upsert(self, employee_id: int, values: dict):
+        """Alta o cambio de un empleado ya guardado (llamar después del commit)."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending[employee_id] = values
+            if self._fresh():
+                self._columns.set(employee_id, values)
+
+    def refresh_employee(self, db: Session, employee_id: int):
+        """Vuelve a leer un empleado tras editarlo."""
+        row = db.query(*[getattr(Employee, field) for field in FIELDS]).filter(Employee.employee_id == employee_id).first()
+        if row is None:
+            self.invalidate()
+        else:
+            self.upsert(employee_id, row._asdict())
+
+    def page(self, page: int, size: int, role=None, location: str | None = None, capability: str | None = None, alphabetical: bool = False) -> bytes | None:
+        """Cuerpo JSON de Page[EmployeeList], o None si la foto no está vigente (usar SQL)."""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            if not self._fresh():
+                self._schedule_rebuild()
+                return None
+            columns = self._columns
+            order = columns.order(alphabetical)
+            if order is None:
+                self._schedule_rebuild()
+                return None
+            rows = columns.select(order, [
+                (columns.roles, columns.role_codes, role),
+                (columns.locations, columns.location_codes, location),
+                (columns.capabilities, columns.capability_codes, capability),
+            ])
+            start = (page - 1) * size
+            items = b",".join(columns.documents[row] for row in rows[start:start + size])
+        total = len(rows)
+        return b'{"items":[%s],"total":%d,"page":%d,"size":%d,"pages":%d}' % (items, total, page, size, math.ceil(total / size))
+
+
+directory_snapshot = DirectorySnapshot(settings.DIRECTORY_SNAPSHOT_TTL_SECONDS)
@@ -0,0 +1,78 @@
+# Revisa con EXPLAIN que las consultas de las rutas más usadas usen índices: check(engine)
+# devuelve {consulta: tablas recorridas completas}. Lo corren tests/test_explain.py contra la
+# base de pruebas y tests/test_migrations.py contra el esquema de `alembic upgrade head`.
+#
+# En PostgreSQL se desactiva enable_seqscan: si aun así el plan tiene Seq Scan, no hay
+# índice utilizable (no depende del tamaño de las tablas ni de las estadísticas).
+import json
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select, text
+from models import User, Employee, Skill, Goal, Certification, Project, ProjectRole, RoleDeveloper, RoleSkill, OTP
+from schemas import SkillType
+
+TODAY = date(2026, 1, 1)
+
+# Mismos filtros que usan los routers (principal, perfil, skills, metas, certificaciones,
+# proyectos, staffing y OTP), con valores fijos
+HOT_QUERIES = {
+    "principal": select(User.id, User.email, Employee.employee_id, Employee.role)
+    .outerjoin(Employee, Employee.user_id == User.id).where(User.id == 1),
+    "employee_by_user": select(Employee.employee_id).where(Employee.user_id == 1),
+    "my_skills": select(Skill).where(Skill.employee_id == 1),
+    "my_skills_by_type": select(Skill).where(Skill.employee_id == 1, Skill.type == SkillType.hard),
+    "my_goals": select(Goal).where(Goal.employee_id == 1),
+    "goal_title": select(Goal.goal_id).where(Goal.employee_id == 1, func.lower(Goal.title) == "learn rust"),
+    "my_certifications": select(Certification).where(Certification.employee_id == 1),
+    "expiring_certifications": select(Certification).where(
+        Certification.employee_id == 1,
+        Certification.expiration_date >= TODAY,
+        Certification.expiration_date <= TODAY + timedelta(days=30),
+    ),
+    "manager_projects": select(Project.project_id).where(Project.manager_id == 1),
+    "project_roles": select(ProjectRole.role_id).where(ProjectRole.project_id == 1),
+    "role_skills": select(RoleSkill).where(RoleSkill.role_id == 1),
+    "role_developers": select(RoleDeveloper.developer_id).where(RoleDeveloper.project_role_id == 1),
+    "developer_assignments": select(RoleDeveloper.project_role_id).where(RoleDeveloper.developer_id == 1),
+    "otp_by_email": select(OTP.otp_id).where(OTP.email == "user1@bench.local"),
+    "otp_sweep": select(OTP.otp_id).where(OTP.expires_at <= datetime(2026, 1, 1)),
+}
+
+
+def _sql(statement, dialect) -> str:
+    return str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _postgres_scans(plan: dict) -> list[str]:
+    scans = [plan.get("Relation Name", "?")] if plan.get("Node Type") == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        scans += _postgres_scans(child)
+    return scans
+
+
+def sequential_scans(conn, statement) -> list[str]:
+    """Tablas que el plan recorre completas."""
+    sql = _sql(statement, conn.dialect)
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _postgres_scans(plan[0]["Plan"])
+    # SQLite: "SCAN <tabla>" sin índice es un recorrido completo; "SEARCH ... USING INDEX" no
+    scans = []
+    for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "INDEX" not in detail:
+            scans.append(detail.split()[1])
+    return scans
+
+
+def check(engine) -> dict[str, list[str]]:
+    failures = {}
+    for name, statement in HOT_QUERIES.items():
+        with engine.begin() as conn:
+            scans = sequential_scans(conn, statement)
+        if scans:
+            failures[name] = scans
+    return failures
+
@@ -0,0 +1,169 @@
+# Jobs programados dentro de la app. También se pueden lanzar a mano o desde cron:
+#
+#   python jobs.py certification-status [--force]
+#   python jobs.py certification-digest [--force]
+#   python jobs.py otp-sweep
+#   python jobs.py dashboard-rebuild
+import argparse
+import logging
+from datetime import date, datetime, timezone
+from threading import Event, Lock, Thread
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from config import settings
+from dependencies import SessionLocal
+from models import Certification, JobRun
+from analytics import dashboard_built, rebuild_dashboard
+from reports import CERTIFICATION_DIGEST_JOB, build_certification_digest
+import otp_store
+
+logger = logging.getLogger(__name__)
+
+CERTIFICATION_STATUS_JOB = "certification_status"
+# Llave del advisory lock de PostgreSQL: una sola instancia ejecuta el job a la vez
+_ADVISORY_LOCK_KEY = 0x43455254
+_local_lock = Lock()
+
+
+def certification_status(expiration_date: date, today: date | None = None) -> str:
+    """Estado de una certificación al escribirla; el job solo mueve las que vencen con el tiempo."""
+    return "expired" if expiration_date < (today or date.today()) else "active"
+
+
+def _run_daily(db: Session, name: str, work, today: date, force: bool) -> JobRun | None:
+    """Ejecuta `work(db, última fecha, hoy)` si no ha corrido hoy, con lock entre instancias."""
+    with _local_lock:
+        if db.get_bind().dialect.name == "postgresql":
+            if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY}).scalar():
+                db.rollback()
+                return None
+
+        run = db.get(JobRun, name)
+        if run is not None and run.last_run_date >= today and not force:
+            db.rollback()
+            return run
+
+        previous = run.last_run_date if run is not None and not force else None
+        updated = work(db, previous, today)
+        if run is None:
+            run = JobRun(name=name)
+            db.add(run)
+        run.last_run_date = today
+        run.last_run_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        run.updated = updated
+        db.commit()
+        logger.info("Job %s finished: %s rows", name, updated)
+        return run
+
+
+def _expire_certifications(db: Session, previous: date | None, today: date) -> int:
+    conditions = [Certification.expiration_date < today, Certification.status != "expired"]
+    if previous is not None:
+        conditions.append(Certification.expiration_date >= previous)
+    return db.query(Certification).filter(*conditions).update({"status": "expired"}, synchronize_session=False)
+
+
+def refresh_certification_status(db: Session, today: date | None = None, force: bool = False) -> JobRun | None:
+    """Marca como vencidas las certificaciones cuya fecha ya pasó; idempotente, una vez al día.
+
+    Un solo UPDATE sobre el índice de expiration_date, limitado a lo que venció desde la
+    última ejecución (todo el histórico la primera vez o con `force`). Devuelve None si
+    otra instancia tiene el lock.
+    """
+    return _run_daily(db, CERTIFICATION_STATUS_JOB, _expire_certifications, today or date.today(), force)
+
+
+def _build_digest(db: Session, previous: date | None, today: date) -> int:
+    return build_certification_digest(db, today)
+
+
+def refresh_certification_digest(db: Session, today: date | None = None, force: bool = False) -> JobRun | None:
+    """Regenera el digest de certificaciones que vencen en los próximos CERTIFICATION_DIGEST_DAYS."""
+    return _run_daily(db, CERTIFICATION_DIGEST_JOB, _build_digest, today or date.today(), force)
+
+
+def ensure_dashboard(db: Session):
+    """Construye los contadores del dashboard si aún no existen (base nueva o recién migrada)."""
+    if not dashboard_built(db):
+        rebuild_dashboard(db)
+
+
+def daily_jobs(db: Session):
+    ensure_dashboard(db)
+    refresh_certification_status(db)
+    refresh_certification_digest(db)
+
+
+def purge_expired_otps(db: Session) -> int:
+    """Borra los códigos OTP vencidos; idempotente, cualquier instancia puede correrlo."""
+    deleted = otp_store.purge_expired(db)
+    db.commit()
+    if deleted:
+        logger.info("Purged %s expired OTP codes", deleted)
+    return deleted
+
+
+def last_run(db: Session, name: str) -> JobRun | None:
+    return db.get(JobRun, name)
+
+
+class JobScheduler:
+    """Hilo de fondo que revisa cada `interval` segundos si toca ejecutar el job."""
+
+    def __init__(self, job, interval: float):
+        self.job = job
+        self.interval = interval
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._work, name="job-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                with SessionLocal() as db:
+                    self.job(db)
+            except Exception:
+                logger.exception("Scheduled job failed")
+            self._stop.wait(self.interval)
+
+
+certification_scheduler = JobScheduler(daily_jobs, settings.CERTIFICATION_STATUS_CHECK_SECONDS)
+otp_sweeper = JobScheduler(purge_expired_otps, settings.OTP_SWEEP_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduled jobs for PathExplorer")
+    parser.add_argument("job", choices=["certification-status", "certification-digest", "otp-sweep", "dashboard-rebuild"])
+    parser.add_argument("--force", action="store_true", help="recalcula todo el histórico aunque ya haya corrido hoy")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.job == "otp-sweep":
+            print(f"{purge_expired_otps(db)} expired OTP codes deleted")
+            return
+        if args.job == "dashboard-rebuild":
+            rebuild_dashboard(db)
+            print("Dashboard counters rebuilt")
+            return
+        job = refresh_certification_status if args.job == "certification-status" else refresh_certification_digest
+        run = job(db, force=args.force)
+        if run is None:
+            print("Another instance is running the job")
+        else:
+            print(f"{run.name}: last run {run.last_run_at:%Y-%m-%d %H:%M:%S}, {run.updated} updated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from config import settings
+from threading import Lock, Thread
+import logging, os, queue, smtplib, time
+
+logger = logging.getLogger(__name__)
+
+SENDER_EMAIL = "PathExplorer@test-dnvo4d97kjng5r86.mlsender.net"
+
+# Plantilla y logo se cargan una sola vez al importar el módulo
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png"), "rb") as img_file:
+    LOGO_DATA = img_file.read()
+
+OTP_TEMPLATE = """\
+<html lang="en">
+  <body style="margin:0;padding:0;background-color:#F9F9F9;font-family:Arial, sans-serif;">
+    <table width="100%" cellpadding="0" cellspacing="0" role="presentation">
+      <tr>
+        <td align="center" style="padding:40px 10px;">
+          <table width="600" cellpadding="0" cellspacing="0" role="presentation" style="background-color:#ffffff;border-radius:12px;box-shadow:0 4px 12px rgba(0,0,0,0.05);overflow:hidden;">
+            <!-- Header con logo incrustado -->
+            <tr>
+              <td style="background-color:#8338EC;padding:30px;text-align:center;">
+                <img src="cid:logo_image" alt="Logo" style="max-width:180px; width: 50%">
+              </td>
+            </tr>
+            <!-- Cuerpo del mensaje -->
+            <tr>
+              <td style="padding:30px;color:#1A1A1A;">
+                <p style="font-size:16px;line-height:1.6;">Hello Explorer,</p>
+                <p style="font-size:16px;line-height:1.6;">
+                  To reset your password, use the 6-digit code below. This code is valid for the next {otp_minutes} minutes:
+                </p>
+                <div style="text-align:center;margin:30px 0;">
+                  <div style="display:inline-block;padding:12px 24px;font-size:28px;font-weight:bold;letter-spacing:8px;background-color:#F4F1FF;color:#8338EC;border-radius:8px;">
+                    {otp_code}
+                  </div>
+                </div>
+                <p style="font-size:14px;line-height:1.6;color:#555;">
+                  If you didn’t request a password reset, please ignore this email or contact our support team.
+                </p>
+              </td>
+            </tr>
+            <!-- Footer -->
+            <tr>
+              <td style="background-color:#F0F0F0;text-align:center;padding:20px;color:#555;font-size:13px;">
+                © 2025 Path Explorer · All rights reserved<br/>
+                <a href="https://path-explorer.com" style="color:#8338EC;text-decoration:underline;">Visit our website</a>
+              </td>
+            </tr>
+          </table>
+        </td>
+      </tr>
+    </table>
+  </body>
+</html>
+    """
+
+
+def build_otp_message(receiver_email: str, otp_code: int) -> MIMEMultipart:
+    message = MIMEMultipart("alternative")
+    message["Subject"] = "OTP code for password reset"
+    message["From"] = SENDER_EMAIL
+    message["To"] = receiver_email
+    html = OTP_TEMPLATE.replace("{otp_code}", str(otp_code)).replace("{otp_minutes}", str(settings.OTP_TTL_MINUTES))
+    message.attach(MIMEText(html, "html"))
+
+    image = MIMEImage(LOGO_DATA)
+    image.add_header("Content-ID", "<logo_image>")
+    message.attach(image)
+    return message
+
+
+class SMTPTransport:
+    """Conexión SMTP autenticada que se reutiliza entre envíos y se reabre si se cae."""
+
+    def __init__(self, server: str, port: int, user: str, password: str, starttls: bool = True, timeout: float = 10):
+        self.server = server
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._smtp = None
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.user:
+            smtp.login(self.user, self.password)
+        self._smtp = smtp
+
+    def send(self, message: MIMEMultipart):
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.sendmail(message["From"], message["To"], message.as_string())
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # La conexión reutilizada pudo expirar en el servidor; se reintenta con una nueva
+            self.close()
+            self._connect()
+            self._smtp.sendmail(message["From"], message["To"], message.as_string())
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+
+def smtp_transport() -> SMTPTransport:
+    return SMTPTransport(settings.smtp_server, settings.smtp_port, settings.smtp_user, settings.smtp_password, settings.MAIL_STARTTLS)
+
+
+class MailQueue:
+    """Cola en memoria con un pool de workers; cada worker mantiene su propio transporte."""
+
+    def __init__(self, transport_factory=smtp_transport, workers: int = 2, max_retries: int = 3, backoff_seconds: float = 1.0):
+        self.transport_factory = transport_factory
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._queue: queue.Queue = queue.Queue()
+        self._threads: list[Thread] = []
+        self._lock = Lock()
+        self.sent = 0
+        self.failed = 0
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = Thread(target=self._work, name=f"mail-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def enqueue(self, message: MIMEMultipart):
+        self.start()
+        self._queue.put(message)
+
+    def join(self):
+        """Espera a que se procesen todos los mensajes encolados."""
+        self._queue.join()
+
+    def _work(self):
+        transport = self.transport_factory()
+        try:
+            while True:
+                message = self._queue.get()
+                try:
+                    if message is None:
+                        return
+                    self._deliver(transport, message)
+                finally:
+                    self._queue.task_done()
+        finally:
+            transport.close()
+
+    def _deliver(self, transport, message: MIMEMultipart):
+        for attempt in range(self.max_retries + 1):
+            try:
+                transport.send(message)
+                with self._lock:
+                    self.sent += 1
+                return
+            except Exception:
+                transport.close()
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self.failed += 1
+                    logger.exception("Could not deliver mail to %s", message["To"])
+                    return
+                time.sleep(self.backoff_seconds * 2 ** attempt)
+
+
+mail_queue = MailQueue(
+    workers=settings.MAIL_WORKERS,
+    max_retries=settings.MAIL_MAX_RETRIES,
+    backoff_seconds=settings.MAIL_RETRY_BACKOFF_SECONDS,
+)
+
+
+def send_mail(message: MIMEMultipart):
+    """Entrega `message` según MAIL_DELIVERY: en la cola de fondo o en la misma petición."""
+    if settings.MAIL_DELIVERY == "inline":
+        transport = smtp_transport()
+        try:
+            transport.send(message)
+        finally:
+            transport.close()
+    else:
+        mail_queue.enqueue(message)
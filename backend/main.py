@@ -1,10 +1,31 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi_pagination import add_pagination
+from mailer import mail_queue
+from utils import shutdown_password_executor
+from jobs import certification_scheduler, otp_sweeper
+from config import settings
+from metrics import InstrumentationMiddleware
+from ratelimit import RateLimitMiddleware
 
 # Routers
-from routers import auth, users, profile, otp, projects, skills, goals, certifications
+from routers import auth, users, profile, otp, projects, skills, goals, certifications, metrics, bulk, project_roles, staffing, dashboard
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.CERTIFICATION_STATUS_MODE == "scheduled":
+        certification_scheduler.start()
+    otp_sweeper.start()
+    yield
+    certification_scheduler.stop()
+    otp_sweeper.stop()
+    mail_queue.stop()
+    shutdown_password_executor()
+
+app = FastAPI(lifespan=lifespan)
+# El último que se agrega queda por fuera: la instrumentación también cuenta los 429/503
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(InstrumentationMiddleware)
 
 # Registro de routers
 app.include_router(auth.router)
@@ -15,5 +36,10 @@ app.include_router(projects.router)
 app.include_router(skills.router)
 app.include_router(goals.router)
 app.include_router(certifications.router)
+app.include_router(metrics.router)
+app.include_router(bulk.router)
+app.include_router(project_roles.router)
+app.include_router(staffing.router)
+app.include_router(dashboard.router)
 
 add_pagination(app)
@@ -0,0 +1,170 @@
+import time
+import numpy as np
+from threading import Lock
+from typing import Callable
+from sqlalchemy.orm import Session
+from config import settings
+from models import Employee, Skill
+from schemas import EmployeeRole
+
+# Niveles empleado × skill (dispersos) en memoria para puntuar candidatos a un ProjectRole.
+# Se construye por proceso, se actualiza por empleado cuando cambian sus skills y se
+# reconstruye a los SKILL_MATRIX_TTL_SECONDS para recoger las escrituras de otras instancias.
+
+
+def skill_key(name: str) -> str:
+    # "Python", " python " y "PYTHON" son la misma skill
+    return " ".join(name.split()).casefold()
+
+
+class _Levels:
+    """Niveles por empleado y skill, dispersos: cada skill guarda solo las filas de quienes la
+    tienen, así que la memoria crece con las skills asignadas y no con empleados × vocabulario.
+    Se arma fuera del lock y se reemplaza completo."""
+
+    def __init__(self):
+        self.rows: dict[int, int] = {}                  # employee_id -> fila
+        self.columns: dict[str, dict[int, float]] = {}  # skill -> {fila: nivel}
+        self.owned: dict[int, set[str]] = {}            # fila -> skills del empleado
+        self.employee_ids = np.zeros(0, dtype=np.int64)
+        self.eligible = np.zeros(0, dtype=bool)
+
+    def _ensure_capacity(self, rows: int):
+        # Crece al doble para que las altas incrementales no copien los arreglos cada vez
+        height = self.employee_ids.shape[0]
+        if rows <= height:
+            return
+        new_height = max(rows, height * 2, 64)
+        employee_ids = np.full(new_height, -1, dtype=np.int64)
+        employee_ids[:height] = self.employee_ids
+        self.employee_ids = employee_ids
+        eligible = np.zeros(new_height, dtype=bool)
+        eligible[:height] = self.eligible
+        self.eligible = eligible
+
+    def row(self, employee_id: int) -> int:
+        row = self.rows.get(employee_id)
+        if row is None:
+            row = len(self.rows)
+            self._ensure_capacity(row + 1)
+            self.rows[employee_id] = row
+            self.employee_ids[row] = employee_id
+        return row
+
+    def set_level(self, row: int, name: str, level):
+        key = skill_key(name)
+        column = self.columns.setdefault(key, {})
+        # Si el empleado repite una skill se toma el nivel más alto
+        column[row] = max(column.get(row, 0), level)
+        self.owned.setdefault(row, set()).add(key)
+
+    def set_employee(self, employee_id: int, role, skills):
+        row = self.row(employee_id)
+        self.eligible[row] = role == EmployeeRole.Developer
+        for key in self.owned.pop(row, ()):
+            column = self.columns[key]
+            del column[row]
+            # Una skill que ya nadie tiene sale del vocabulario
+            if not column:
+                del self.columns[key]
+        for name, level in skills:
+            self.set_level(row, name, level)
+
+    @classmethod
+    def load(cls, db: Session) -> "_Levels":
+        matrix = cls()
+        for employee_id, role in db.query(Employee.employee_id, Employee.role):
+            row = matrix.row(employee_id)
+            matrix.eligible[row] = role == EmployeeRole.Developer
+        for employee_id, name, level in db.query(Skill.employee_id, Skill.name, Skill.level):
+            matrix.set_level(matrix.row(employee_id), name, level)
+        return matrix
+
+
+class SkillMatrix:
+    """Matriz por proceso. Las escrituras de esta instancia la actualizan por empleado; las
+    de otras instancias no llegan, así que se reconstruye a los `ttl` segundos. Las consultas
+    a la base se hacen sin el lock: solo el cambio de matriz y la puntuación lo toman."""
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = Lock()
+        self._matrix = _Levels()
+        self._stale = True
+        self._built_at = 0.0
+        self._changes = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._stale = True
+            self._changes += 1
+
+    def _fresh(self) -> bool:
+        return not self._stale and self.clock() - self._built_at < self.ttl
+
+    def install(self, matrix: _Levels):
+        """Reemplaza la matriz por una armada a mano (benchmarks)."""
+        with self._lock:
+            self._matrix = matrix
+            self._built_at = self.clock()
+            self._stale = False
+
+    def _rebuild(self, db: Session):
+        with self._lock:
+            changes = self._changes
+        matrix = _Levels.load(db)
+        with self._lock:
+            self._matrix = matrix
+            self._built_at = self.clock()
+            # Un cambio durante la lectura puede faltar en la matriz nueva: se relee en la siguiente
+            self._stale = self._changes != changes
+
+    def refresh_employee(self, db: Session, employee_id: int):
+        """Vuelve a leer el rol y las skills de un empleado (tras añadir, editar o borrar una skill)."""
+        if not self._fresh():
+            return
+        role = db.query(Employee.role).filter(Employee.employee_id == employee_id).scalar()
+        skills = db.query(Skill.name, Skill.level).filter(Skill.employee_id == employee_id).all()
+        with self._lock:
+            self._matrix.set_employee(employee_id, role, skills)
+            self._changes += 1
+
+    def top_candidates(self, db: Session, requirements: list[tuple[str, int]], top_k: int) -> list[tuple[int, float, int]]:
+        """Devuelve (employee_id, puntaje, skills cubiertas) de los `top_k` Developers con mejor puntaje.
+
+        El puntaje es el promedio, sobre las skills requeridas, de min(nivel / nivel requerido, 1).
+        """
+        if not self._fresh():
+            self._rebuild(db)
+        with self._lock:
+            matrix = self._matrix
+            size = len(matrix.rows)
+            if size == 0 or not requirements:
+                return []
+            coverage = np.zeros(size, dtype=np.float32)
+            matched = np.zeros(size, dtype=np.int64)
+            for name, level in requirements:
+                column = matrix.columns.get(skill_key(name))
+                # Skill que nadie tiene: solo cuenta en el denominador
+                if column is None or level <= 0:
+                    continue
+                rows = np.fromiter(column.keys(), dtype=np.int64, count=len(column))
+                ratio = np.minimum(np.fromiter(column.values(), dtype=np.float32, count=len(column)) / np.float32(level), 1.0)
+                # Cada fila aparece una vez por skill: la suma por índice es segura
+                coverage[rows] += ratio
+                matched[rows] += ratio >= 1.0
+            scores = coverage / len(requirements)
+            scores = np.where(matrix.eligible[:size], scores, -1.0)
+            employee_ids = matrix.employee_ids[:size]
+
+        # Solo Developers con al menos una skill requerida
+        top_k = min(top_k, int(np.count_nonzero(scores > 0)))
+        if top_k == 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.lexsort((employee_ids[best], -scores[best]))]
+        return [(int(employee_ids[i]), round(float(scores[i]), 4), int(matched[i])) for i in best]
+
+
+skill_matrix = SkillMatrix(settings.SKILL_MATRIX_TTL_SECONDS)
@@ -0,0 +1,321 @@
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from threading import Lock
+import logging
+import time
+from config import settings
+
+# Límites (segundos) del histograma de espera al pedir una conexión al pool
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.waits = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.wait_buckets = [0] * len(WAIT_BUCKETS)
+            self.in_use = 0
+            self.in_use_peak = 0
+            self.connects = 0
+
+    def observe_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def _on_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.in_use_peak = max(self.in_use_peak, self.in_use)
+
+    def _on_checkin(self, *args):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def attach(self, pool):
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "in_use": self.in_use,
+                "in_use_peak": self.in_use_peak,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.waits, 6) if self.waits else 0.0,
+                "waits": self.waits,
+                "wait_buckets": dict(zip((str(b) for b in WAIT_BUCKETS), self.wait_buckets)),
+            }
+        if pool is not None:
+            data["pool"] = pool.__class__.__name__
+            if hasattr(pool, "size"):
+                data["size"] = pool.size()
+                data["overflow"] = pool.overflow()
+                data["idle"] = pool.checkedin()
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+def instrumented_pool(pool_class, metrics: PoolMetrics = pool_metrics):
+    """Subclase de `pool_class` que mide cuánto espera cada checkout por una conexión.
+    Las esperas van a `metrics`, que debe ser el mismo PoolMetrics que se adjunta al pool."""
+
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            metrics.observe_wait(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+# --- Instrumentación por petición -------------------------------------------------
+# InstrumentationMiddleware abre un RequestStats por petición (contextvar) y los hooks
+# de SQLAlchemy le suman cada consulta. Al terminar se acumula por ruta (la plantilla,
+# p. ej. /users/{user_id}, para no disparar la cardinalidad). GET /metrics lo expone
+# en formato de texto de Prometheus.
+
+logger = logging.getLogger("pathexplorer.sql")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "slow_queries", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slow_queries = 0
+        self.statements: Counter = Counter()
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries_per_request = Histogram(QUERY_BUCKETS)
+        self.statuses: Counter = Counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.n_plus_one = 0
+        self.slow_queries = 0
+
+
+class RequestMetrics:
+    def __init__(self, slow_query_seconds: float, n_plus_one_threshold: int):
+        self.slow_query_seconds = slow_query_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = Lock()
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+        # Consultas fuera de una petición (jobs, exportaciones en streaming)
+        self.background_queries = 0
+        self.background_db_seconds = 0.0
+        self.background_slow_queries = 0
+
+    def _route(self, key: tuple[str, str]) -> RouteMetrics:
+        route = self.routes.get(key)
+        if route is None:
+            route = self.routes[key] = RouteMetrics()
+        return route
+
+    def begin(self) -> RequestStats:
+        stats = RequestStats()
+        _request_stats.set(stats)
+        return stats
+
+    def end(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        repeated = [(statement, count) for statement, count in stats.statements.items() if count >= self.n_plus_one_threshold]
+        for statement, count in repeated:
+            logger.warning("Possible N+1 on %s %s: statement ran %d times: %s", method, route, count, " ".join(statement.split())[:300])
+        with self._lock:
+            metrics = self._route((method, route))
+            metrics.latency.observe(seconds)
+            metrics.queries_per_request.observe(stats.queries)
+            metrics.statuses[status] += 1
+            metrics.queries += stats.queries
+            metrics.db_seconds += stats.db_seconds
+            metrics.slow_queries += stats.slow_queries
+            metrics.n_plus_one += len(repeated)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _request_stats.get()
+        slow = seconds >= self.slow_query_seconds
+        if slow:
+            logger.warning("Slow query (%.3fs): %s", seconds, " ".join(statement.split())[:1000])
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+            stats.statements[statement] += 1
+            stats.slow_queries += slow
+        else:
+            with self._lock:
+                self.background_queries += 1
+                self.background_db_seconds += seconds
+                self.background_slow_queries += slow
+
+    def attach(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+            self.background_queries = 0
+            self.background_db_seconds = 0.0
+            self.background_slow_queries = 0
+
+
+request_metrics = RequestMetrics(settings.SLOW_QUERY_SECONDS, settings.N_PLUS_ONE_THRESHOLD)
+
+
+class InstrumentationMiddleware:
+    """Middleware ASGI: latencia, estado y consultas SQL por ruta."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = request_metrics.begin()
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            request_metrics.end(scope["method"], path, status, time.perf_counter() - start, stats)
+
+
+class Exposition:
+    """Arma el texto de Prometheus agrupando las muestras por familia."""
+
+    def __init__(self):
+        self.families: dict[str, tuple[str, str, list[str]]] = {}
+
+    def add(self, name: str, kind: str, help: str, value: float, suffix: str = "", **labels):
+        family = self.families.setdefault(name, (kind, help, []))
+        rendered = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        family[2].append(f"{name}{suffix}{{{rendered}}} {value}" if rendered else f"{name}{suffix} {value}")
+
+    def histogram(self, name: str, help: str, histogram: Histogram, **labels):
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            self.add(name, "histogram", help, count, "_bucket", **labels, le=bound)
+        self.add(name, "histogram", help, histogram.count, "_bucket", **labels, le="+Inf")
+        self.add(name, "histogram", help, round(histogram.sum, 6), "_sum", **labels)
+        self.add(name, "histogram", help, histogram.count, "_count", **labels)
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help, samples) in self.families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def request_exposition(exposition: Exposition):
+    with request_metrics._lock:
+        routes = sorted(request_metrics.routes.items())
+        for (method, route), metrics in routes:
+            labels = {"method": method, "route": route}
+            exposition.histogram("http_request_duration_seconds", "Request latency by route", metrics.latency, **labels)
+            for status, count in sorted(metrics.statuses.items()):
+                exposition.add("http_requests_total", "counter", "Requests by route and status", count, **labels, status=status)
+            exposition.histogram("db_queries_per_request", "SQL statements issued per request", metrics.queries_per_request, **labels)
+            exposition.add("db_queries_total", "counter", "SQL statements by route", metrics.queries, **labels)
+            exposition.add("db_query_seconds_total", "counter", "Time spent in SQL by route", round(metrics.db_seconds, 6), **labels)
+            exposition.add("db_slow_queries_total", "counter", "Statements slower than SLOW_QUERY_SECONDS", metrics.slow_queries, **labels)
+            exposition.add("db_n_plus_one_total", "counter", "Requests that repeated a statement N_PLUS_ONE_THRESHOLD times or more", metrics.n_plus_one, **labels)
+        background = {"method": "", "route": "background"}
+        exposition.add("db_queries_total", "counter", "SQL statements by route", request_metrics.background_queries, **background)
+        exposition.add("db_query_seconds_total", "counter", "Time spent in SQL by route", round(request_metrics.background_db_seconds, 6), **background)
+        exposition.add("db_slow_queries_total", "counter", "Statements slower than SLOW_QUERY_SECONDS", request_metrics.background_slow_queries, **background)
+
+
+def pool_exposition(exposition: Exposition, pool=None):
+    data = pool_metrics.snapshot(pool)
+    for key in ("checkouts", "connects", "timeouts"):
+        exposition.add(f"db_pool_{key}_total", "counter", f"Pool {key}", data[key])
+    # wait_buckets ya es acumulado (cada espera cuenta en todos los límites que no excede)
+    help = "Time waiting for a pooled connection"
+    for bound, count in data["wait_buckets"].items():
+        exposition.add("db_pool_wait_seconds", "histogram", help, count, "_bucket", le=bound)
+    exposition.add("db_pool_wait_seconds", "histogram", help, data["waits"], "_bucket", le="+Inf")
+    exposition.add("db_pool_wait_seconds", "histogram", help, data["wait_seconds_total"], "_sum")
+    exposition.add("db_pool_wait_seconds", "histogram", help, data["waits"], "_count")
+    exposition.add("db_pool_in_use", "gauge", "Connections checked out", data["in_use"])
+    exposition.add("db_pool_in_use_peak", "gauge", "Peak connections checked out", data["in_use_peak"])
+    for key in ("size", "overflow", "idle"):
+        if key in data:
+            exposition.add(f"db_pool_{key}", "gauge", f"Pool {key}", data[key])
@@ -0,0 +1,40 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from config import settings
+from dependencies import Base
+import models  # noqa: F401  registra las tablas en Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# DATABASE_URL es la URL síncrona (psycopg2 / sqlite); -x url=... la reemplaza
+url = context.get_x_argument(as_dictionary=True).get("url", settings.DATABASE_URL)
+target_metadata = Base.metadata
+
+
+def _options(url: str) -> dict:
+    # SQLite no soporta la mayoría de ALTER TABLE: Alembic recrea la tabla en modo batch
+    return {"render_as_batch": make_url(url).get_backend_name() == "sqlite", "compare_type": True}
+
+
+def run_migrations_offline():
+    context.configure(url=url, target_metadata=target_metadata, literal_binds=True, **_options(url))
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, **_options(url))
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,150 @@
+"""Esquema inicial (el que existía antes de las migraciones)
+
+Las bases creadas antes de este directorio ya lo tienen: `alembic stamp 0001_initial`.
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_initial"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+EMPLOYEE_ROLE = sa.Enum("Developer", "TFS", "Manager", name="employeerole")
+SKILL_TYPE = sa.Enum("hard", "soft", name="skilltype")
+
+
+def upgrade():
+    op.create_table(
+        "User",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("hashed_password", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_User_id", "User", ["id"])
+    op.create_index("ix_User_email", "User", ["email"], unique=True)
+
+    op.create_table(
+        "Employee",
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("User.id", ondelete="SET NULL"), unique=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("last_name_1", sa.String(100), nullable=False),
+        sa.Column("last_name_2", sa.String(100)),
+        sa.Column("phone_number", sa.String(50), nullable=False),
+        sa.Column("location", sa.String(100), nullable=False),
+        sa.Column("capability", sa.String(100), nullable=False),
+        sa.Column("position", sa.String(50), nullable=False),
+        sa.Column("seniority", sa.Integer(), nullable=False),
+        sa.Column("role", EMPLOYEE_ROLE, nullable=False),
+        sa.PrimaryKeyConstraint("employee_id"),
+    )
+    op.create_index("ix_Employee_employee_id", "Employee", ["employee_id"])
+
+    for table in ("Manager", "Developer"):
+        op.create_table(
+            table,
+            sa.Column("employee_id", sa.Integer(), sa.ForeignKey("Employee.employee_id", ondelete="CASCADE"), nullable=False),
+            sa.Column("staff_days", sa.Integer()),
+            sa.PrimaryKeyConstraint("employee_id"),
+        )
+    op.create_table(
+        "TFS",
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("Employee.employee_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("speciality_area", sa.String(100), nullable=False),
+        sa.PrimaryKeyConstraint("employee_id"),
+    )
+
+    op.create_table(
+        "OTP",
+        sa.Column("otp_id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(100), sa.ForeignKey("User.email", ondelete="CASCADE"), nullable=False),
+        sa.Column("otp", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("otp_id"),
+    )
+
+    op.create_table(
+        "Project",
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("projectname", sa.String(100)),
+        sa.Column("client", sa.String(100)),
+        sa.Column("description", sa.Text()),
+        sa.Column("startdate", sa.Date()),
+        sa.Column("enddate", sa.Date()),
+        sa.Column("manager_id", sa.Integer(), sa.ForeignKey("Manager.employee_id")),
+        sa.Column("employees_req", sa.Integer()),
+        sa.PrimaryKeyConstraint("project_id"),
+    )
+    op.create_index("ix_Project_project_id", "Project", ["project_id"])
+
+    op.create_table(
+        "ProjectRole",
+        sa.Column("role_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(100)),
+        sa.Column("description", sa.Text()),
+        sa.Column("feedback", sa.Text()),
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("Project.project_id", ondelete="SET NULL")),
+        sa.PrimaryKeyConstraint("role_id"),
+    )
+    op.create_index("ix_ProjectRole_role_id", "ProjectRole", ["role_id"])
+
+    op.create_table(
+        "RoleDeveloper",
+        sa.Column("role_log_id", sa.Integer(), nullable=False),
+        sa.Column("developer_id", sa.Integer(), sa.ForeignKey("Developer.employee_id", ondelete="CASCADE")),
+        sa.Column("project_role_id", sa.Integer(), sa.ForeignKey("ProjectRole.role_id", ondelete="CASCADE")),
+        sa.PrimaryKeyConstraint("role_log_id"),
+    )
+    op.create_index("ix_RoleDeveloper_role_log_id", "RoleDeveloper", ["role_log_id"])
+
+    op.create_table(
+        "Skill",
+        sa.Column("skill_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("level", sa.Integer(), nullable=False),
+        sa.Column("type", SKILL_TYPE, nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("Employee.employee_id", ondelete="CASCADE"), nullable=False),
+        sa.PrimaryKeyConstraint("skill_id"),
+    )
+    op.create_index("ix_Skill_skill_id", "Skill", ["skill_id"])
+
+    op.create_table(
+        "Goal",
+        sa.Column("goal_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(100), nullable=False),
+        sa.Column("category", sa.String(100), nullable=False),
+        sa.Column("description", sa.String(300), nullable=False),
+        sa.Column("term", sa.String(50), nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("Employee.employee_id", ondelete="CASCADE"), nullable=False),
+        sa.PrimaryKeyConstraint("goal_id"),
+    )
+    op.create_index("ix_Goal_goal_id", "Goal", ["goal_id"])
+
+    op.create_table(
+        "Certification",
+        sa.Column("certification_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("type", sa.String(100), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("certification_date", sa.Date(), nullable=False),
+        sa.Column("expiration_date", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("Employee.employee_id", ondelete="CASCADE"), nullable=False),
+        sa.PrimaryKeyConstraint("certification_id"),
+    )
+    op.create_index("ix_Certification_certification_id", "Certification", ["certification_id"])
+
+
+def downgrade():
+    for table in (
+        "Certification", "Goal", "Skill", "RoleDeveloper", "ProjectRole", "Project",
+        "OTP", "TFS", "Developer", "Manager", "Employee", "User",
+    ):
+        op.drop_table(table)
+    SKILL_TYPE.drop(op.get_bind(), checkfirst=True)
+    EMPLOYEE_ROLE.drop(op.get_bind(), checkfirst=True)
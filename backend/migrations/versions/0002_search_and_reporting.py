@@ -0,0 +1,140 @@
+"""Documentos de búsqueda, requisitos de roles, contadores del dashboard, jobs y digest
+
+Revision ID: 0002_search_and_reporting
+Revises: 0001_initial
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_search_and_reporting"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+# Mismas expresiones que las columnas Computed de models.py (ver search.py)
+SEARCH_COLUMNS = [
+    ("Employee", "search_document",
+     "lower(name || ' ' || last_name_1 || ' ' || coalesce(last_name_2, '') || ' ' || phone_number"
+     " || ' ' || location || ' ' || capability || ' ' || position)"),
+    ("Employee", "search_name", "lower(name || ' ' || last_name_1 || ' ' || coalesce(last_name_2, ''))"),
+    ("Project", "search_document",
+     "lower(coalesce(projectname, '') || ' ' || coalesce(client, '') || ' ' || coalesce(description, ''))"),
+]
+
+
+# Employee y Project como quedan en 0001: en SQLite, --sql no puede reflejar la tabla que
+# batch_alter_table recrea
+def _copy_from(table: str) -> sa.Table:
+    metadata = sa.MetaData()
+    sa.Table("User", metadata, sa.Column("id", sa.Integer(), primary_key=True))
+    sa.Table("Manager", metadata, sa.Column("employee_id", sa.Integer(), primary_key=True))
+    sa.Table(
+        "Employee", metadata,
+        sa.Column("employee_id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("User.id", ondelete="SET NULL"), unique=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("last_name_1", sa.String(100), nullable=False),
+        sa.Column("last_name_2", sa.String(100)),
+        sa.Column("phone_number", sa.String(50), nullable=False),
+        sa.Column("location", sa.String(100), nullable=False),
+        sa.Column("capability", sa.String(100), nullable=False),
+        sa.Column("position", sa.String(50), nullable=False),
+        sa.Column("seniority", sa.Integer(), nullable=False),
+        sa.Column("role", sa.Enum("Developer", "TFS", "Manager", name="employeerole"), nullable=False),
+        sa.Index("ix_Employee_employee_id", "employee_id"),
+    )
+    sa.Table(
+        "Project", metadata,
+        sa.Column("project_id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("projectname", sa.String(100)),
+        sa.Column("client", sa.String(100)),
+        sa.Column("description", sa.Text()),
+        sa.Column("startdate", sa.Date()),
+        sa.Column("enddate", sa.Date()),
+        sa.Column("manager_id", sa.Integer(), sa.ForeignKey("Manager.employee_id")),
+        sa.Column("employees_req", sa.Integer()),
+        sa.Index("ix_Project_project_id", "project_id"),
+    )
+    return metadata.tables[table]
+
+
+def _postgres() -> bool:
+    # get_context() funciona también en modo offline (--sql)
+    return op.get_context().dialect.name == "postgresql"
+
+
+def upgrade():
+    if _postgres():
+        # IF NOT EXISTS: algunas bases ya los tienen por search.create_search_indexes()
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table, column, expression in SEARCH_COLUMNS:
+            name = f"{table.lower()}_{column}"
+            op.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS {column} text GENERATED ALWAYS AS ({expression}) STORED')
+            op.execute(f'CREATE INDEX IF NOT EXISTS ix_{name}_tsv ON "{table}" USING gin (to_tsvector(\'simple\'::regconfig, {column}))')
+            op.execute(f'CREATE INDEX IF NOT EXISTS ix_{name}_trgm ON "{table}" USING gin ({column} gin_trgm_ops)')
+    else:
+        # ALTER TABLE de SQLite solo añade columnas VIRTUAL: la tabla se recrea para que queden
+        # STORED como en models.py. Las columnas de cada tabla van en un solo batch porque la
+        # copia de filas no sabe omitir una columna generada ya existente.
+        for table in ("Employee", "Project"):
+            copy_from = _copy_from(table) if op.get_context().as_sql else None
+            with op.batch_alter_table(table, recreate="always", copy_from=copy_from) as batch:
+                for search_table, column, expression in SEARCH_COLUMNS:
+                    if search_table == table:
+                        batch.add_column(sa.Column(column, sa.Text(), sa.Computed(expression, persisted=True)))
+
+    op.create_table(
+        "RoleSkill",
+        sa.Column("role_skill_id", sa.Integer(), nullable=False),
+        sa.Column("role_id", sa.Integer(), sa.ForeignKey("ProjectRole.role_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("level", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("role_skill_id"),
+    )
+    op.create_index("ix_RoleSkill_role_skill_id", "RoleSkill", ["role_skill_id"])
+    op.create_index("ix_RoleSkill_role_id", "RoleSkill", ["role_id"])
+
+    op.create_index("ix_Certification_expiration_date", "Certification", ["expiration_date"])
+    op.create_index("ix_certification_employee_expiration", "Certification", ["employee_id", "expiration_date"])
+
+    op.create_table(
+        "DashboardCounter",
+        sa.Column("scope", sa.Integer(), nullable=False),
+        sa.Column("metric", sa.String(50), nullable=False),
+        sa.Column("key", sa.String(100), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("scope", "metric", "key"),
+    )
+    op.create_table(
+        "JobRun",
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("last_run_date", sa.Date(), nullable=False),
+        sa.Column("last_run_at", sa.DateTime(), nullable=False),
+        sa.Column("updated", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.create_table(
+        "CertificationDigest",
+        sa.Column("certification_id", sa.Integer(), sa.ForeignKey("Certification.certification_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("expiration_date", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint("certification_id"),
+    )
+    op.create_index("ix_CertificationDigest_expiration_date", "CertificationDigest", ["expiration_date"])
+
+
+def downgrade():
+    op.drop_table("CertificationDigest")
+    op.drop_table("JobRun")
+    op.drop_table("DashboardCounter")
+    op.drop_index("ix_certification_employee_expiration", table_name="Certification")
+    op.drop_index("ix_Certification_expiration_date", table_name="Certification")
+    op.drop_table("RoleSkill")
+    for table, column, _ in SEARCH_COLUMNS:
+        if _postgres():
+            name = f"{table.lower()}_{column}"
+            op.execute(f"DROP INDEX IF EXISTS ix_{name}_trgm")
+            op.execute(f"DROP INDEX IF EXISTS ix_{name}_tsv")
+        # DROP COLUMN directo (SQLite >= 3.35): recrear la tabla copiaría las columnas generadas
+        op.drop_column(table, column)
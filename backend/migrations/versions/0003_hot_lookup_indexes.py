@@ -0,0 +1,44 @@
+"""Índices para las búsquedas por llave foránea de cada petición
+
+Employee.user_id ya está cubierto por su UNIQUE y Certification.employee_id por
+ix_certification_employee_expiration (0002). En PostgreSQL se crean con CONCURRENTLY
+para no bloquear escrituras en tablas grandes.
+
+Revision ID: 0003_hot_lookup_indexes
+Revises: 0002_search_and_reporting
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_hot_lookup_indexes"
+down_revision = "0002_search_and_reporting"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_skill_employee_type", "Skill", ["employee_id", "type"]),
+    ("ix_goal_employee_title", "Goal", ["employee_id", sa.text("lower(title)")]),
+    ("ix_project_manager", "Project", ["manager_id"]),
+    ("ix_projectrole_project", "ProjectRole", ["project_id"]),
+    ("ix_roledeveloper_role", "RoleDeveloper", ["project_role_id"]),
+    ("ix_roledeveloper_developer", "RoleDeveloper", ["developer_id"]),
+    ("ix_otp_email", "OTP", ["email"]),
+    ("ix_otp_otp", "OTP", ["otp"]),
+]
+
+
+def upgrade():
+    if op.get_context().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
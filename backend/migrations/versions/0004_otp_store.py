@@ -0,0 +1,40 @@
+"""OTP con vencimiento, intentos y límite de envíos; un código por correo
+
+Los códigos existentes no tienen vencimiento y se descartan: basta con pedir uno nuevo.
+ix_otp_otp deja de usarse (la verificación busca por correo) e ix_otp_email se reemplaza
+por un índice único.
+
+Revision ID: 0004_otp_store
+Revises: 0003_hot_lookup_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_otp_store"
+down_revision = "0003_hot_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('DELETE FROM "OTP"')
+    op.drop_index("ix_otp_otp", table_name="OTP", if_exists=True)
+    op.drop_index("ix_otp_email", table_name="OTP", if_exists=True)
+    with op.batch_alter_table("OTP") as batch:
+        batch.add_column(sa.Column("expires_at", sa.DateTime(), nullable=False))
+        batch.add_column(sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("sent_count", sa.Integer(), nullable=False, server_default="1"))
+        batch.add_column(sa.Column("window_start", sa.DateTime(), nullable=False))
+    op.create_index("ix_OTP_email", "OTP", ["email"], unique=True)
+    op.create_index("ix_otp_expires", "OTP", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_otp_expires", table_name="OTP")
+    op.drop_index("ix_OTP_email", table_name="OTP")
+    # DROP COLUMN directo (SQLite >= 3.35) también funciona con --sql, sin reflejar la tabla
+    for column in ("window_start", "sent_count", "attempts", "expires_at"):
+        op.drop_column("OTP", column)
+    op.create_index("ix_otp_email", "OTP", ["email"])
+    op.create_index("ix_otp_otp", "OTP", ["otp"])
@@ -0,0 +1,21 @@
+"""Versión de tokens por usuario para revocar refresh tokens al cambiar la contraseña
+
+Revision ID: 0005_token_version
+Revises: 0004_otp_store
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_token_version"
+down_revision = "0004_otp_store"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("User", sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    op.drop_column("User", "token_version")
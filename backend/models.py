@@ -4,11 +4,15 @@ from sqlalchemy import (
     Integer,
     String,
     Date,
+    DateTime,
     Text,
     ForeignKey,
+    Index,
+    Computed,
     Enum as SQLEnum,
+    func,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from schemas import EmployeeRole, SkillType
 
 # Tabla "User"
@@ -17,6 +21,8 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(Text, nullable=False)
+    # Va en los refresh tokens; sube al cambiar la contraseña y revoca los emitidos antes
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     # Relación uno-a-uno con Employee
     employee = relationship("Employee", back_populates="user", uselist=False)
 
@@ -24,6 +30,7 @@ class User(Base):
 class Employee(Base):
     __tablename__ = "Employee"
     employee_id = Column(Integer, primary_key=True, index=True, nullable=False)
+    # UNIQUE ya crea un índice en PostgreSQL y SQLite: es el que usa cada búsqueda por user_id
     user_id = Column(Integer, ForeignKey("User.id", ondelete="SET NULL"), unique=True)
     name = Column(String(100), nullable=False)
     last_name_1 = Column(String(100), nullable=False)
@@ -34,12 +41,26 @@ class Employee(Base):
     position = Column(String(50), nullable=False)
     seniority = Column(Integer, nullable=False)
     role = Column(SQLEnum(EmployeeRole), nullable=False)
+    # Documento de búsqueda precalculado por la base de datos (ver search.py)
+    search_document = deferred(Column(Text, Computed(
+        "lower(name || ' ' || last_name_1 || ' ' || coalesce(last_name_2, '') || ' ' || phone_number"
+        " || ' ' || location || ' ' || capability || ' ' || position)",
+        persisted=True,
+    )))
+    search_name = deferred(Column(Text, Computed(
+        "lower(name || ' ' || last_name_1 || ' ' || coalesce(last_name_2, ''))",
+        persisted=True,
+    )))
     
     user = relationship("User", back_populates="employee")
     # Relaciones opcionales con las subtablas (uno a uno)
     manager = relationship("Manager", uselist=False, back_populates="employee")
     developer = relationship("Developer", uselist=False, back_populates="employee")
     tfs = relationship("TFS", uselist=False, back_populates="employee")
+    # Colecciones del perfil; se cargan explícitamente con selectinload (ver profiles.py)
+    skills = relationship("Skill", passive_deletes=True, order_by="Skill.skill_id")
+    goals = relationship("Goal", passive_deletes=True, order_by="Goal.goal_id")
+    certifications = relationship("Certification", passive_deletes=True, order_by="Certification.certification_id")
 
 # Tabla "Manager"
 class Manager(Base):
@@ -65,12 +86,22 @@ class TFS(Base):
     
     employee = relationship("Employee", back_populates="tfs")
 
-# Tabla "OTP"
+# Tabla "OTP" – Un código vigente por correo (ver otp_store.py)
 class OTP(Base):
     __tablename__ = "OTP"
     otp_id = Column(Integer, primary_key=True, nullable=False)
-    email = Column(String(100), ForeignKey("User.email", ondelete="CASCADE"), nullable=False)
+    # Índice único: la verificación es una sola búsqueda por correo
+    email = Column(String(100), ForeignKey("User.email", ondelete="CASCADE"), unique=True, index=True, nullable=False)
     otp = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Envíos dentro de la ventana que empezó en window_start (límite por correo)
+    sent_count = Column(Integer, nullable=False, default=1)
+    window_start = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_otp_expires", "expires_at"),
+    )
 
 # Tabla "Project"
 class Project(Base):
@@ -83,6 +114,14 @@ class Project(Base):
     enddate = Column(Date)
     manager_id = Column(Integer, ForeignKey("Manager.employee_id"))
     employees_req = Column(Integer)
+    search_document = deferred(Column(Text, Computed(
+        "lower(coalesce(projectname, '') || ' ' || coalesce(client, '') || ' ' || coalesce(description, ''))",
+        persisted=True,
+    )))
+
+    __table_args__ = (
+        Index("ix_project_manager", "manager_id"),
+    )
 
 # Tabla "ProjectRole" – Roles necesarios para un proyecto
 class ProjectRole(Base):
@@ -93,6 +132,18 @@ class ProjectRole(Base):
     feedback = Column(Text)
     project_id = Column(Integer, ForeignKey("Project.project_id", ondelete="SET NULL"))
 
+    __table_args__ = (
+        Index("ix_projectrole_project", "project_id"),
+    )
+
+# Tabla "RoleSkill" – Skills (y nivel mínimo) que requiere un ProjectRole
+class RoleSkill(Base):
+    __tablename__ = "RoleSkill"
+    role_skill_id = Column(Integer, primary_key=True, index=True, nullable=False)
+    role_id = Column(Integer, ForeignKey("ProjectRole.role_id", ondelete="CASCADE"), index=True, nullable=False)
+    name = Column(String(100), nullable=False)
+    level = Column(Integer, nullable=False)
+
 # Tabla "RoleDeveloper" – Registra la asignación de un Role (ProjectRole) a un Developer (histórico)
 class RoleDeveloper(Base):
     __tablename__ = "RoleDeveloper"
@@ -100,6 +151,11 @@ class RoleDeveloper(Base):
     developer_id = Column(Integer, ForeignKey("Developer.employee_id", ondelete="CASCADE"))
     project_role_id = Column(Integer, ForeignKey("ProjectRole.role_id", ondelete="CASCADE"))
 
+    __table_args__ = (
+        Index("ix_roledeveloper_role", "project_role_id"),
+        Index("ix_roledeveloper_developer", "developer_id"),
+    )
+
 
 class Skill(Base):
     __tablename__ = "Skill"
@@ -109,6 +165,11 @@ class Skill(Base):
     level = Column(Integer, nullable=False)
     type = Column(SQLEnum(SkillType), nullable=False)
     employee_id = Column(Integer, ForeignKey("Employee.employee_id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        # /skills/my-skills (con o sin filtro de tipo) y el refresco de la matriz de skills
+        Index("ix_skill_employee_type", "employee_id", "type"),
+    )
     
 class Goal(Base):
     __tablename__ = "Goal"
@@ -119,6 +180,11 @@ class Goal(Base):
     description = Column(String(300), nullable=False)
     term = Column(String(50), nullable=False)
     employee_id = Column(Integer, ForeignKey("Employee.employee_id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        # Metas del empleado y la verificación de título repetido (lower(title) = ...)
+        Index("ix_goal_employee_title", employee_id, func.lower(title)),
+    )
     
 class Certification(Base):
     __tablename__ = "Certification"
@@ -128,6 +194,38 @@ class Certification(Base):
     type = Column(String(100), nullable=False)
     description = Column(String, nullable=True)
     certification_date = Column(Date, nullable=False)
-    expiration_date = Column(Date, nullable=False)
+    expiration_date = Column(Date, nullable=False, index=True)
     status = Column(String(50), nullable=False, default="active")
-    employee_id = Column(Integer, ForeignKey("Employee.employee_id", ondelete="CASCADE"), nullable=False)
\ No newline at end of file
+    employee_id = Column(Integer, ForeignKey("Employee.employee_id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        # Certificaciones de un empleado por vencimiento (/expiring y el reporte)
+        Index("ix_certification_employee_expiration", "employee_id", "expiration_date"),
+    )
+
+# Tabla "DashboardCounter" – Agregados del dashboard mantenidos por incrementos (ver analytics.py)
+class DashboardCounter(Base):
+    __tablename__ = "DashboardCounter"
+
+    # scope 0 = toda la organización; si no, el employee_id
+    scope = Column(Integer, primary_key=True, nullable=False, default=0)
+    metric = Column(String(50), primary_key=True, nullable=False)
+    key = Column(String(100), primary_key=True, nullable=False)
+    value = Column(Integer, nullable=False, default=0)
+
+# Tabla "JobRun" – Última ejecución de cada job programado (compartida entre instancias)
+class JobRun(Base):
+    __tablename__ = "JobRun"
+
+    name = Column(String(50), primary_key=True, nullable=False)
+    last_run_date = Column(Date, nullable=False)
+    last_run_at = Column(DateTime, nullable=False)
+    updated = Column(Integer, nullable=False, default=0)
+
+# Tabla "CertificationDigest" – Certificaciones que vencen en la ventana del digest diario
+class CertificationDigest(Base):
+    __tablename__ = "CertificationDigest"
+
+    certification_id = Column(Integer, ForeignKey("Certification.certification_id", ondelete="CASCADE"), primary_key=True, nullable=False)
+    employee_id = Column(Integer, nullable=False)
+    expiration_date = Column(Date, nullable=False, index=True)
@@ -0,0 +1,109 @@
+import hmac
+import math
+import secrets
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import case, delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import settings
+from models import OTP
+
+# Códigos OTP para restablecer la contraseña, guardados en la tabla OTP con una fila por
+# correo (UNIQUE): emitir y verificar son búsquedas por índice, sin importar cuántos
+# códigos haya. Vive en la base y no en memoria para que /otp/send y /otp/verify
+# funcionen aunque caigan en instancias distintas.
+#
+# Cada código vence a los OTP_TTL_MINUTES y se bloquea tras OTP_MAX_ATTEMPTS intentos
+# fallidos; un correo puede pedir OTP_SEND_LIMIT códigos por ventana. La fila se conserva
+# hasta que vencen el código y la ventana, así borrar no reinicia el límite; purge_expired()
+# la elimina después (jobs.py lo corre cada OTP_SWEEP_SECONDS).
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _too_many(detail: str, retry_after: timedelta) -> HTTPException:
+    seconds = max(1, math.ceil(retry_after.total_seconds()))
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(seconds)})
+
+
+def issue(db: Session, email: str, now: datetime | None = None) -> int:
+    """Genera un código nuevo para `email`, reemplazando el anterior, y hace commit.
+
+    Lanza 429 si el correo ya pidió OTP_SEND_LIMIT códigos en la ventana actual.
+    """
+    now = now or _now()
+    window = timedelta(minutes=settings.OTP_SEND_WINDOW_MINUTES)
+    code = 100000 + secrets.randbelow(900000)
+    values = {"otp": code, "expires_at": now + timedelta(minutes=settings.OTP_TTL_MINUTES), "attempts": 0}
+
+    # Un solo UPDATE condicionado al límite: dos envíos simultáneos no pueden pasarlo
+    window_over = OTP.window_start <= now - window
+    result = db.execute(
+        update(OTP)
+        .where(OTP.email == email, or_(window_over, OTP.sent_count < settings.OTP_SEND_LIMIT))
+        .values(
+            **values,
+            sent_count=case((window_over, 1), else_=OTP.sent_count + 1),
+            window_start=case((window_over, now), else_=OTP.window_start),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        window_start = db.query(OTP.window_start).filter(OTP.email == email).scalar()
+        if window_start is not None:
+            db.rollback()
+            raise _too_many("Too many codes requested, try again later", window_start + window - now)
+        db.add(OTP(email=email, sent_count=1, window_start=now, **values))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Otra petición creó la fila del mismo correo al mismo tiempo
+        db.rollback()
+        raise _too_many("Too many codes requested, try again later", timedelta(seconds=1))
+    return code
+
+
+def consume(db: Session, email: str, code: int, now: datetime | None = None):
+    """Valida el código de `email` y lo invalida, sin commit: quien llama aplica el cambio
+    de contraseña en la misma transacción. Un intento fallido sí se guarda (con commit)
+    antes de lanzar la excepción."""
+    now = now or _now()
+    row = db.query(OTP.otp, OTP.expires_at, OTP.attempts).filter(OTP.email == email).first()
+    if row is None or row.expires_at <= now:
+        raise HTTPException(status_code=404, detail="OTP not found")
+    if row.attempts >= settings.OTP_MAX_ATTEMPTS:
+        raise _too_many("Too many attempts, request a new code", row.expires_at - now)
+
+    if not hmac.compare_digest(str(row.otp).encode(), str(code).encode()):
+        db.execute(
+            update(OTP).where(OTP.email == email).values(attempts=OTP.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        raise HTTPException(status_code=400, detail="Invalid OTP")
+
+    # Condicionado al código y al contador: de dos verificaciones simultáneas solo una lo consume.
+    # La fila se conserva con el código vencido (0 nunca es un código válido) para que la
+    # ventana de envíos siga contando; purge_expired() la borra cuando termina.
+    consumed = db.execute(
+        update(OTP)
+        .where(OTP.email == email, OTP.otp == code, OTP.attempts < settings.OTP_MAX_ATTEMPTS, OTP.expires_at > now)
+        .values(otp=0, expires_at=now, attempts=0)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if consumed == 0:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="OTP not found")
+
+
+def purge_expired(db: Session, now: datetime | None = None) -> int:
+    """Borra los códigos vencidos cuya ventana de envíos ya terminó; sin commit."""
+    now = now or _now()
+    return db.execute(
+        delete(OTP)
+        .where(OTP.expires_at <= now, OTP.window_start <= now - timedelta(minutes=settings.OTP_SEND_WINDOW_MINUTES))
+        .execution_options(synchronize_session=False)
+    ).rowcount
@@ -0,0 +1,69 @@
+from collections import Counter
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, joinedload, selectinload
+from models import Employee
+from schemas import FullProfile, RoleDetails, EmployeeRole
+from analytics import read_counters
+
+# Perfil completo de un empleado para la página de perfil. Employee, User y la subtabla
+# del rol salen en un solo SELECT (uno a uno); cada colección pedida suma un SELECT ... IN
+# con selectinload. Como máximo 4 consultas, sin importar cuántas skills/metas/certificaciones.
+
+PROFILE_SECTIONS = ("role_details", "skills", "goals", "certifications", "certification_types")
+_COLLECTIONS = ("skills", "goals", "certifications")
+_ROLE_TABLES = {EmployeeRole.Manager: "manager", EmployeeRole.Developer: "developer", EmployeeRole.TFS: "tfs"}
+
+
+def parse_sections(fields: str | None) -> tuple[str, ...]:
+    """`fields` separado por comas; None o vacío = todas las secciones."""
+    if not fields:
+        return PROFILE_SECTIONS
+    sections = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = sections - set(PROFILE_SECTIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(PROFILE_SECTIONS)}")
+    return tuple(section for section in PROFILE_SECTIONS if section in sections)
+
+
+def load_full_profile(db: Session, user_id: int, sections: tuple[str, ...]) -> FullProfile:
+    options = [joinedload(Employee.user, innerjoin=True)]
+    if "role_details" in sections:
+        options += [joinedload(Employee.manager), joinedload(Employee.developer), joinedload(Employee.tfs)]
+    for collection in _COLLECTIONS:
+        if collection in sections:
+            options.append(selectinload(getattr(Employee, collection)))
+
+    employee = db.query(Employee).options(*options).filter(Employee.user_id == user_id).first()
+    if employee is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    profile = {
+        "user_id": employee.user.id,
+        "employee_id": employee.employee_id,
+        "email": employee.user.email,
+        "name": employee.name,
+        "last_name_1": employee.last_name_1,
+        "last_name_2": employee.last_name_2,
+        "phone_number": employee.phone_number,
+        "location": employee.location,
+        "capability": employee.capability,
+        "position": employee.position,
+        "seniority": employee.seniority,
+        "role": employee.role,
+    }
+    if "role_details" in sections:
+        details = getattr(employee, _ROLE_TABLES.get(employee.role, ""), None)
+        profile["role_details"] = RoleDetails(
+            staff_days=getattr(details, "staff_days", None),
+            speciality_area=getattr(details, "speciality_area", None),
+        ) if details is not None else None
+    for collection in _COLLECTIONS:
+        if collection in sections:
+            profile[collection] = getattr(employee, collection)
+    if "certification_types" in sections:
+        if "certifications" in sections:
+            counts = Counter(cert.type for cert in employee.certifications)
+        else:
+            counts = read_counters(db, employee.employee_id, "certifications_by_type").get("certifications_by_type", {})
+        profile["certification_types"] = [{"type": type, "count": count} for type, count in counts.items()]
+    return FullProfile.model_validate(profile, from_attributes=True)
@@ -0,0 +1,235 @@
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from threading import Lock
+from typing import Callable, Protocol
+from urllib.parse import parse_qs
+from fastapi.responses import JSONResponse
+from config import settings
+from metrics import Exposition
+from utils import token_cache
+
+# Límites por cliente para las rutas caras (bcrypt, SMTP, búsquedas) y control de admisión
+# global. Cada regla es un token bucket de `requests` peticiones que se recarga completo en
+# `seconds`, por IP o por usuario (el del token ya verificado; si no, la IP). Con `query` la
+# regla solo aplica cuando la petición trae ese parámetro. Las rutas que comparten nombre de regla comparten bucket. Exceder una regla responde 429; con más de
+# MAX_IN_FLIGHT_REQUESTS peticiones en curso se responde 503 antes de ocupar un hilo del
+# threadpool o una conexión del pool.
+#
+# Con el backend en memoria cada instancia lleva sus propios buckets (el límite efectivo
+# se multiplica por el número de instancias); set_backend() permite uno compartido.
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    requests: int
+    seconds: float
+    key: str = "ip"
+    query: str | None = None
+
+
+# (método, ruta) -> regla; se ajustan por nombre con RATE_LIMITS (p. ej. {"login": "30/60"})
+RULES: dict[tuple[str, str], Rule] = {
+    ("POST", "/auth/token"): Rule("login", 30, 60),
+    ("POST", "/auth/refresh"): Rule("refresh", 60, 60),
+    ("POST", "/auth/register"): Rule("register", 20, 3600),
+    ("POST", "/otp/send"): Rule("otp_send", 10, 3600),
+    ("POST", "/otp/verify"): Rule("otp_verify", 20, 3600),
+    ("GET", "/users"): Rule("search", 120, 60, "user", query="search"),
+    ("GET", "/projects"): Rule("search", 120, 60, "user"),
+    ("GET", "/projects/cursor"): Rule("search", 120, 60, "user"),
+    ("GET", "/users/export"): Rule("export", 10, 60, "user"),
+}
+
+# Sin control de admisión: el monitoreo debe responder justo cuando hay sobrecarga
+ADMISSION_EXEMPT = ("/metrics",)
+
+
+class RateLimitBackend(Protocol):
+    def take(self, key: str, capacity: float, per_second: float) -> float:
+        """Consume un token del bucket; devuelve 0 o los segundos hasta que haya uno."""
+        ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryBuckets:
+    """Token buckets en un LRU acotado, seguro entre hilos. Desalojar un bucket equivale
+    a dejarlo lleno, así que `max_keys` debe cubrir a los clientes activos de la ventana."""
+
+    def __init__(self, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def take(self, key: str, capacity: float, per_second: float) -> float:
+        with self._lock:
+            now = self.clock()
+            tokens, last = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * per_second)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / per_second
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+_backend: RateLimitBackend = MemoryBuckets(settings.RATE_LIMIT_MAX_KEYS)
+
+
+def set_backend(backend: RateLimitBackend):
+    """Cambia el backend (uno compartido entre instancias, o uno con reloj manual en pruebas)."""
+    global _backend
+    _backend = backend
+
+
+def get_backend() -> RateLimitBackend:
+    return _backend
+
+
+def configured_rules() -> dict[tuple[str, str], Rule]:
+    rules = {}
+    for route, rule in RULES.items():
+        override = settings.RATE_LIMITS.get(rule.name)
+        if override:
+            requests, seconds = override.split("/")
+            rule = replace(rule, requests=int(requests), seconds=float(seconds))
+        rules[route] = rule
+    return rules
+
+
+class Admission:
+    """Cuenta las peticiones en curso y rechaza las que exceden el máximo."""
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = Lock()
+
+    def enter(self) -> bool:
+        with self._lock:
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                return False
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+class RateLimitStats:
+    def __init__(self):
+        self._lock = Lock()
+        self.limited: dict[str, int] = {}
+        self.shed = 0
+
+    def record_limited(self, rule: str):
+        with self._lock:
+            self.limited[rule] = self.limited.get(rule, 0) + 1
+
+    def record_shed(self):
+        with self._lock:
+            self.shed += 1
+
+    def reset(self):
+        with self._lock:
+            self.limited.clear()
+            self.shed = 0
+
+
+admission = Admission(settings.MAX_IN_FLIGHT_REQUESTS)
+rate_limit_stats = RateLimitStats()
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_ip(scope) -> str:
+    if settings.RATE_LIMIT_TRUST_PROXY:
+        # Solo detrás de un proxy que reescribe el encabezado; si no, el cliente lo falsifica
+        forwarded = _header(scope, b"x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _identity(scope, rule: Rule) -> str:
+    if rule.key == "user":
+        authorization = _header(scope, b"authorization") or ""
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            # Sin verificar la firma en el event loop: solo se usan tokens que get_current_principal
+            # ya verificó y dejó en el cache. Un token nuevo o falsificado cuenta contra su IP.
+            payload = token_cache.peek(token)
+            if payload is not None and payload.get("type", "access") == "access" and payload.get("id") is not None:
+                return f"user:{payload['id']}"
+    return f"ip:{client_ip(scope)}"
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI: token buckets por regla y cliente, y límite global de peticiones en curso."""
+
+    def __init__(self, app, rules: dict[tuple[str, str], Rule] | None = None):
+        self.app = app
+        self.rules = configured_rules() if rules is None else rules
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            return await self.app(scope, receive, send)
+
+        path = scope["path"].rstrip("/") or "/"
+        rule = self.rules.get((scope["method"], path))
+        if rule is not None and rule.query and rule.query not in parse_qs(scope["query_string"].decode("latin-1")):
+            rule = None
+        if rule is not None:
+            wait = _backend.take(f"{rule.name}:{_identity(scope, rule)}", rule.requests, rule.requests / rule.seconds)
+            if wait:
+                rate_limit_stats.record_limited(rule.name)
+                response = JSONResponse(
+                    {"detail": "Too many requests, try again later"},
+                    status_code=429,
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+                return await response(scope, receive, send)
+
+        if path.startswith(ADMISSION_EXEMPT):
+            return await self.app(scope, receive, send)
+        if not admission.enter():
+            rate_limit_stats.record_shed()
+            response = JSONResponse({"detail": "Server busy, try again shortly"}, status_code=503, headers={"Retry-After": "1"})
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.leave()
+
+
+def rate_limit_exposition(exposition: Exposition):
+    with rate_limit_stats._lock:
+        for rule, count in sorted(rate_limit_stats.limited.items()):
+            exposition.add("rate_limited_requests_total", "counter", "Requests rejected with 429 by rule", count, rule=rule)
+        exposition.add("shed_requests_total", "counter", "Requests rejected with 503 by admission control", rate_limit_stats.shed)
+    exposition.add("requests_in_flight", "gauge", "Requests being served", admission.in_flight)
+    exposition.add("requests_in_flight_peak", "gauge", "Peak requests being served", admission.peak)
@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from config import settings
+from models import Certification, CertificationDigest, Employee, JobRun
+
+# Reporte de certificaciones por vencer para managers. Para la ventana por defecto se
+# lee el digest que el job diario deja en CertificationDigest (costo proporcional al
+# resultado); para ventanas más largas se consulta Certification por su índice de vencimiento.
+
+CERTIFICATION_DIGEST_JOB = "certification_digest"
+REPORT_GROUPS = ("employee", "capability")
+REPORT_FIELDS = ["certification_id", "name", "type", "expiration_date", "status", "employee_id", "employee_name", "capability"]
+
+
+def build_certification_digest(db: Session, today: date) -> int:
+    """Reemplaza el digest con las certificaciones que vencen en [today, today + CERTIFICATION_DIGEST_DAYS]; no hace commit."""
+    db.execute(delete(CertificationDigest))
+    window = select(Certification.certification_id, Certification.employee_id, Certification.expiration_date).where(
+        Certification.expiration_date >= today,
+        Certification.expiration_date <= today + timedelta(days=settings.CERTIFICATION_DIGEST_DAYS),
+    )
+    result = db.execute(insert(CertificationDigest).from_select(["certification_id", "employee_id", "expiration_date"], window))
+    return result.rowcount
+
+
+def digest_certification(db: Session, certification_id: int, employee_id: int, expiration_date: date | None):
+    """Mantiene el digest al día cuando se crea, edita (`expiration_date`) o borra (None) una certificación."""
+    digest_certifications(db, [(certification_id, employee_id, expiration_date)])
+
+
+def digest_certifications(db: Session, certifications: list[tuple[int, int, date | None]]):
+    """Versión por lote de digest_certification: (certification_id, employee_id, expiration_date | None)."""
+    if not certifications:
+        return
+    db.execute(delete(CertificationDigest).where(CertificationDigest.certification_id.in_([cert[0] for cert in certifications])))
+    today = date.today()
+    end = today + timedelta(days=settings.CERTIFICATION_DIGEST_DAYS)
+    rows = [
+        {"certification_id": certification_id, "employee_id": employee_id, "expiration_date": expiration_date}
+        for certification_id, employee_id, expiration_date in certifications
+        if expiration_date is not None and today <= expiration_date <= end
+    ]
+    if rows:
+        db.execute(insert(CertificationDigest), rows)
+
+
+def _digest_is_current(db: Session, today: date) -> bool:
+    run = db.get(JobRun, CERTIFICATION_DIGEST_JOB)
+    return run is not None and run.last_run_date == today
+
+
+def expiring_certifications(db: Session, days: int, group_by: str = "employee", today: date | None = None):
+    """Query con las columnas REPORT_FIELDS, ordenada por grupo y fecha de vencimiento."""
+    today = today or date.today()
+    end = today + timedelta(days=days)
+    query = db.query(
+        Certification.certification_id,
+        Certification.name,
+        Certification.type,
+        Certification.expiration_date,
+        Certification.status,
+        Employee.employee_id,
+        (Employee.name + " " + Employee.last_name_1).label("employee_name"),
+        Employee.capability,
+    )
+    if days <= settings.CERTIFICATION_DIGEST_DAYS and _digest_is_current(db, today):
+        query = (
+            query.select_from(CertificationDigest)
+            .join(Certification, Certification.certification_id == CertificationDigest.certification_id)
+            .filter(CertificationDigest.expiration_date >= today, CertificationDigest.expiration_date <= end)
+        )
+    else:
+        query = query.filter(Certification.expiration_date >= today, Certification.expiration_date <= end)
+    query = query.join(Employee, Employee.employee_id == Certification.employee_id)
+
+    if group_by == "capability":
+        return query.order_by(Employee.capability, Employee.employee_id, Certification.expiration_date)
+    return query.order_by(Employee.employee_id, Certification.expiration_date)
@@ -2,25 +2,48 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from dependencies import get_db
-from schemas import UserCreate, UserBase
+from schemas import UserCreate, UserBase, RefreshRequest, EmployeeRole
 from models import User, Employee, OTP
-from utils import create_access_token
-from utils import hash_password, verify_password
+from utils import create_access_token, create_refresh_token, verify_refresh_token
+from utils import hash_password, verify_password, password_needs_rehash
+from search import invalidate_employee_search
+from directory import directory_snapshot
+from scheduling import schedule_cache
+from analytics import apply_deltas, employee_deltas
+import logging
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
+logger = logging.getLogger(__name__)
 
 @router.post("/token")
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     email = form_data.username.strip().lower()
     password = form_data.password
-    print(f"Login attempt for email: {email}")
+    logger.info("Login attempt for email: %s", email)
     user = db.query(User).filter(User.email == email).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     if not verify_password(password, user.hashed_password.encode("utf-8")):
         raise HTTPException(status_code=401, detail="Incorrect password")
+    # Actualiza el hash si se guardó con otro costo de bcrypt
+    if password_needs_rehash(user.hashed_password.encode("utf-8")):
+        user.hashed_password = hash_password(password).decode("utf-8")
+        db.commit()
     access_token = create_access_token(data={"id": user.id})
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = create_refresh_token(data={"id": user.id, "ver": user.token_version})
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.post("/refresh")
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    payload = verify_refresh_token(body.refresh_token)
+    user_id = payload.get("id")
+    version = db.query(User.token_version).filter(User.id == user_id).scalar() if user_id is not None else None
+    # Un cambio de contraseña sube la versión e invalida los refresh tokens anteriores
+    if version is None or payload.get("ver", 0) != version:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    access_token = create_access_token(data={"id": user_id})
+    refresh_token = create_refresh_token(data={"id": user_id, "ver": version})
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.post("/register")
 def register(user: UserCreate, db: Session = Depends(get_db)):
@@ -30,10 +53,8 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     hashed_password = hash_password(user.password).decode('utf-8')
     new_user = User(email=email, hashed_password=hashed_password)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    print("User created successfully")
-    user_id = db.query(User).filter(User.email == email).first().id
+    db.flush()
+    user_id = new_user.id
     new_employee = Employee(
         user_id=user_id,
         name=user.name,
@@ -47,8 +68,16 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         role=user.role
     )
     db.add(new_employee)
+    apply_deltas(db, employee_deltas(user.model_dump()))
+    db.flush()
+    employee_id = new_employee.employee_id
+    # Usuario y empleado se guardan en una sola transacción
     db.commit()
-    employee_id = db.query(Employee).filter(Employee.user_id == user_id).first().employee_id
-    print("User registered successfully")
+    invalidate_employee_search()
+    directory_snapshot.upsert(employee_id, user.model_dump())
+    if user.role == EmployeeRole.Developer:
+        schedule_cache.invalidate()
+    logger.info("User registered: %s", user_id)
     access_token = create_access_token(data={"id": user_id})
-    return {"message": "User registered successfully", "user_id": user_id, "employee_id":employee_id,"access_token": access_token, "token_type": "bearer"}
+    refresh_token = create_refresh_token(data={"id": user_id, "ver": 0})
+    return {"message": "User registered successfully", "user_id": user_id, "employee_id":employee_id,"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
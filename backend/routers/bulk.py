@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from schemas import EmployeeRole, Principal
+from dependencies import get_current_principal, get_db, SessionLocal
+from bulk import KINDS, FORMATS, read_rows, import_rows, export_rows
+import io
+
+router = APIRouter(prefix="/bulk", tags=["Bulk"])
+
+MEDIA_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+def _check_request(principal: Principal, kind: str, format: str | None):
+    if principal.role != EmployeeRole.Manager:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if kind not in KINDS:
+        raise HTTPException(status_code=404, detail="Unknown bulk kind")
+    if format is not None and format not in FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+
+
+@router.post("/import/{kind}")
+def bulk_import(
+    kind: str,
+    file: UploadFile = File(...),
+    format: str = None,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    _check_request(principal, kind, format)
+    fmt = format or ("jsonl" if (file.filename or "").endswith((".jsonl", ".ndjson")) else "csv")
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return import_rows(db, kind, read_rows(stream, fmt))
+    except (UnicodeDecodeError, ValueError) as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid input file: {e}")
+    finally:
+        stream.detach()
+
+
+def _stream_export(kind: str, fmt: str):
+    # Sesión propia: el generador se consume después de que termina el endpoint
+    with SessionLocal() as db:
+        yield from export_rows(db, kind, fmt)
+
+
+@router.get("/export/{kind}")
+def bulk_export(kind: str, format: str = "csv", principal: Principal = Depends(get_current_principal)):
+    _check_request(principal, kind, format)
+    return StreamingResponse(
+        _stream_export(kind, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+    )
@@ -1,116 +1,199 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List
 from datetime import date, timedelta
-from sqlalchemy import func
-from models import Certification, Employee
-from schemas import User, CertificationCreate, CertificationResponse
-from dependencies import get_db, get_current_user
+from models import Certification
+from schemas import Principal, EmployeeRole, CertificationCreate, CertificationResponse, CertificationBatch, BatchResult
+from dependencies import get_db, get_current_principal, SessionLocal
+from analytics import apply_deltas, certification_deltas, read_counters
+from config import settings
+from jobs import CERTIFICATION_STATUS_JOB, certification_status, last_run
+from reports import REPORT_FIELDS, REPORT_GROUPS, digest_certification, digest_certifications, expiring_certifications
+from bulk import stream_rows
+from cache import bump, bump_all, cached_response
+from batch import apply_batch
+from serialization import as_dicts, columns
+from collections import Counter
 
 router = APIRouter(prefix="/certifications", tags=["Certifications"])
 
-@router.post("/add", response_model=CertificationResponse)
-def add_certification(cert: CertificationCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
+CERTIFICATION_COLUMNS = columns(Certification, CertificationResponse)
 
+@router.post("/add", response_model=CertificationResponse)
+def add_certification(cert: CertificationCreate, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
     new_cert = Certification(
         name=cert.name,
         type=cert.type,
         description=cert.description,
         certification_date=cert.certification_date,
         expiration_date=cert.expiration_date,
-        employee_id=employee.employee_id,
-        status="active"  # Esto se actualizará luego con la función si aplica
+        employee_id=principal.employee_id,
+        # Luego el job diario la marca como vencida cuando pase la fecha (ver jobs.py)
+        status=certification_status(cert.expiration_date)
     )
     db.add(new_cert)
+    db.flush()
+    apply_deltas(db, certification_deltas(principal.employee_id, cert.type))
+    digest_certification(db, new_cert.certification_id, principal.employee_id, cert.expiration_date)
     db.commit()
+    bump(principal.user_id)
     db.refresh(new_cert)
     return new_cert
 
 
 @router.get("/my-certifications", response_model=List[CertificationResponse])
-def get_my_certifications(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    certs = db.query(Certification).filter(Certification.employee_id == employee.employee_id).all()
-    return certs
+def get_my_certifications(request: Request, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    # El estado cambia con la fecha (job diario): la fecha entra en el ETag
+    return cached_response(
+        request, "certifications", principal.user_id, List[CertificationResponse],
+        lambda: as_dicts(db.query(*CERTIFICATION_COLUMNS).filter(Certification.employee_id == principal.employee_id).all()),
+        date.today(),
+    )
 
 
 @router.put("/update/{certification_id}", response_model=CertificationResponse)
-def update_certification(certification_id: int, updated: CertificationCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    cert = db.query(Certification).filter(Certification.certification_id == certification_id, Certification.employee_id == employee.employee_id).first()
+def update_certification(certification_id: int, updated: CertificationCreate, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    cert = db.query(Certification).filter(Certification.certification_id == certification_id, Certification.employee_id == principal.employee_id).first()
     if not cert:
         raise HTTPException(status_code=404, detail="Certification not found")
 
+    if cert.type != updated.type:
+        deltas = certification_deltas(principal.employee_id, cert.type, -1)
+        deltas.update(certification_deltas(principal.employee_id, updated.type))
+        apply_deltas(db, deltas)
     cert.name = updated.name
     cert.type = updated.type
     cert.description = updated.description
     cert.certification_date = updated.certification_date
     cert.expiration_date = updated.expiration_date
+    cert.status = certification_status(updated.expiration_date)
+    digest_certification(db, certification_id, principal.employee_id, updated.expiration_date)
     db.commit()
+    bump(principal.user_id)
     db.refresh(cert)
     return cert
 
 
 @router.delete("/delete/{certification_id}", status_code=204)
-def delete_certification(certification_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    cert = db.query(Certification).filter(Certification.certification_id == certification_id, Certification.employee_id == employee.employee_id).first()
+def delete_certification(certification_id: int, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    cert = db.query(Certification).filter(Certification.certification_id == certification_id, Certification.employee_id == principal.employee_id).first()
     if not cert:
         raise HTTPException(status_code=404, detail="Certification not found")
 
+    digest_certification(db, certification_id, principal.employee_id, None)
     db.delete(cert)
+    apply_deltas(db, certification_deltas(principal.employee_id, cert.type, -1))
     db.commit()
+    bump(principal.user_id)
     return
 
 
+@router.post("/batch", response_model=BatchResult)
+def batch_certifications(batch: CertificationBatch, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    employee_id = principal.employee_id
+    outcome = apply_batch(
+        db, Certification, employee_id, batch,
+        values=lambda value: {**value, "status": certification_status(value["expiration_date"])},
+    )
+    deltas = Counter()
+    digest = []
+    for value in outcome.created:
+        deltas.update(certification_deltas(employee_id, value["type"]))
+        digest.append((value["certification_id"], employee_id, value["expiration_date"]))
+    for previous, value in outcome.updated:
+        if previous.type != value["type"]:
+            deltas.update(certification_deltas(employee_id, previous.type, -1))
+            deltas.update(certification_deltas(employee_id, value["type"]))
+        digest.append((previous.certification_id, employee_id, value["expiration_date"]))
+    for previous in outcome.deleted:
+        deltas.update(certification_deltas(employee_id, previous.type, -1))
+        digest.append((previous.certification_id, employee_id, None))
+    apply_deltas(db, deltas)
+    digest_certifications(db, digest)
+    db.commit()
+    bump(principal.user_id)
+    return outcome.summary()
+
+
 @router.post("/refresh-status")
-def refresh_certification_status(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def refresh_certification_status(db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    if settings.CERTIFICATION_STATUS_MODE != "legacy":
+        # El job diario mantiene el estado; aquí solo se informa su última ejecución
+        run = last_run(db, CERTIFICATION_STATUS_JOB)
+        return {
+            "message": "Certification statuses are updated daily",
+            "last_run_at": run.last_run_at if run else None,
+            "updated": run.updated if run else 0,
+        }
     try:
         db.execute(text("SELECT update_certification_status();"))
         db.commit()
+        bump_all()
         return {"message": "Certification statuses updated successfully"}
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/expiring", response_model=List[CertificationResponse])
-def get_expiring_certifications(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
+def get_expiring_certifications(
+    days: int = Query(30, ge=0, le=3650),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
     today = date.today()
-    upcoming = today + timedelta(days=30)
+    upcoming = today + timedelta(days=days)
 
+    # Rango acotado por ambos lados sobre el índice (employee_id, expiration_date)
     certs = db.query(Certification).filter(
-        Certification.employee_id == employee.employee_id,
+        Certification.employee_id == principal.employee_id,
+        Certification.expiration_date >= today,
         Certification.expiration_date <= upcoming
-    ).all()
+    ).order_by(Certification.expiration_date).all()
 
     return certs
 
 
-@router.get("/types/count")
-def get_certification_type_count(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
+def _stream_report(days: int, group_by: str, fmt: str):
+    # Sesión propia: el generador se consume después de que termina el endpoint
+    with SessionLocal() as db:
+        yield from stream_rows(REPORT_FIELDS, expiring_certifications(db, days, group_by), fmt)
+
+
+@router.get("/report/expiring")
+def get_expiring_report(
+    days: int = Query(30, ge=0, le=3650),
+    group_by: str = "employee",
+    format: str = "json",
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    if principal.role != EmployeeRole.Manager:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if group_by not in REPORT_GROUPS:
+        raise HTTPException(status_code=400, detail="group_by must be employee or capability")
+
+    if format in ("csv", "ndjson"):
+        return StreamingResponse(
+            _stream_report(days, group_by, format),
+            media_type="text/csv" if format == "csv" else "application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="expiring-certifications.{format}"'},
+        )
+    if format != "json":
+        raise HTTPException(status_code=400, detail="Unsupported format")
+
+    groups = []
+    for row in expiring_certifications(db, days, group_by):
+        key = row.capability if group_by == "capability" else row.employee_id
+        if not groups or groups[-1]["key"] != key:
+            groups.append({"key": key, "label": row.capability if group_by == "capability" else row.employee_name, "certifications": []})
+        groups[-1]["certifications"].append(dict(zip(REPORT_FIELDS, row)))
+    return {"days": days, "group_by": group_by, "groups": groups}
 
-    result = db.query(Certification.type, func.count(Certification.type)).filter(
-        Certification.employee_id == employee.employee_id
-    ).group_by(Certification.type).all()
 
-    return {"counts": [{"type": t, "count": c} for t, c in result]}
\ No newline at end of file
+@router.get("/types/count")
+def get_certification_type_count(db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    # Contadores precalculados (ver analytics.py) en lugar de GROUP BY por petición
+    counts = read_counters(db, principal.employee_id, "certifications_by_type").get("certifications_by_type", {})
+    return {"counts": [{"type": t, "count": c} for t, c in counts.items()]}
\ No newline at end of file
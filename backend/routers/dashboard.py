@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from schemas import EmployeeRole, Principal
+from dependencies import get_current_principal, get_db
+from analytics import read_counters, rebuild_dashboard
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+def _check_dashboard(principal: Principal):
+    if principal.role != EmployeeRole.Manager and principal.role != EmployeeRole.TFS:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+@router.get("")
+def get_dashboard(db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    _check_dashboard(principal)
+    counters = read_counters(db)
+    staffing = counters.pop("staffing", {})
+    required, filled = staffing.get("required", 0), staffing.get("filled", 0)
+    counters["staffing"] = {
+        "required": required,
+        "filled": filled,
+        "fill_rate": round(filled / required, 4) if required else None,
+    }
+    return counters
+
+
+@router.post("/rebuild")
+def rebuild(db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    if principal.role != EmployeeRole.Manager:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    rebuild_dashboard(db)
+    return {"message": "Dashboard rebuilt successfully"}
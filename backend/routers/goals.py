@@ -1,22 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from schemas import User, GoalCreate, GoalResponse
-from models import Goal, Employee
-from dependencies import get_current_user, get_db
+from schemas import Principal, GoalCreate, GoalResponse, GoalBatch, BatchResult
+from models import Goal
+from dependencies import get_current_principal, get_db
+from cache import bump, cached_response
+from batch import apply_batch
+from serialization import as_dicts, columns
 from typing import List
+from collections import Counter
 
 router = APIRouter(prefix="/goals", tags=["Goals"])
 
+GOAL_COLUMNS = columns(Goal, GoalResponse)
+
 @router.post("/add", response_model=GoalResponse)
-def add_goal(goal: GoalCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    # Evitar metas duplicadas con mismo título para el mismo usuario
-    existing = db.query(Goal).filter(
-        Goal.employee_id == employee.employee_id,
-        Goal.title.ilike(goal.title)
+def add_goal(goal: GoalCreate, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    # Evitar metas duplicadas con mismo título para el mismo usuario (usa ix_goal_employee_title)
+    existing = db.query(Goal.goal_id).filter(
+        Goal.employee_id == principal.employee_id,
+        func.lower(Goal.title) == goal.title.lower()
     ).first()
     if existing:
         raise HTTPException(status_code=400, detail="Goal with this title already exists")
@@ -26,46 +29,38 @@ def add_goal(goal: GoalCreate, db: Session = Depends(get_db), current_user: User
         category=goal.category,
         description=goal.description,
         term=goal.term,
-        employee_id=employee.employee_id
+        employee_id=principal.employee_id
     )
     db.add(new_goal)
     db.commit()
+    bump(principal.user_id)
     db.refresh(new_goal)
     return new_goal
 
 
 @router.get("/my-goals", response_model=List[GoalResponse])
-def get_my_goals(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    goals = db.query(Goal).filter(Goal.employee_id == employee.employee_id).all()
-    return goals
+def get_my_goals(request: Request, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    return cached_response(
+        request, "goals", principal.user_id, List[GoalResponse],
+        lambda: as_dicts(db.query(*GOAL_COLUMNS).filter(Goal.employee_id == principal.employee_id).all()),
+    )
 
 
 @router.delete("/delete/{goal_id}", status_code=204)
-def delete_goal(goal_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    goal = db.query(Goal).filter(Goal.goal_id == goal_id, Goal.employee_id == employee.employee_id).first()
+def delete_goal(goal_id: int, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    goal = db.query(Goal).filter(Goal.goal_id == goal_id, Goal.employee_id == principal.employee_id).first()
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
 
     db.delete(goal)
     db.commit()
+    bump(principal.user_id)
     return
 
 
 @router.put("/update/{goal_id}", response_model=GoalResponse)
-def update_goal(goal_id: int, updated_goal: GoalCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    goal = db.query(Goal).filter(Goal.goal_id == goal_id, Goal.employee_id == employee.employee_id).first()
+def update_goal(goal_id: int, updated_goal: GoalCreate, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    goal = db.query(Goal).filter(Goal.goal_id == goal_id, Goal.employee_id == principal.employee_id).first()
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
 
@@ -74,5 +69,34 @@ def update_goal(goal_id: int, updated_goal: GoalCreate, db: Session = Depends(ge
     goal.description = updated_goal.description
     goal.term = updated_goal.term
     db.commit()
+    bump(principal.user_id)
     db.refresh(goal)
     return goal
+
+
+@router.post("/batch", response_model=BatchResult)
+def batch_goals(batch: GoalBatch, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    # Misma regla que /add: sin títulos repetidos (sin distinguir mayúsculas) para el usuario.
+    # Los títulos de las metas que se borran en el lote quedan libres; cada update libera el
+    # suyo y toma el nuevo, en el orden del lote.
+    deleting = set(batch.delete)
+    titles = Counter(
+        title.lower()
+        for goal_id, title in db.query(Goal.goal_id, Goal.title).filter(Goal.employee_id == principal.employee_id)
+        if goal_id not in deleting
+    )
+
+    def reject(value: dict, previous):
+        title = value["title"].lower()
+        current = previous.title.lower() if previous is not None else None
+        if title != current and titles[title] > 0:
+            return "Goal with this title already exists"
+        if current is not None:
+            titles[current] -= 1
+        titles[title] += 1
+        return None
+
+    outcome = apply_batch(db, Goal, principal.employee_id, batch, reject=reject)
+    db.commit()
+    bump(principal.user_id)
+    return outcome.summary()
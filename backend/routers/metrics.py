@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from schemas import EmployeeRole, Principal
+from dependencies import get_current_principal, engine
+from metrics import pool_metrics, Exposition, request_exposition, pool_exposition
+from utils import token_cache
+from ratelimit import rate_limit_exposition
+from config import settings
+import hmac
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+def _check_scraper(request: Request):
+    # Prometheus envía METRICS_TOKEN como bearer_token; sin configurar queda abierto
+    if not settings.METRICS_TOKEN:
+        return
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
+
+def _check_manager(principal: Principal = Depends(get_current_principal)):
+    if principal.role != EmployeeRole.Manager:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+@router.get("", response_class=PlainTextResponse, dependencies=[Depends(_check_scraper)])
+def get_prometheus_metrics():
+    # Formato de texto de Prometheus: latencia y SQL por ruta, pool, límites y cache de tokens
+    exposition = Exposition()
+    request_exposition(exposition)
+    pool_exposition(exposition, engine.pool)
+    rate_limit_exposition(exposition)
+    tokens = token_cache.snapshot()
+    exposition.add("jwt_cache_hits_total", "counter", "Token cache hits", tokens["hits"])
+    exposition.add("jwt_cache_misses_total", "counter", "Token cache misses", tokens["misses"])
+    exposition.add("jwt_cache_size", "gauge", "Cached tokens", tokens["size"])
+    return PlainTextResponse(exposition.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@router.get("/pool", dependencies=[Depends(_check_manager)])
+def get_pool_metrics():
+    return pool_metrics.snapshot(engine.pool)
+
+@router.get("/tokens", dependencies=[Depends(_check_manager)])
+def get_token_metrics():
+    return token_cache.snapshot()
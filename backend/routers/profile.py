@@ -1,18 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from schemas import User, UserEdit, EmployeeRegistered
+from schemas import User, UserEdit, EmployeeRegistered, FullProfile, Principal
 from models import User as UserModel, Employee
-from dependencies import get_current_user, get_db
+from dependencies import get_current_user, get_current_principal, invalidate_principal, get_db
 from utils import hash_password
+from search import invalidate_employee_search
+from directory import directory_snapshot
+from matching import skill_matrix
+from scheduling import schedule_cache
+from analytics import EMPLOYEE_METRICS, apply_deltas, employee_deltas
+from cache import bump, cached_response
+from profiles import load_full_profile, parse_sections
+from datetime import date
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
 
 @router.get("/my-info", response_model=EmployeeRegistered)
-def get_my_info(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(UserModel.id == current_user.id).first()
-    if user is None:
+def get_my_info(request: Request, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    return cached_response(request, "profile", current_user.id, EmployeeRegistered, lambda: _my_info(db, current_user.id))
+
+
+@router.get("/full", response_model=FullProfile, response_model_exclude_unset=True)
+def get_full_profile(
+    request: Request,
+    fields: str | None = Query(None, description="Secciones separadas por comas: role_details, skills, goals, certifications, certification_types"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    sections = parse_sections(fields)
+    return cached_response(
+        request, "full", current_user.id, FullProfile,
+        lambda: load_full_profile(db, current_user.id, sections),
+        ",".join(sections), date.today(), exclude_unset=True,
+    )
+
+
+def _my_info(db: Session, user_id: int) -> EmployeeRegistered:
+    row = (
+        db.query(UserModel, Employee)
+        .outerjoin(Employee, Employee.user_id == UserModel.id)
+        .filter(UserModel.id == user_id)
+        .first()
+    )
+    if row is None:
         raise HTTPException(status_code=404, detail="User not found")
-    employee = db.query(Employee).filter(Employee.user_id == user.id).first()
+    user, employee = row
     if employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
     return EmployeeRegistered(
@@ -32,13 +64,7 @@ def get_my_info(current_user: User = Depends(get_current_user), db: Session = De
 
 
 @router.put("/edit", response_model=UserEdit)
-def edit_user(user_edit: UserEdit, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    user_db = db.query(UserModel).filter(UserModel.id == current_user.id).first()
-    if not user_db:
-        raise HTTPException(status_code=404, detail="User not found")
-    employee_db = db.query(Employee).filter(Employee.user_id == user_db.id).first()
-    if not employee_db:
-        raise HTTPException(status_code=404, detail="Employee not found")
+def edit_user(user_edit: UserEdit, principal: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
 
     update_data = user_edit.model_dump(exclude_unset=True)
     user_update = {}
@@ -46,7 +72,7 @@ def edit_user(user_edit: UserEdit, current_user: User = Depends(get_current_user
 
     if "email" in update_data:
         user_update["email"] = update_data["email"]
-        if update_data.get("email") != user_db.email:
+        if update_data.get("email") != principal.email:
             maybe_user = db.query(UserModel).filter(UserModel.email == update_data["email"]).first()
             if maybe_user:
                 raise HTTPException(status_code=400, detail="Email already registered")
@@ -55,15 +81,33 @@ def edit_user(user_edit: UserEdit, current_user: User = Depends(get_current_user
 
     if "password" in update_data:
         user_update["hashed_password"] = hash_password(update_data["password"]).decode("utf-8")
+        # Revoca los refresh tokens emitidos con la contraseña anterior
+        user_update["token_version"] = UserModel.token_version + 1
 
     for field in ["name", "last_name_1", "last_name_2", "phone_number", "location", "capability", "role", "position", "seniority"]:
         if field in update_data:
             employee_update[field] = update_data[field]
 
     if user_update:
-        db.query(UserModel).filter(UserModel.id == user_db.id).update(user_update)
+        db.query(UserModel).filter(UserModel.id == principal.user_id).update(user_update)
     if employee_update:
-        db.query(Employee).filter(Employee.user_id == user_db.id).update(employee_update)
+        if set(EMPLOYEE_METRICS.values()) & employee_update.keys():
+            # Mueve al empleado entre los contadores de rol/capability/ubicación del dashboard
+            previous = db.query(Employee.role, Employee.capability, Employee.location).filter(Employee.employee_id == principal.employee_id).one()._asdict()
+            deltas = employee_deltas(previous, -1)
+            deltas.update(employee_deltas({**previous, **employee_update}))
+            apply_deltas(db, deltas)
+        db.query(Employee).filter(Employee.employee_id == principal.employee_id).update(employee_update)
 
     db.commit()
+    bump(principal.user_id)
+    # Email, rol o nombre forman parte del principal cacheado
+    if {"email", "role", "name", "last_name_1"} & update_data.keys():
+        invalidate_principal(principal.user_id)
+    if employee_update:
+        invalidate_employee_search()
+        directory_snapshot.refresh_employee(db, principal.employee_id)
+    if "role" in employee_update:
+        skill_matrix.refresh_employee(db, principal.employee_id)
+        schedule_cache.invalidate()
     return {"message": "User updated successfully"}
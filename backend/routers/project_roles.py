@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from schemas import EmployeeRole, Principal, RoleSkillRequirement, Candidate
+from models import Employee, ProjectRole, RoleSkill
+from dependencies import get_current_principal, get_db
+from matching import skill_matrix, skill_key
+from typing import List
+
+router = APIRouter(prefix="/project-roles", tags=["Project Roles"])
+
+
+def _check_staffing(principal: Principal, db: Session, role_id: int):
+    if principal.role != EmployeeRole.Manager and principal.role != EmployeeRole.TFS:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if db.query(ProjectRole.role_id).filter(ProjectRole.role_id == role_id).first() is None:
+        raise HTTPException(status_code=404, detail="Project role not found")
+
+
+@router.get("/{role_id}/skills", response_model=List[RoleSkillRequirement])
+def get_role_skills(role_id: int, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    _check_staffing(principal, db, role_id)
+    return db.query(RoleSkill).filter(RoleSkill.role_id == role_id).all()
+
+
+@router.put("/{role_id}/skills", response_model=List[RoleSkillRequirement])
+def set_role_skills(
+    role_id: int,
+    requirements: List[RoleSkillRequirement],
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    _check_staffing(principal, db, role_id)
+    # Una skill repetida (sin importar mayúsculas o espacios) contaría dos veces en el puntaje
+    names = [skill_key(requirement.name) for requirement in requirements]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Duplicate skill in requirements")
+    db.query(RoleSkill).filter(RoleSkill.role_id == role_id).delete(synchronize_session=False)
+    db.add_all(RoleSkill(role_id=role_id, name=requirement.name, level=requirement.level) for requirement in requirements)
+    db.commit()
+    return requirements
+
+
+@router.get("/{role_id}/candidates", response_model=List[Candidate])
+def get_candidates(
+    role_id: int,
+    top_k: int = Query(10, ge=1, le=200),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    _check_staffing(principal, db, role_id)
+    requirements = db.query(RoleSkill.name, RoleSkill.level).filter(RoleSkill.role_id == role_id).all()
+    ranked = skill_matrix.top_candidates(db, [tuple(requirement) for requirement in requirements], top_k)
+    if not ranked:
+        return []
+
+    employees = {
+        row.employee_id: row
+        for row in db.query(Employee.employee_id, Employee.name, Employee.last_name_1, Employee.position)
+        .filter(Employee.employee_id.in_([employee_id for employee_id, _, _ in ranked]))
+    }
+    return [
+        Candidate(
+            employee_id=employee_id,
+            name=employees[employee_id].name,
+            last_name_1=employees[employee_id].last_name_1,
+            position=employees[employee_id].position,
+            score=score,
+            matched_skills=matched,
+        )
+        for employee_id, score, matched in ranked
+        if employee_id in employees
+    ]
@@ -1,79 +1,149 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func, and_
-from models import User, Employee, Project
-from schemas import User as UserSchema, ProjectCreate, EmployeeRole, ProjectRegistered
-from dependencies import get_current_user, get_db
+from sqlalchemy import or_, func, and_, select
+from models import Employee, Project
+from schemas import Principal, ProjectCreate, EmployeeRole, ProjectRegistered, ProjectOrder, ProjectCursorPage
+from dependencies import get_current_principal, get_db
 from typing import Optional
 from datetime import date
-from fastapi_pagination import Page, paginate
+from fastapi_pagination import Page
+from fastapi_pagination.ext.sqlalchemy import paginate
+from utils import encode_cursor, decode_cursor
+from search import project_search, employee_name_search, invalidate_project_search
+from scheduling import schedule_cache
+from analytics import apply_deltas, project_deltas, project_staffed
+from serialization import as_dicts, columns
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+# Solo las columnas de ProjectRegistered, con el nombre del campo: cada fila se valida una vez
+PROJECT_COLUMNS = columns(
+    Project, ProjectRegistered,
+    projectName=Project.projectname,
+    startDate=Project.startdate,
+    endDate=Project.enddate,
+    manager=Employee.name + " " + Employee.last_name_1,
+)
+
+def _projects_query(db: Session, search: Optional[str], start_date: Optional[date], end_date: Optional[date]):
+    query = db.query(*PROJECT_COLUMNS).select_from(Project).join(Employee, Project.manager_id == Employee.employee_id)
+
+    if start_date:
+        query = query.filter(Project.startdate >= start_date)
+    if end_date:
+        query = query.filter(Project.enddate <= end_date)
+
+    ranking = []
+    if search:
+        # Coincidencias en el proyecto o en el nombre de su manager, ambas servidas por índice
+        project_condition, ranking = project_search(db, search)
+        manager_condition, _ = employee_name_search(db, search)
+        managers = select(Employee.employee_id).where(manager_condition).correlate(None)
+        query = query.filter(or_(project_condition, Project.manager_id.in_(managers)))
+    return query, ranking
+
 @router.get("", response_model=Page[ProjectRegistered], status_code=200)
 def get_projects(
-    current_user: UserSchema = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
     alphabetical: bool = False,
     search: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None)
 ):
-    req_user = db.query(User).filter(User.id == current_user.id).first()
-    employeeRequest = db.query(Employee).filter(Employee.user_id == req_user.id).first()
-
-    if employeeRequest.role != EmployeeRole.Manager and employeeRequest.role != EmployeeRole.TFS:
+    if principal.role != EmployeeRole.Manager and principal.role != EmployeeRole.TFS:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    query = db.query(Project, Employee).join(Employee, Project.manager_id == Employee.employee_id)
+    query, ranking = _projects_query(db, search, start_date, end_date)
 
-    if start_date:
-        query = query.filter(Project.startdate >= start_date)
-    if end_date:
-        query = query.filter(Project.enddate <= end_date)
+    # project_id como desempate para que LIMIT/OFFSET sea estable entre páginas
+    if alphabetical:
+        query = query.order_by(Project.projectname.asc(), Project.project_id.asc())
+    elif ranking:
+        query = query.order_by(*ranking, Project.project_id.asc())
+    else:
+        query = query.order_by(Project.project_id.asc())
 
-    if search:
-        search_term = f"%{search.lower()}%"
-        full_name = func.lower(func.concat(Employee.name, ' ', Employee.last_name_1, ' ', func.coalesce(Employee.last_name_2, '')))
-        query = query.filter(
-            or_(
-                func.lower(Project.projectname).ilike(search_term),
-                func.lower(Project.client).ilike(search_term),
-                func.lower(Project.description).ilike(search_term),
-                full_name.ilike(search_term)
+    return paginate(query, transformer=as_dicts)
+
+
+# Columna de orden y el campo de ProjectRegistered que la trae
+_ORDER_COLUMNS = {
+    ProjectOrder.projectname: (Project.projectname, "projectName"),
+    ProjectOrder.startdate: (Project.startdate, "startDate"),
+    ProjectOrder.project_id: (Project.project_id, "project_id"),
+}
+
+@router.get("/cursor", response_model=ProjectCursorPage, status_code=200)
+def get_projects_cursor(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    size: int = Query(50, ge=1, le=100),
+    order_by: ProjectOrder = ProjectOrder.project_id,
+    search: Optional[str] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None)
+):
+    if principal.role != EmployeeRole.Manager and principal.role != EmployeeRole.TFS:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    query, _ = _projects_query(db, search, start_date, end_date)
+    column, field = _ORDER_COLUMNS[order_by]
+
+    if cursor:
+        try:
+            last = decode_cursor(cursor)
+            if last["order_by"] != order_by.value:
+                raise ValueError("order_by mismatch")
+            last_id = int(last["id"])
+            last_value = last["value"]
+            if last_value is not None and order_by == ProjectOrder.startdate:
+                last_value = date.fromisoformat(last_value)
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        if order_by == ProjectOrder.project_id:
+            query = query.filter(Project.project_id > last_id)
+        elif last_value is None:
+            query = query.filter(column.is_(None), Project.project_id > last_id)
+        else:
+            # Los NULL van al final, así que siguen pendientes mientras haya valores
+            query = query.filter(
+                or_(
+                    column > last_value,
+                    and_(column == last_value, Project.project_id > last_id),
+                    column.is_(None)
+                )
             )
-        )
 
-    if alphabetical:
-        query = query.order_by(Project.projectname.asc())
+    if order_by == ProjectOrder.project_id:
+        query = query.order_by(Project.project_id.asc())
+    else:
+        query = query.order_by(column.asc().nulls_last(), Project.project_id.asc())
 
-    result = [
-        ProjectRegistered(
-            project_id=p.project_id,
-            projectName=p.projectname,
-            client=p.client,
-            description=p.description,
-            startDate=p.startdate,
-            endDate=p.enddate,
-            employees_req=p.employees_req,
-            manager_id=p.manager_id,
-            manager=e.name + " " + e.last_name_1
-        ) for p, e in query.all()
-    ]
+    rows = query.limit(size + 1).all()
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        value = getattr(last, field)
+        next_cursor = encode_cursor({
+            "order_by": order_by.value,
+            "value": value.isoformat() if isinstance(value, date) else value,
+            "id": last.project_id,
+        })
 
-    return paginate(result)
+    return ProjectCursorPage(items=as_dicts(rows), next_cursor=next_cursor)
 
 
 @router.post("", status_code=200)
 def create_project(
     project: ProjectCreate,
-    current_user: UserSchema = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    req_user = db.query(User).filter(User.id == current_user.id).first()
-    employeeRequest = db.query(Employee).filter(Employee.user_id == req_user.id).first()
-
-    if employeeRequest.role != EmployeeRole.Manager:
+    if principal.role != EmployeeRole.Manager:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     if project.employees_req < 1:
@@ -92,12 +162,15 @@ def create_project(
         description=project.description,
         startdate=project.startDate,
         enddate=project.endDate,
-        manager_id=employeeRequest.employee_id,
+        manager_id=principal.employee_id,
         employees_req=project.employees_req
     )
     db.add(project_db)
+    apply_deltas(db, project_deltas(project.client, project.employees_req, 0))
     db.commit()
     db.refresh(project_db)
+    invalidate_project_search()
+    schedule_cache.invalidate()
 
     project_return = ProjectRegistered(
         project_id=project_db.project_id,
@@ -108,7 +181,7 @@ def create_project(
         endDate=project_db.enddate,
         employees_req=project_db.employees_req,
         manager_id=project_db.manager_id,
-        manager=employeeRequest.name + " " + employeeRequest.last_name_1
+        manager=principal.display_name
     )
     
     return project_return
@@ -117,19 +190,21 @@ def create_project(
 def update_project(
     project_id: int,
     updated: ProjectCreate,
-    current_user: UserSchema = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    req_user = db.query(User).filter(User.id == current_user.id).first()
-    employee = db.query(Employee).filter(Employee.user_id == req_user.id).first()
-
-    if employee.role != EmployeeRole.Manager:
+    if principal.role != EmployeeRole.Manager:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     project = db.query(Project).filter(Project.project_id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    if project.client != updated.client or project.employees_req != updated.employees_req:
+        staffed = project_staffed(db, project_id)
+        deltas = project_deltas(project.client, project.employees_req, staffed, -1)
+        deltas.update(project_deltas(updated.client, updated.employees_req, staffed))
+        apply_deltas(db, deltas)
     project.projectname = updated.projectName
     project.client = updated.client
     project.description = updated.description
@@ -139,6 +214,8 @@ def update_project(
 
     db.commit()
     db.refresh(project)
+    invalidate_project_search()
+    schedule_cache.invalidate()
 
     manager = db.query(Employee).filter(Employee.employee_id == project.manager_id).first()
 
@@ -157,19 +234,19 @@ def update_project(
 @router.delete("/{project_id}", status_code=204)
 def delete_project(
     project_id: int,
-    current_user: UserSchema = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    req_user = db.query(User).filter(User.id == current_user.id).first()
-    employee = db.query(Employee).filter(Employee.user_id == req_user.id).first()
-
-    if employee.role != EmployeeRole.Manager:
+    if principal.role != EmployeeRole.Manager:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     project = db.query(Project).filter(Project.project_id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    apply_deltas(db, project_deltas(project.client, project.employees_req, project_staffed(db, project_id), -1))
     db.delete(project)
     db.commit()
+    invalidate_project_search()
+    schedule_cache.invalidate()
     return
\ No newline at end of file
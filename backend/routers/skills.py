@@ -1,73 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from schemas import User, SkillCreate, SkillResponse
-from models import Skill, SkillType, Employee
-from dependencies import get_current_user, get_db
+from schemas import Principal, SkillCreate, SkillResponse, SkillBatch, BatchResult
+from models import Skill, SkillType
+from dependencies import get_current_principal, get_db
+from matching import skill_matrix
+from analytics import apply_deltas, skill_deltas
+from cache import bump, cached_response
+from batch import apply_batch
+from serialization import as_dicts, columns
+from collections import Counter
 from typing import List, Optional
 
 router = APIRouter(prefix="/skills", tags=["Skills"])
 
+SKILL_COLUMNS = columns(Skill, SkillResponse)
+
 @router.post("/add", response_model=SkillResponse)
-def add_skill(skill: SkillCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    new_skill = Skill(name=skill.name, level=skill.level, type=skill.type, employee_id=employee.employee_id)
+def add_skill(skill: SkillCreate, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    new_skill = Skill(name=skill.name, level=skill.level, type=skill.type, employee_id=principal.employee_id)
     db.add(new_skill)
+    db.flush()
+    # Sin refresh tras el commit: los valores vienen del request y la llave del flush
+    skill_id = new_skill.skill_id
+    apply_deltas(db, skill_deltas(skill.type))
     db.commit()
-    db.refresh(new_skill)
-    skill_id = db.query(Skill).filter(Skill.name == skill.name, Skill.employee_id == employee.employee_id).first().skill_id
-    skill_response = SkillResponse(
-        skill_id=skill_id,
-        name=new_skill.name,
-        level=new_skill.level,
-        type=new_skill.type
-    )
-    return skill_response
+    bump(principal.user_id)
+    skill_matrix.refresh_employee(db, principal.employee_id)
+    return SkillResponse(skill_id=skill_id, name=skill.name, level=skill.level, type=skill.type)
 
 @router.get("/my-skills", response_model=List[SkillResponse])
 def get_my_skills(
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     type: Optional[SkillType] = Query(None)
 ):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    query = db.query(Skill).filter(Skill.employee_id == employee.employee_id)
-    if type:
-        query = query.filter(Skill.type == type)
+    def build():
+        query = db.query(*SKILL_COLUMNS).filter(Skill.employee_id == principal.employee_id)
+        if type:
+            query = query.filter(Skill.type == type)
+        return as_dicts(query.all())
 
-    return query.all()
+    return cached_response(request, "skills", principal.user_id, List[SkillResponse], build, type.value if type else "")
 
 @router.put("/update/{skill_id}", response_model=SkillResponse)
-def update_skill(skill_id: int, skill_update: SkillCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    skill = db.query(Skill).filter(Skill.skill_id == skill_id, Skill.employee_id == employee.employee_id).first()
+def update_skill(skill_id: int, skill_update: SkillCreate, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    skill = db.query(Skill).filter(Skill.skill_id == skill_id, Skill.employee_id == principal.employee_id).first()
     if not skill:
         raise HTTPException(status_code=404, detail="Skill not found")
 
+    if skill.type != skill_update.type:
+        deltas = skill_deltas(skill.type, -1)
+        deltas.update(skill_deltas(skill_update.type))
+        apply_deltas(db, deltas)
     skill.name = skill_update.name
     skill.level = skill_update.level
     skill.type = skill_update.type
     db.commit()
+    bump(principal.user_id)
     db.refresh(skill)
+    skill_matrix.refresh_employee(db, principal.employee_id)
     return skill
 
 @router.delete("/delete/{skill_id}", status_code=204)
-def delete_skill(skill_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    skill = db.query(Skill).filter(Skill.skill_id == skill_id, Skill.employee_id == employee.employee_id).first()
+def delete_skill(skill_id: int, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    skill = db.query(Skill).filter(Skill.skill_id == skill_id, Skill.employee_id == principal.employee_id).first()
     if not skill:
         raise HTTPException(status_code=404, detail="Skill not found")
 
     db.delete(skill)
+    apply_deltas(db, skill_deltas(skill.type, -1))
+    db.commit()
+    bump(principal.user_id)
+    skill_matrix.refresh_employee(db, principal.employee_id)
+    return
+
+
+@router.post("/batch", response_model=BatchResult)
+def batch_skills(batch: SkillBatch, db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)):
+    outcome = apply_batch(db, Skill, principal.employee_id, batch)
+    deltas = Counter()
+    for value in outcome.created:
+        deltas.update(skill_deltas(value["type"]))
+    for previous, value in outcome.updated:
+        if previous.type != value["type"]:
+            deltas.update(skill_deltas(previous.type, -1))
+            deltas.update(skill_deltas(value["type"]))
+    for previous in outcome.deleted:
+        deltas.update(skill_deltas(previous.type, -1))
+    apply_deltas(db, deltas)
     db.commit()
-    return
\ No newline at end of file
+    bump(principal.user_id)
+    skill_matrix.refresh_employee(db, principal.employee_id)
+    return outcome.summary()
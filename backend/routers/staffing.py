@@ -0,0 +1,162 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+from schemas import (
+    EmployeeRole, Principal, AvailableEmployee, UnderstaffedProject,
+    AutoAssignRequest, AutoAssignResult, Assignment,
+)
+from models import Employee, Developer, Project, ProjectRole, RoleDeveloper, RoleSkill
+from dependencies import get_current_principal, get_db
+from scheduling import schedule_cache, load_schedule, plan_assignments
+from matching import skill_matrix
+from analytics import apply_deltas, staffing_deltas
+from typing import List, Optional
+from datetime import date
+from threading import Lock
+
+router = APIRouter(prefix="/staffing", tags=["Staffing"])
+
+# Llave del advisory lock de PostgreSQL: una sola asignación automática a la vez entre instancias
+_ASSIGN_LOCK_KEY = 0x53544146
+_assign_lock = Lock()
+
+
+def _check_staffing(principal: Principal):
+    if principal.role != EmployeeRole.Manager and principal.role != EmployeeRole.TFS:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+@router.get("/available", response_model=List[AvailableEmployee])
+def get_available(
+    start_date: date,
+    end_date: date,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    _check_staffing(principal)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+    schedule = schedule_cache.get(db)
+    employee_ids = schedule.available(start_date, end_date, limit)
+    if not employee_ids:
+        return []
+    employees = {
+        row.employee_id: row
+        for row in db.query(Employee.employee_id, Employee.name, Employee.last_name_1, Employee.position)
+        .filter(Employee.employee_id.in_(employee_ids))
+    }
+    return [
+        AvailableEmployee(
+            employee_id=employee_id,
+            name=employees[employee_id].name,
+            last_name_1=employees[employee_id].last_name_1,
+            position=employees[employee_id].position,
+            assigned_days=schedule.load.get(employee_id, 0),
+        )
+        for employee_id in employee_ids
+        if employee_id in employees
+    ]
+
+
+@router.get("/understaffed", response_model=List[UnderstaffedProject])
+def get_understaffed(
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    _check_staffing(principal)
+    schedule = schedule_cache.get(db)
+    project_ids = schedule.understaffed_projects(start_date, end_date)
+    if not project_ids:
+        return []
+    projects = {
+        row.project_id: row
+        for row in db.query(Project.project_id, Project.projectname, Project.startdate, Project.enddate, Project.employees_req)
+        .filter(Project.project_id.in_(project_ids))
+    }
+    return [
+        UnderstaffedProject(
+            project_id=project_id,
+            projectname=projects[project_id].projectname,
+            startdate=projects[project_id].startdate,
+            enddate=projects[project_id].enddate,
+            employees_req=projects[project_id].employees_req,
+            staffed=schedule.staffed.get(project_id, 0),
+            missing=schedule.missing(project_id),
+        )
+        for project_id in project_ids
+        if project_id in projects
+    ]
+
+
+def _assign(db: Session, requested: Optional[List[int]]) -> tuple[list[tuple[int, int, int]], dict[int, int]]:
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ASSIGN_LOCK_KEY})
+    # Se planea con la base tomada dentro del lock, no con el cache: otra asignación pudo
+    # confirmarse hace un momento y el plan llenaría de más proyectos o empleados
+    schedule = load_schedule(db)
+    project_ids = schedule.understaffed_projects()
+    if requested is not None:
+        requested = set(requested)
+        project_ids = [project_id for project_id in project_ids if project_id in requested]
+    if not project_ids:
+        return [], {}
+
+    roles: dict[int, list[int]] = {}
+    for role_id, project_id in (
+        db.query(ProjectRole.role_id, ProjectRole.project_id)
+        .filter(ProjectRole.project_id.in_(project_ids))
+        .order_by(ProjectRole.role_id)
+    ):
+        roles.setdefault(project_id, []).append(role_id)
+    requirements: dict[int, list[tuple[str, int]]] = {}
+    role_ids = [role_id for project_roles in roles.values() for role_id in project_roles]
+    for role_id, name, level in db.query(RoleSkill.role_id, RoleSkill.name, RoleSkill.level).filter(RoleSkill.role_id.in_(role_ids)):
+        requirements.setdefault(role_id, []).append((name, level))
+
+    def ranker(role_id: int, k: int):
+        if role_id not in requirements:
+            return None
+        return [employee_id for employee_id, _, _ in skill_matrix.top_candidates(db, requirements[role_id], k)]
+
+    planned, unfilled = plan_assignments(schedule, project_ids, roles, ranker)
+    if planned:
+        # RoleDeveloper referencia a Developer: se crea el registro si el empleado aún no lo tiene
+        chosen = {employee_id for _, _, employee_id in planned}
+        existing = {employee_id for (employee_id,) in db.query(Developer.employee_id).filter(Developer.employee_id.in_(chosen))}
+        if chosen - existing:
+            db.execute(insert(Developer), [{"employee_id": employee_id} for employee_id in sorted(chosen - existing)])
+        db.execute(insert(RoleDeveloper), [
+            {"developer_id": employee_id, "project_role_id": role_id}
+            for _, role_id, employee_id in planned
+        ])
+        # Cada asignación cubre una vacante (nunca se asigna más de lo que falta)
+        apply_deltas(db, staffing_deltas(len(planned)))
+        db.commit()
+    return planned, unfilled
+
+
+@router.post("/auto-assign", response_model=AutoAssignResult)
+def auto_assign(
+    request: AutoAssignRequest,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    if principal.role != EmployeeRole.Manager:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    with _assign_lock:
+        try:
+            planned, unfilled = _assign(db, request.project_ids)
+        finally:
+            # Sin commit (nada que asignar o error) el rollback libera el advisory lock
+            db.rollback()
+    if planned:
+        schedule_cache.invalidate()
+
+    return AutoAssignResult(
+        assigned=[Assignment(project_id=project_id, role_id=role_id, employee_id=employee_id) for project_id, role_id, employee_id in planned],
+        unfilled=unfilled,
+    )
@@ -1,71 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
-from fastapi_pagination import Page
+from fastapi_pagination import Page, resolve_params
 from fastapi_pagination.ext.sqlalchemy import paginate
-from schemas import EmployeeRole, EmployeeList, EmployeeRegistered, User
+from schemas import EmployeeRole, EmployeeList, EmployeeRegistered, FullProfile, Principal
 from models import Employee, User as UserModel
-from dependencies import get_current_user, get_db
-from sqlalchemy import or_, func
+from dependencies import get_current_principal, get_db, SessionLocal
+from search import employee_search
+from directory import ALPHABETICAL_ORDER, directory_snapshot
+from serialization import as_dicts, columns
+from bulk import stream_rows
+from cache import cached_response
+from profiles import load_full_profile, parse_sections
+from datetime import date
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# Solo las columnas de EmployeeList: el directorio no necesita cargar objetos Employee
+DIRECTORY_COLUMNS = columns(Employee, EmployeeList)
+
 
 @router.get("", response_model=Page[EmployeeList])
 def get_users(
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
     role: EmployeeRole = None,
+    location: str = None,
+    capability: str = None,
     alphabetical: bool = False,
     search: str = None
 ):
     # Verificación de permisos
-    userRequest = db.query(UserModel).filter(UserModel.id == current_user.id).first()
-    employeeRequest = db.query(Employee).filter(Employee.user_id == userRequest.id).first()
-
-    if employeeRequest.role != EmployeeRole.Manager:
+    if principal.role != EmployeeRole.Manager:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    # Base query
-    query = db.query(Employee)
+    # Sin búsqueda se sirve desde la foto en memoria del directorio, si está vigente
+    if not search:
+        params = resolve_params()
+        body = directory_snapshot.page(params.page, params.size, role, location, capability, alphabetical)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+
+    query = db.query(*DIRECTORY_COLUMNS)
+    return paginate(_directory_query(db, query, role, location, capability, alphabetical, search), transformer=as_dicts)
+
 
-    # Filtro por rol
+def _directory_query(db: Session, query, role: EmployeeRole, location: str, capability: str, alphabetical: bool, search: str):
+    # Filtros por rol, ubicación y capability
     if role:
         query = query.filter(Employee.role == role)
+    if location:
+        query = query.filter(Employee.location == location)
+    if capability:
+        query = query.filter(Employee.capability == capability)
 
-    # Filtro por búsqueda
+    # Filtro por búsqueda sobre el documento indexado (ver search.py)
+    ranking = []
     if search:
-        search_term = f"%{search.lower()}%"
-        full_name = func.lower(func.concat(Employee.name, ' ', Employee.last_name_1, ' ', Employee.last_name_2))
-        query = query.filter(
-            or_(
-                func.lower(Employee.name).ilike(search_term),
-                func.lower(Employee.last_name_1).ilike(search_term),
-                func.lower(Employee.last_name_2).ilike(search_term),
-                func.lower(Employee.phone_number).ilike(search_term),
-                func.lower(Employee.location).ilike(search_term),
-                func.lower(Employee.capability).ilike(search_term),
-                func.lower(Employee.position).ilike(search_term),
-                full_name.ilike(search_term)
-            )
-        )
-
-    # Orden alfabético
+        condition, ranking = employee_search(db, search)
+        query = query.filter(condition)
+
+    # Orden alfabético; si no, por relevancia de la búsqueda o por id. Sin búsqueda debe
+    # coincidir con el de la foto en memoria (directory.py) para que las páginas no cambien
     if alphabetical:
-        query = query.order_by(Employee.last_name_1.asc())
+        query = query.order_by(*ALPHABETICAL_ORDER)
+    elif ranking:
+        query = query.order_by(*ranking, Employee.employee_id.asc())
+    else:
+        query = query.order_by(Employee.employee_id.asc())
+    return query
+
+
+EXPORT_FIELDS = list(EmployeeList.model_fields)
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
 
-    return paginate(query)
+def _stream_directory(fmt: str, role: EmployeeRole, location: str, capability: str, alphabetical: bool, search: str):
+    # Sesión propia: el generador se consume después de que termina el endpoint
+    with SessionLocal() as db:
+        query = _directory_query(db, db.query(*DIRECTORY_COLUMNS), role, location, capability, alphabetical, search)
+        yield from stream_rows(EXPORT_FIELDS, query, fmt)
+
+
+@router.get("/export")
+def export_users(
+    principal: Principal = Depends(get_current_principal),
+    format: str = "csv",
+    role: EmployeeRole = None,
+    location: str = None,
+    capability: str = None,
+    alphabetical: bool = False,
+    search: str = None
+):
+    """Directorio completo (mismos filtros que GET /users) como CSV o NDJSON, sin paginar."""
+    if principal.role != EmployeeRole.Manager:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    return StreamingResponse(
+        _stream_directory(format, role, location, capability, alphabetical, search),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
 
 
 @router.get("/{user_id}", response_model=EmployeeRegistered)
-def get_user_info(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    userRequest = db.query(UserModel).filter(UserModel.id == current_user.id).first()
-    employeeRequest = db.query(Employee).filter(Employee.user_id == userRequest.id).first()
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    if user.id != userRequest.id and employeeRequest.role != EmployeeRole.Manager:
+def get_user_info(user_id: int, request: Request, principal: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
+    if user_id != principal.user_id and principal.role != EmployeeRole.Manager:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    employee = db.query(Employee).filter(Employee.user_id == user.id).first()
+    # Misma representación que /profile/my-info: comparten ETag y cuerpo cacheado
+    return cached_response(request, "profile", user_id, EmployeeRegistered, lambda: _user_info(db, user_id))
+
+
+def _user_info(db: Session, user_id: int) -> EmployeeRegistered:
+    row = (
+        db.query(UserModel, Employee)
+        .outerjoin(Employee, Employee.user_id == UserModel.id)
+        .filter(UserModel.id == user_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    user, employee = row
     if employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
 
@@ -83,3 +138,21 @@ def get_user_info(user_id: int, current_user: User = Depends(get_current_user),
         seniority=employee.seniority,
         role=employee.role
     )
+
+
+@router.get("/{user_id}/full", response_model=FullProfile, response_model_exclude_unset=True)
+def get_user_full_profile(
+    user_id: int,
+    request: Request,
+    fields: str | None = Query(None, description="Secciones separadas por comas: role_details, skills, goals, certifications, certification_types"),
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    if user_id != principal.user_id and principal.role != EmployeeRole.Manager:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    sections = parse_sections(fields)
+    return cached_response(
+        request, "full", user_id, FullProfile,
+        lambda: load_full_profile(db, user_id, sections),
+        ",".join(sections), date.today(), exclude_unset=True,
+    )
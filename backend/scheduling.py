@@ -0,0 +1,263 @@
+import heapq
+import time
+from datetime import date
+from threading import Lock
+from typing import Callable
+from sqlalchemy.orm import Session
+from config import settings
+from models import Employee, Project, ProjectRole, RoleDeveloper
+from schemas import EmployeeRole
+
+# Disponibilidad de empleados y proyectos con falta de personal, a partir de las
+# fechas de Project y del histórico de asignaciones RoleDeveloper.
+# Un proyecto sin fecha de inicio o de fin se trata como abierto por ese lado.
+
+
+class IntervalIndex:
+    """Árbol de intervalos implícito sobre un arreglo ordenado por inicio.
+
+    Cada nodo (el punto medio de un rango del arreglo) guarda el fin máximo de su
+    subárbol, así una consulta de traslape cuesta O(log n + k).
+    """
+
+    def __init__(self, intervals: list[tuple[date, date, int]]):
+        intervals = sorted(intervals)
+        self._starts = [start for start, _, _ in intervals]
+        self._ends = [end for _, end, _ in intervals]
+        self._values = [value for _, _, value in intervals]
+        self._max_end = list(self._ends)
+        self._augment(0, len(intervals))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def _augment(self, low: int, high: int):
+        if low >= high:
+            return None
+        mid = (low + high) // 2
+        best = self._ends[mid]
+        for child in (self._augment(low, mid), self._augment(mid + 1, high)):
+            if child is not None and child > best:
+                best = child
+        self._max_end[mid] = best
+        return best
+
+    def overlapping(self, start: date, end: date) -> list[int]:
+        """Valores de los intervalos que se traslapan con [start, end] (extremos incluidos)."""
+        found = []
+        stack = [(0, len(self._starts))]
+        while stack:
+            low, high = stack.pop()
+            if low >= high:
+                continue
+            mid = (low + high) // 2
+            # Ningún intervalo del subárbol termina después de `start`
+            if self._max_end[mid] < start:
+                continue
+            stack.append((low, mid))
+            # El subárbol derecho empieza aún más tarde: se poda si ya pasó `end`
+            if self._starts[mid] <= end:
+                if self._ends[mid] >= start:
+                    found.append(self._values[mid])
+                stack.append((mid + 1, high))
+        return found
+
+
+def _span(startdate: date | None, enddate: date | None) -> tuple[date, date]:
+    return startdate or date.min, enddate or date.max
+
+
+class Schedule:
+    """Foto en memoria de proyectos y asignaciones; se reconstruye cuando cambian."""
+
+    def __init__(self, projects, assignments, developers):
+        self.projects: dict[int, tuple[date, date, int]] = {}
+        staffed: dict[int, set[int]] = {}
+        busy: dict[int, list[tuple[date, date]]] = {}
+        self.load: dict[int, int] = {employee_id: 0 for employee_id in developers}
+        intervals = []
+        for project_id, startdate, enddate, employees_req in projects:
+            self.projects[project_id] = (*_span(startdate, enddate), employees_req or 0)
+        for developer_id, project_id in assignments:
+            if project_id not in self.projects or developer_id in staffed.setdefault(project_id, set()):
+                continue
+            staffed[project_id].add(developer_id)
+            start, end = self.projects[project_id][:2]
+            intervals.append((start, end, developer_id))
+            busy.setdefault(developer_id, []).append((start, end))
+            if start != date.min and end != date.max:
+                self.load[developer_id] = self.load.get(developer_id, 0) + (end - start).days + 1
+        self.staffed = {project_id: len(developers) for project_id, developers in staffed.items()}
+        self.busy = busy
+        self.assignments = IntervalIndex(intervals)
+        understaffed = [
+            (start, end, project_id)
+            for project_id, (start, end, required) in self.projects.items()
+            if self.staffed.get(project_id, 0) < required
+        ]
+        self.understaffed = IntervalIndex(understaffed)
+        self.understaffed_ids = sorted(understaffed)
+        self.developers = sorted(self.load, key=lambda employee_id: (self.load[employee_id], employee_id))
+
+    def missing(self, project_id: int) -> int:
+        return max(self.projects[project_id][2] - self.staffed.get(project_id, 0), 0)
+
+    def available(self, start: date, end: date, limit: int) -> list[int]:
+        """Developers sin asignaciones que se traslapen con [start, end], los menos cargados primero."""
+        busy = set(self.assignments.overlapping(start, end))
+        available = []
+        for employee_id in self.developers:
+            if employee_id not in busy:
+                available.append(employee_id)
+                if len(available) == limit:
+                    break
+        return available
+
+    def understaffed_projects(self, start: date | None = None, end: date | None = None) -> list[int]:
+        if start is None and end is None:
+            return [project_id for _, _, project_id in self.understaffed_ids]
+        start, end = _span(start, end)
+        return sorted(self.understaffed.overlapping(start, end), key=lambda project_id: (self.projects[project_id][0], project_id))
+
+
+def _conflict(intervals: list[tuple[date, date]], start: date, end: date) -> tuple[date, date] | None:
+    for other_start, other_end in intervals:
+        if other_start <= end and start <= other_end:
+            return other_start, other_end
+    return None
+
+
+def plan_assignments(schedule: Schedule, project_ids: list[int], roles: dict[int, list[int]], ranker=None) -> tuple[list[tuple[int, int, int]], dict[int, int]]:
+    """Llena `employees_req` de varios proyectos a la vez con una asignación voraz.
+
+    Los proyectos se recorren por fecha de inicio (barrido). Para cada vacante se toma
+    el mejor candidato libre en esas fechas: el de mayor puntaje de skills si
+    `ranker(role_id, k)` devuelve una lista, o si no el Developer con menos días asignados.
+    Devuelve ([(project_id, role_id, employee_id)], {project_id: vacantes sin cubrir}).
+    """
+    planned, unfilled = [], {}
+    busy = {employee_id: list(intervals) for employee_id, intervals in schedule.busy.items()}
+    load = dict(schedule.load)
+    # Libres por carga y ocupados (por el barrido) por fecha de fin; `active` invalida entradas viejas
+    free = [(load[employee_id], employee_id) for employee_id in schedule.developers]
+    heapq.heapify(free)
+    releases: list[tuple[date, int]] = []
+    active: set[int] = set()
+
+    def is_free(employee_id, start, end):
+        return _conflict(busy.get(employee_id, ()), start, end) is None
+
+    def take(employee_id, start, end):
+        busy.setdefault(employee_id, []).append((start, end))
+        if start != date.min and end != date.max:
+            load[employee_id] = load.get(employee_id, 0) + (end - start).days + 1
+        active.add(employee_id)
+        heapq.heappush(releases, (end, employee_id))
+
+    def from_ranking(role_id, start, end, ranked):
+        # Pide más candidatos mientras los mejores estén ocupados en esas fechas
+        while True:
+            if "ids" not in ranked:
+                ranked["ids"] = ranker(role_id, ranked["k"])
+            if ranked["ids"] is None:
+                return None
+            chosen = next((employee_id for employee_id in ranked["ids"] if is_free(employee_id, start, end)), None)
+            if chosen is not None or len(ranked["ids"]) < ranked["k"]:
+                return chosen
+            ranked["k"] *= 2
+            del ranked["ids"]
+
+    def from_heap(start, end):
+        chosen, skipped = None, []
+        while free:
+            current_load, employee_id = heapq.heappop(free)
+            if employee_id in active or current_load != load.get(employee_id, 0):
+                continue  # entrada vieja
+            conflict = _conflict(busy.get(employee_id, ()), start, end)
+            if conflict is None:
+                chosen = employee_id
+                break
+            if conflict[0] <= start:
+                # Asignación previa en curso: no estará libre para ningún proyecto hasta que termine
+                active.add(employee_id)
+                heapq.heappush(releases, (conflict[1], employee_id))
+            else:
+                skipped.append((current_load, employee_id))
+        for entry in skipped:
+            heapq.heappush(free, entry)
+        return chosen
+
+    for project_id in sorted(project_ids, key=lambda project_id: (schedule.projects[project_id][0], project_id)):
+        start, end, _ = schedule.projects[project_id]
+        # Quienes terminaron antes de este inicio vuelven a estar libres
+        while releases and releases[0][0] < start:
+            _, employee_id = heapq.heappop(releases)
+            active.discard(employee_id)
+            heapq.heappush(free, (load[employee_id], employee_id))
+
+        needed = schedule.missing(project_id)
+        if needed == 0:
+            continue
+        project_roles = roles.get(project_id) or []
+        if not project_roles:
+            unfilled[project_id] = needed
+            continue
+
+        rankings = {role_id: {"k": needed * 4} for role_id in project_roles}
+        for slot in range(needed):
+            role_id = project_roles[slot % len(project_roles)]
+            chosen = from_ranking(role_id, start, end, rankings[role_id]) if ranker else None
+            if chosen is None:
+                # Sin requisitos (o sin candidatos con skills): el menos cargado que esté libre
+                chosen = from_heap(start, end)
+            if chosen is None:
+                unfilled[project_id] = needed - slot
+                break
+            take(chosen, start, end)
+            planned.append((project_id, role_id, chosen))
+    return planned, unfilled
+
+
+def load_schedule(db: Session) -> Schedule:
+    projects = db.query(Project.project_id, Project.startdate, Project.enddate, Project.employees_req).all()
+    assignments = (
+        db.query(RoleDeveloper.developer_id, ProjectRole.project_id)
+        .join(ProjectRole, ProjectRole.role_id == RoleDeveloper.project_role_id)
+        .all()
+    )
+    developers = [employee_id for (employee_id,) in db.query(Employee.employee_id).filter(Employee.role == EmployeeRole.Developer)]
+    return Schedule(projects, assignments, developers)
+
+
+class ScheduleCache:
+    """Schedule por proceso. Las escrituras de esta instancia lo invalidan; las de otras
+    instancias no llegan, así que vence a los `ttl` segundos. La carga se hace sin el lock."""
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = Lock()
+        self._schedule: Schedule | None = None
+        self._built_at = 0.0
+        self._invalidations = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._schedule = None
+            self._invalidations += 1
+
+    def get(self, db: Session) -> Schedule:
+        with self._lock:
+            if self._schedule is not None and self.clock() - self._built_at < self.ttl:
+                return self._schedule
+            invalidations = self._invalidations
+        schedule = load_schedule(db)
+        with self._lock:
+            # Invalidado durante la carga: puede faltarle esa escritura, no se guarda
+            if self._invalidations == invalidations:
+                self._schedule = schedule
+                self._built_at = self.clock()
+        return schedule
+
+
+schedule_cache = ScheduleCache(settings.SCHEDULE_CACHE_TTL_SECONDS)
@@ -6,6 +6,10 @@ from datetime import date
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     id: int | None = None
@@ -15,6 +19,16 @@ class EmployeeRole(str, Enum):
     TFS = "TFS"
     Manager = "Manager"
 
+class Principal(BaseModel):
+    user_id: int
+    employee_id: int
+    email: str
+    role: EmployeeRole
+    display_name: str
+
+    class Config:
+        frozen = True
+
 class UserBase(BaseModel):
     email: str
         
@@ -106,9 +120,21 @@ class ProjectCreate(BaseModel):
         from_attributes = True
         
 class ProjectRegistered(ProjectCreate):
+    # Las columnas admiten NULL (proyectos importados o sin fecha definida)
+    startDate: Optional[date] = None
+    endDate: Optional[date] = None
     project_id: int
     manager_id: int
     manager: str
+
+class ProjectOrder(str, Enum):
+    projectname = "projectname"
+    startdate = "startdate"
+    project_id = "project_id"
+
+class ProjectCursorPage(BaseModel):
+    items: List[ProjectRegistered]
+    next_cursor: Optional[str] = None
     
 class SkillType(str, Enum):
     hard = "hard"
@@ -152,4 +178,102 @@ class CertificationResponse(CertificationCreate):
     status: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Operaciones por lote: create/update/delete en una sola transacción
+class SkillUpdateItem(SkillCreate):
+    skill_id: int
+
+class SkillBatch(BaseModel):
+    create: List[SkillCreate] = []
+    update: List[SkillUpdateItem] = []
+    delete: List[int] = []
+
+class GoalUpdateItem(GoalCreate):
+    goal_id: int
+
+class GoalBatch(BaseModel):
+    create: List[GoalCreate] = []
+    update: List[GoalUpdateItem] = []
+    delete: List[int] = []
+
+class CertificationUpdateItem(CertificationCreate):
+    certification_id: int
+
+class CertificationBatch(BaseModel):
+    create: List[CertificationCreate] = []
+    update: List[CertificationUpdateItem] = []
+    delete: List[int] = []
+
+class BatchItemResult(BaseModel):
+    op: str
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    detail: Optional[str] = None
+
+class BatchResult(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    failed: int
+    results: List[BatchItemResult]
+
+class CertificationTypeCount(BaseModel):
+    type: str
+    count: int
+
+class RoleDetails(BaseModel):
+    staff_days: Optional[int] = None
+    speciality_area: Optional[str] = None
+
+class FullProfile(EmployeeRegistered):
+    # Secciones opcionales: solo se incluyen las pedidas en `fields`
+    role_details: Optional[RoleDetails] = None
+    skills: Optional[List[SkillResponse]] = None
+    goals: Optional[List[GoalResponse]] = None
+    certifications: Optional[List[CertificationResponse]] = None
+    certification_types: Optional[List[CertificationTypeCount]] = None
+
+class RoleSkillRequirement(BaseModel):
+    name: str
+    level: int = Field(gt=0)
+
+    class Config:
+        from_attributes = True
+
+class Candidate(BaseModel):
+    employee_id: int
+    name: str
+    last_name_1: str
+    position: str
+    score: float
+    matched_skills: int
+
+class AvailableEmployee(BaseModel):
+    employee_id: int
+    name: str
+    last_name_1: str
+    position: str
+    assigned_days: int
+
+class UnderstaffedProject(BaseModel):
+    project_id: int
+    projectname: Optional[str]
+    startdate: Optional[date]
+    enddate: Optional[date]
+    employees_req: int
+    staffed: int
+    missing: int
+
+class AutoAssignRequest(BaseModel):
+    project_ids: Optional[List[int]] = None
+
+class Assignment(BaseModel):
+    project_id: int
+    role_id: int
+    employee_id: int
+
+class AutoAssignResult(BaseModel):
+    assigned: List[Assignment]
+    unfilled: dict[int, int]
@@ -0,0 +1,187 @@
+import bisect
+import heapq
+import re
+from threading import Lock
+from sqlalchemy import DDL, case, desc, event, func, literal_column, or_, text
+from sqlalchemy.orm import Session
+from models import Employee, Project
+
+# Búsqueda sobre los documentos precalculados Employee.search_document,
+# Employee.search_name y Project.search_document. En PostgreSQL se sirve con
+# índices GIN (tsvector para prefijos y pg_trgm para subcadenas); en otros
+# backends (SQLite en pruebas) con un índice invertido en memoria.
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_SIMPLE = literal_column("'simple'::regconfig")
+# Máximo de resultados que el índice en memoria ordena por relevancia
+RANKED_LIMIT = 100
+
+
+def tokenize(value: str) -> list[str]:
+    return _TOKEN.findall(value.lower())
+
+
+class SearchIndex:
+    """Índice invertido en memoria de tokens -> ids, para backends sin tsvector.
+
+    La coincidencia por subcadena la resuelve SQL sobre la columna precalculada;
+    el índice aporta las coincidencias por prefijo de varios tokens y la relevancia.
+    """
+
+    def __init__(self, id_column, doc_column):
+        self.id_column = id_column
+        self.doc_column = doc_column
+        self._lock = Lock()
+        self._stale = True
+        self._invalidations = 0
+        self._docs: dict[int, str] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._vocabulary: list[str] = []
+
+    def invalidate(self):
+        with self._lock:
+            self._stale = True
+            self._invalidations += 1
+
+    def _rebuild(self, db: Session):
+        # La base se lee sin el lock; solo el cambio de índice es atómico
+        with self._lock:
+            invalidations = self._invalidations
+        docs, postings = {}, {}
+        for row_id, doc in db.query(self.id_column, self.doc_column):
+            docs[row_id] = doc or ""
+            for token in set(tokenize(docs[row_id])):
+                postings.setdefault(token, set()).add(row_id)
+        vocabulary = sorted(postings)
+        with self._lock:
+            self._docs, self._postings, self._vocabulary = docs, postings, vocabulary
+            # Si hubo cambios durante la lectura se vuelve a construir en la siguiente búsqueda
+            self._stale = self._invalidations != invalidations
+
+    def _prefix_matches(self, prefix: str) -> set[int]:
+        ids = set()
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            ids |= self._postings[token]
+        return ids
+
+    def search(self, db: Session, term: str) -> tuple[list[int], list[int]]:
+        """Devuelve (ids más relevantes, ids que solo coinciden por prefijo de tokens)."""
+        if self._stale:
+            self._rebuild(db)
+        with self._lock:
+            # 2 puntos por token exacto, 1 por coincidencia de prefijo
+            points: dict[int, int] = {}
+            matches = None
+            for token in tokenize(term):
+                ids = self._prefix_matches(token)
+                for row_id in ids:
+                    points[row_id] = points.get(row_id, 0) + 1
+                for row_id in self._postings.get(token, ()):
+                    points[row_id] += 1
+                matches = ids if matches is None else matches & ids
+            if not matches:
+                return [], []
+
+            needle = term.lower()
+            ranked = heapq.nsmallest(RANKED_LIMIT, matches, key=lambda row_id: (-points[row_id], row_id))
+            prefix_only = [row_id for row_id in matches if needle not in self._docs[row_id]]
+            return ranked, prefix_only
+
+
+_employee_index = SearchIndex(Employee.employee_id, Employee.search_document)
+_employee_name_index = SearchIndex(Employee.employee_id, Employee.search_name)
+_project_index = SearchIndex(Project.project_id, Project.search_document)
+_trigram_available: bool | None = None
+
+
+def invalidate_employee_search():
+    _employee_index.invalidate()
+    _employee_name_index.invalidate()
+
+def invalidate_project_search():
+    _project_index.invalidate()
+
+
+def _has_trigram(db: Session) -> bool:
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+    return _trigram_available
+
+
+def _search(db: Session, term: str, index: SearchIndex):
+    """Devuelve (condición, orden por relevancia) para filtrar una query por `term`."""
+    doc = index.doc_column
+    needle = term.lower()
+    if db.get_bind().dialect.name == "postgresql":
+        condition = doc.ilike(f"%{needle}%")
+        ranking = []
+        tokens = tokenize(term)
+        if tokens:
+            tsv = func.to_tsvector(_SIMPLE, doc)
+            tsq = func.to_tsquery(_SIMPLE, " & ".join(f"{token}:*" for token in tokens))
+            condition = or_(tsv.op("@@")(tsq), condition)
+            ranking.append(desc(func.ts_rank(tsv, tsq)))
+        if _has_trigram(db):
+            ranking.append(desc(func.similarity(doc, needle)))
+        return condition, ranking
+
+    condition = doc.like(f"%{needle}%")
+    ranked, prefix_only = index.search(db, term)
+    if prefix_only:
+        condition = or_(condition, index.id_column.in_(prefix_only))
+    if not ranked:
+        return condition, []
+    ranking = case({row_id: pos for pos, row_id in enumerate(ranked)}, value=index.id_column, else_=len(ranked))
+    return condition, [ranking]
+
+
+def employee_search(db: Session, term: str):
+    return _search(db, term, _employee_index)
+
+def employee_name_search(db: Session, term: str):
+    return _search(db, term, _employee_name_index)
+
+def project_search(db: Session, term: str):
+    return _search(db, term, _project_index)
+
+
+_SEARCH_COLUMNS = [
+    (Employee.__table__, "search_document"),
+    (Employee.__table__, "search_name"),
+    (Project.__table__, "search_document"),
+]
+
+
+def search_index_ddl(table) -> list[str]:
+    """Sentencias PostgreSQL para añadir los documentos de búsqueda y sus índices a una tabla existente."""
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    for search_table, column in _SEARCH_COLUMNS:
+        if search_table is not table:
+            continue
+        expression = table.c[column].computed.sqltext
+        name = f"{table.name.lower()}_{column}"
+        statements += [
+            f'ALTER TABLE "{table.name}" ADD COLUMN IF NOT EXISTS {column} text GENERATED ALWAYS AS ({expression}) STORED',
+            f'CREATE INDEX IF NOT EXISTS ix_{name}_tsv ON "{table.name}" USING gin (to_tsvector(\'simple\'::regconfig, {column}))',
+            f'CREATE INDEX IF NOT EXISTS ix_{name}_trgm ON "{table.name}" USING gin ({column} gin_trgm_ops)',
+        ]
+    return statements
+
+
+def create_search_indexes(bind):
+    with bind.begin() as conn:
+        for table in (Employee.__table__, Project.__table__):
+            for statement in search_index_ddl(table):
+                conn.execute(text(statement))
+
+
+def _listen_for_create(table):
+    for statement in search_index_ddl(table):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+_listen_for_create(Employee.__table__)
+_listen_for_create(Project.__table__)
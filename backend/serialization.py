@@ -0,0 +1,34 @@
+from typing import Any
+from pydantic import BaseModel, TypeAdapter
+
+# Camino rápido para las respuestas de listas: la consulta pide solo las columnas del
+# schema, etiquetadas con el nombre de cada campo (with_entities / db.query(*columnas)),
+# las filas pasan a dicts sin construir objetos ORM y pydantic valida y serializa a JSON
+# una sola vez. FastAPI no vuelve a validar un modelo que ya es del tipo de la respuesta.
+#
+# No se usa ORJSONResponse: con un response_class propio FastAPI deja de serializar con
+# dump_json de pydantic-core, que es más rápido (ver benchmarks/serialization_benchmark.py).
+
+_adapters: dict[Any, TypeAdapter] = {}
+
+
+def adapter(model) -> TypeAdapter:
+    """TypeAdapter por tipo, cacheado: crearlo compila el validador y el serializador."""
+    cached = _adapters.get(model)
+    if cached is None:
+        cached = _adapters[model] = TypeAdapter(model)
+    return cached
+
+
+def columns(entity, schema: type[BaseModel], **sources) -> list:
+    """Una columna de `entity` por campo de `schema`, etiquetada con el nombre del campo;
+    `sources` da la columna o expresión de los campos que se llaman distinto."""
+    return [(sources[name] if name in sources else getattr(entity, name)).label(name) for name in schema.model_fields]
+
+
+def as_dicts(rows) -> list[dict]:
+    """Filas de una consulta de columnas -> dicts {campo: valor}."""
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
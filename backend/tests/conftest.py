@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# config.Settings lee el entorno al importarse: se fija antes de importar la app.
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+_database = os.path.join(tempfile.mkdtemp(), "test.db")
+for name, value in {
+    "SECRET_KEY": "test",
+    "DATABASE_URL": f"sqlite:///{_database}",
+    "smtp_port": "2525",
+    "smtp_server": "localhost",
+    "smtp_user": "test",
+    "smtp_password": "test",
+    "BCRYPT_ROUNDS": "4",
+    "BCRYPT_EXECUTOR": "thread",
+    "RATE_LIMIT_ENABLED": "false",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fastapi.testclient import TestClient
+from dependencies import Base, engine
+import models  # noqa: F401 (registra las tablas)
+from main import app
+
+Base.metadata.create_all(engine)
+
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+_emails = iter(range(1, 1_000_000))
+
+
+def register(client, role="Manager", name="Ana", last_name="Lopez", location="MTY", email=None) -> dict:
+    """Registra un empleado (con un correo único si no se indica); devuelve el encabezado Authorization."""
+    response = client.post("/auth/register", json={
+        "email": email or f"user{next(_emails)}@example.com", "password": "pw", "name": name,
+        "last_name_1": last_name, "last_name_2": None, "phone_number": "1", "location": location,
+        "capability": "Cloud", "position": "Dev", "seniority": 2, "role": role,
+    })
+    assert response.status_code == 200, response.text
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+
+@pytest.fixture
+def register_employee(client):
+    return lambda **fields: register(client, **fields)
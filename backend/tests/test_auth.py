@@ -0,0 +1,83 @@
+import otp_store
+import utils
+from config import settings
+from dependencies import SessionLocal
+from conftest import register
+
+
+def login(client, email: str, password: str = "pw"):
+    return client.post("/auth/token", data={"username": email, "password": password})
+
+
+def test_logins_are_shed_once_the_bcrypt_queue_is_full(client, monkeypatch):
+    register(client, email="shed@example.com")
+    # Los hilos que esperan a bcrypt salen del threadpool de las rutas (40 en AnyIO)
+    assert settings.BCRYPT_MAX_PENDING <= 10
+    monkeypatch.setattr(utils, "_password_pending", settings.BCRYPT_MAX_PENDING)
+    response = login(client, "shed@example.com")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    monkeypatch.setattr(utils, "_password_pending", 0)
+    assert login(client, "shed@example.com").status_code == 200
+
+
+def tokens(client, email: str, password: str = "pw") -> dict:
+    response = login(client, email, password)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def refresh(client, token: str):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+
+def test_password_change_on_profile_revokes_refresh_tokens(client):
+    register(client, email="revoke-profile@example.com")
+    issued = tokens(client, "revoke-profile@example.com")
+    rotated = refresh(client, issued["refresh_token"])
+    assert rotated.status_code == 200
+
+    headers = {"Authorization": "Bearer " + issued["access_token"]}
+    assert client.put("/profile/edit", headers=headers, json={"password": "new"}).status_code == 200
+    assert refresh(client, issued["refresh_token"]).status_code == 401
+    assert refresh(client, rotated.json()["refresh_token"]).status_code == 401
+    assert refresh(client, tokens(client, "revoke-profile@example.com", "new")["refresh_token"]).status_code == 200
+
+
+def test_password_reset_by_otp_revokes_refresh_tokens(client):
+    email = "revoke-otp@example.com"
+    register(client, email=email)
+    issued = tokens(client, email)
+    with SessionLocal() as db:
+        code = otp_store.issue(db, email)
+        db.commit()
+    response = client.post("/otp/verify", json={"email": email, "otp": code, "password": "reset"})
+    assert response.status_code == 200, response.text
+    assert refresh(client, issued["refresh_token"]).status_code == 401
+    assert refresh(client, tokens(client, email, "reset")["refresh_token"]).status_code == 200
+
+
+def test_refresh_token_is_not_a_bearer_token(client):
+    register(client, email="bearer@example.com")
+    issued = tokens(client, "bearer@example.com")
+    assert client.get("/profile/my-info", headers={"Authorization": "Bearer " + issued["access_token"]}).status_code == 200
+    assert client.get("/profile/my-info", headers={"Authorization": "Bearer " + issued["refresh_token"]}).status_code == 401
+    # Y al revés: un access token no sirve para refrescar
+    assert refresh(client, issued["access_token"]).status_code == 401
+
+
+def test_token_cache_drops_entries_at_their_exp(monkeypatch):
+    cache = utils.TokenCache(max_size=2)
+    now = 1_000_000.0
+    monkeypatch.setattr(utils.time, "time", lambda: now)
+    cache.put("short", {"id": 1, "exp": now + 10}, 0.001)
+    cache.put("long", {"id": 2, "exp": now + 100}, 0.001)
+    assert cache.get("short") == {"id": 1, "exp": now + 10}
+
+    now += 10
+    assert cache.get("short") is None
+    assert cache.snapshot()["size"] == 1
+    assert cache.get("long")["id"] == 2
+    # Sin "exp" no se guarda
+    cache.put("forever", {"id": 3}, 0.001)
+    assert cache.get("forever") is None
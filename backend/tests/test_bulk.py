@@ -0,0 +1,72 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import utils
+from config import settings
+
+
+def upload(client, headers, kind: str, name: str, body: str):
+    return client.post(f"/bulk/import/{kind}", headers=headers, files={"file": (name, body.encode("utf-8"))})
+
+
+def employee(email: str, last_name: str) -> dict:
+    return {
+        "email": email, "password": "pw", "name": "Carga", "last_name_1": last_name, "last_name_2": None,
+        "phone_number": "1", "location": "BLK", "capability": "Cloud", "position": "Dev", "seniority": 1, "role": "Developer",
+    }
+
+
+def test_malformed_lines_are_reported_per_row(client, register_employee, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_BATCH_SIZE", 2)
+    manager = register_employee()
+    lines = [json.dumps(employee(f"bulk{i}@example.com", f"Masivo{i}")) for i in range(5)]
+    lines.insert(3, '{"email": "roto@example.com", ')
+    response = upload(client, manager, "employees", "employees.jsonl", "\n".join(lines) + "\n")
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["inserted"], result["failed"]) == (5, 1)
+    assert result["errors"][0]["row"] == 4 and result["errors"][0]["error"].startswith("Invalid JSON")
+    # Los caches ven los lotes confirmados, incluida la fila que compartía lote con la rota
+    found = client.get("/users?search=masivo", headers=manager).json()
+    assert sorted(item["last_name_1"] for item in found["items"]) == [f"Masivo{i}" for i in range(5)]
+
+
+def test_csv_rows_keep_their_numbers(client, register_employee):
+    manager = register_employee()
+    fields = list(employee("x", "y"))
+    rows = [",".join(fields)] + [
+        ",".join(str(value) if value is not None else "" for value in employee(f"csv{i}@example.com", f"Planilla{i}").values())
+        for i in range(2)
+    ]
+    rows.insert(2, "csv-roto@example.com,pw")
+    response = upload(client, manager, "employees", "employees.csv", "\n".join(rows) + "\n")
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["inserted"], result["failed"]) == (2, 1)
+    assert result["errors"][0]["row"] == 2
+
+
+def test_bulk_hashing_submits_in_windows(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_WORKERS", 2)
+    executor = ThreadPoolExecutor(max_workers=2)
+    lock, pending, peak = Lock(), [0], [0]
+
+    class Tracking:
+        def submit(self, fn, *args):
+            with lock:
+                pending[0] += 1
+                peak[0] = max(peak[0], pending[0])
+            future = executor.submit(fn, *args)
+            future.add_done_callback(lambda _: done())
+            return future
+
+    def done():
+        with lock:
+            pending[0] -= 1
+
+    monkeypatch.setattr(utils, "_get_password_executor", lambda: Tracking())
+    hashes = utils.hash_passwords([f"pw{i}" for i in range(7)])
+    executor.shutdown()
+    assert len(hashes) == 7 and all(utils._checkpw(f"pw{i}".encode(), hashed) for i, hashed in enumerate(hashes))
+    # Nunca hay más trabajos en cola que workers: los logins no esperan detrás del lote
+    assert peak[0] <= 2
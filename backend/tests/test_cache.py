@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import event
+import cache
+from cache import FakeCache
+from config import settings
+from dependencies import engine
+
+
+@pytest.fixture
+def fake_cache():
+    previous = cache.get_backend()
+    backend = FakeCache()
+    cache.set_backend(backend)
+    yield backend
+    cache.set_backend(previous)
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def count(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def my_skills(client, headers, tag=None):
+    return client.get("/skills/my-skills", headers={**headers, **({"If-None-Match": tag} if tag else {})})
+
+
+def test_matching_if_none_match_is_a_304_without_queries(client, register_employee, fake_cache, statements):
+    developer = register_employee(role="Developer")
+    first = my_skills(client, developer)
+    assert first.status_code == 200
+    tag = first.headers["ETag"]
+
+    statements.clear()
+    response = my_skills(client, developer, tag)
+    assert response.status_code == 304 and response.headers["ETag"] == tag
+    # Principal cacheado y versión en el backend: no se consulta la base
+    assert statements == []
+    assert my_skills(client, developer, f'W/{tag}, "otro"').status_code == 304
+
+
+def test_cached_body_is_served_without_queries(client, register_employee, fake_cache, statements):
+    developer = register_employee(role="Developer")
+    first = my_skills(client, developer)
+    hits = fake_cache.hits
+
+    statements.clear()
+    second = my_skills(client, developer)
+    assert second.status_code == 200 and second.content == first.content
+    assert statements == []
+    assert fake_cache.hits > hits
+
+
+def test_writes_bump_the_version(client, register_employee, fake_cache):
+    developer = register_employee(role="Developer")
+    tag = my_skills(client, developer).headers["ETag"]
+    assert client.post("/skills/add", headers=developer, json={"name": "Elixir", "type": "hard", "level": 2}).status_code == 200
+
+    response = my_skills(client, developer, tag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != tag
+    assert [skill["name"] for skill in response.json()] == ["Elixir"]
+
+    # Una importación masiva invalida a todos los usuarios
+    tag = response.headers["ETag"]
+    cache.bump_all()
+    assert my_skills(client, developer, tag).status_code == 200
+
+
+def test_versions_expire_with_the_ttl(client, register_employee, fake_cache):
+    developer = register_employee(role="Developer")
+    tag = my_skills(client, developer).headers["ETag"]
+    fake_cache.advance(settings.CACHE_TTL_SECONDS - 1)
+    assert my_skills(client, developer, tag).status_code == 304
+    # Versión expirada: se reemplaza por una nueva y el ETag anterior deja de valer
+    fake_cache.advance(2)
+    assert my_skills(client, developer, tag).status_code == 200
@@ -0,0 +1,75 @@
+import asyncio
+import httpx
+import pytest
+import search
+from dependencies import SessionLocal
+from main import app
+from matching import skill_matrix
+from models import ProjectRole
+from scheduling import schedule_cache
+
+pytestmark = pytest.mark.anyio
+
+
+def async_client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_concurrent_searches_rebuilding_the_index(register_employee):
+    headers = register_employee(last_name="Concurrente")
+    search.invalidate_employee_search()
+    async with async_client() as client:
+        responses = await asyncio.wait_for(
+            asyncio.gather(*[client.get("/users?search=concurrente", headers=headers) for _ in range(8)]), 30
+        )
+    assert [response.status_code for response in responses] == [200] * 8
+    assert all(response.json()["total"] == 1 for response in responses)
+
+
+async def test_handler_waiting_on_a_lock_does_not_block_the_event_loop(register_employee):
+    headers = register_employee(last_name="Bloqueado")
+    async with async_client() as client:
+        assert (await client.get("/users?search=bloqueado", headers=headers)).status_code == 200
+        index_lock = search._employee_index._lock
+        index_lock.acquire()
+        try:
+            blocked = asyncio.create_task(client.get("/users?search=bloqueado", headers=headers))
+            await asyncio.sleep(0.2)
+            # Con el handler esperando el lock, el loop sigue atendiendo otras peticiones
+            other = await asyncio.wait_for(client.get("/projects", headers=headers), 10)
+            assert other.status_code == 200
+            assert not blocked.done()
+        finally:
+            index_lock.release()
+        assert (await asyncio.wait_for(blocked, 10)).status_code == 200
+
+
+async def test_concurrent_candidates_rebuilding_the_skill_matrix(client, register_employee):
+    manager = register_employee()
+    developer = register_employee(role="Developer", name="Dev")
+    assert client.post("/skills/add", headers=developer, json={"name": "Rust", "type": "hard", "level": 5}).status_code == 200
+    with SessionLocal() as db:
+        role = ProjectRole(name="Backend")
+        db.add(role)
+        db.commit()
+        role_id = role.role_id
+    client.put(f"/project-roles/{role_id}/skills", headers=manager, json=[{"name": "Rust", "level": 4}])
+    skill_matrix.invalidate()
+    async with async_client() as client:
+        responses = await asyncio.wait_for(
+            asyncio.gather(*[client.get(f"/project-roles/{role_id}/candidates", headers=manager) for _ in range(4)]), 30
+        )
+    assert [response.status_code for response in responses] == [200] * 4
+    assert all(response.json() == responses[0].json() != [] for response in responses)
+
+
+async def test_concurrent_availability_reloading_the_schedule(register_employee):
+    manager = register_employee()
+    register_employee(role="Developer", name="Libre")
+    schedule_cache.invalidate()
+    async with async_client() as client:
+        responses = await asyncio.wait_for(asyncio.gather(*[
+            client.get("/staffing/available?start_date=2030-01-01&end_date=2030-02-01", headers=manager) for _ in range(4)
+        ]), 30)
+    assert [response.status_code for response in responses] == [200] * 4
+    assert all(response.json() == responses[0].json() != [] for response in responses)
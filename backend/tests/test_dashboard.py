@@ -0,0 +1,22 @@
+import analytics
+from dependencies import SessionLocal
+from models import DashboardCounter
+
+
+def test_dashboard_get_is_read_only_until_rebuilt(client, register_employee, monkeypatch):
+    manager = register_employee()
+    developer = register_employee(role="Developer", name="Dev")
+    client.post("/skills/add", headers=developer, json={"name": "Go", "type": "hard", "level": 3})
+    with SessionLocal() as db:
+        db.query(DashboardCounter).delete()
+        db.commit()
+    monkeypatch.setattr(analytics, "_built", False)
+
+    live = client.get("/dashboard", headers=manager)
+    assert live.status_code == 200
+    with SessionLocal() as db:
+        assert not analytics.dashboard_built(db)
+        assert db.query(DashboardCounter).count() == 0
+
+    assert client.post("/dashboard/rebuild", headers=manager).status_code == 200
+    assert client.get("/dashboard", headers=manager).json() == live.json()
@@ -0,0 +1,37 @@
+from dependencies import SessionLocal
+from directory import directory_snapshot
+
+SURNAMES = ["ábalos", "Álvarez", "Ébano", "Ñuñez", "Zamora", "alba", "Oñate"]
+
+
+def surnames(response) -> list[str]:
+    assert response.status_code == 200, response.text
+    return [item["last_name_1"] for item in response.json()["items"]]
+
+
+def test_alphabetical_snapshot_matches_sql_for_accented_surnames(client, register_employee):
+    manager = register_employee(location="ACENTOS")
+    for last_name in SURNAMES:
+        register_employee(role="Developer", last_name=last_name, location="ACENTOS")
+    path = "/users?alphabetical=true&location=ACENTOS&size=5"
+
+    # Foto invalidada: la respuesta sale de SQL
+    directory_snapshot.invalidate()
+    from_sql = [surnames(client.get(f"{path}&page={page}", headers=manager)) for page in (1, 2)]
+
+    with SessionLocal() as db:
+        directory_snapshot.rebuild(db)
+    assert directory_snapshot.page(1, 5, location="ACENTOS", alphabetical=True) is not None
+    from_snapshot = [surnames(client.get(f"{path}&page={page}", headers=manager)) for page in (1, 2)]
+    assert from_snapshot == from_sql
+
+
+def test_new_surname_sends_alphabetical_pages_to_sql_until_rebuilt(client, register_employee):
+    manager = register_employee(location="ALTAS")
+    with SessionLocal() as db:
+        directory_snapshot.rebuild(db)
+    register_employee(role="Developer", last_name="Éter", location="ALTAS")
+    # Por id se sigue sirviendo la foto; el alfabético necesita el orden de la base
+    assert directory_snapshot.page(1, 50, location="ALTAS") is not None
+    assert directory_snapshot.page(1, 50, location="ALTAS", alphabetical=True) is None
+    assert surnames(client.get("/users?alphabetical=true&location=ALTAS", headers=manager)) == ["Lopez", "Éter"]
@@ -0,0 +1,7 @@
+import explain_check
+from dependencies import engine
+
+
+def test_hot_queries_use_indexes():
+    # {consulta: tablas recorridas completas}; vacío si todas usan un índice
+    assert explain_check.check(engine) == {}
@@ -0,0 +1,35 @@
+def goal(title: str) -> dict:
+    return {"title": title, "category": "Career", "description": "d", "term": "short"}
+
+
+def add_goal(client, headers, title: str) -> int:
+    response = client.post("/goals/add", headers=headers, json=goal(title))
+    assert response.status_code == 200, response.text
+    return response.json()["goal_id"]
+
+
+def test_batch_can_recreate_a_title_deleted_in_the_same_batch(client, register_employee):
+    headers = register_employee()
+    goal_id = add_goal(client, headers, "Aprender Rust")
+    result = client.post("/goals/batch", headers=headers, json={"delete": [goal_id], "create": [goal("aprender rust")]}).json()
+    assert (result["created"], result["deleted"], result["failed"]) == (1, 1, 0)
+
+
+def test_batch_update_cannot_rename_onto_an_existing_title(client, register_employee):
+    headers = register_employee()
+    first = add_goal(client, headers, "Uno")
+    add_goal(client, headers, "Dos")
+    result = client.post("/goals/batch", headers=headers, json={
+        "update": [{"goal_id": first, **goal("DOS")}],
+        "create": [goal("Uno")],
+    }).json()
+    # El update se rechaza, así que "Uno" sigue ocupado para el create
+    assert (result["updated"], result["created"], result["failed"]) == (0, 0, 2)
+
+    result = client.post("/goals/batch", headers=headers, json={
+        "update": [{"goal_id": first, **goal("Tres")}],
+        "create": [goal("Uno")],
+    }).json()
+    assert (result["updated"], result["created"], result["failed"]) == (1, 1, 0)
+    titles = sorted(item["title"] for item in client.get("/goals/my-goals", headers=headers).json())
+    assert titles == ["Dos", "Tres", "Uno"]
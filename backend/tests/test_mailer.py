@@ -0,0 +1,110 @@
+import smtplib
+import time
+import mailer
+from mailer import MailQueue, SMTPTransport, build_otp_message
+
+
+class FakeTransport:
+    def __init__(self, failures: int = 0, delay: float = 0):
+        self.failures = failures
+        self.delay = delay
+        self.sent = []
+        self.closes = 0
+
+    def send(self, message):
+        if self.delay:
+            time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise smtplib.SMTPServerDisconnected("dropped")
+        self.sent.append(message["To"])
+
+    def close(self):
+        self.closes += 1
+
+
+class FakeSMTP:
+    """Sustituye a smtplib.SMTP: la primera conexión se cae en el primer envío."""
+    connections = []
+
+    def __init__(self, server, port, timeout):
+        self.logins = 0
+        self.sent = []
+        self.drop = not FakeSMTP.connections
+        FakeSMTP.connections.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def sendmail(self, sender, receiver, body):
+        if self.drop:
+            raise smtplib.SMTPServerDisconnected("connection unexpectedly closed")
+        self.sent.append(receiver)
+
+    def quit(self):
+        pass
+
+
+def messages(count: int):
+    return [build_otp_message(f"mail{i}@example.com", 123456) for i in range(count)]
+
+
+def test_queue_delivers_every_message():
+    transport = FakeTransport()
+    mail = MailQueue(transport_factory=lambda: transport, workers=2)
+    for message in messages(5):
+        mail.enqueue(message)
+    mail.join()
+    assert sorted(transport.sent) == sorted(f"mail{i}@example.com" for i in range(5))
+    assert (mail.sent, mail.failed) == (5, 0)
+    mail.stop()
+
+
+def test_queue_retries_with_backoff_then_gives_up(monkeypatch):
+    delays = []
+    monkeypatch.setattr(mailer.time, "sleep", delays.append)
+    transport = FakeTransport(failures=10)
+    mail = MailQueue(transport_factory=lambda: transport, workers=1, max_retries=3, backoff_seconds=0.5)
+    mail.enqueue(messages(1)[0])
+    mail.join()
+    assert delays == [0.5, 1.0, 2.0]
+    assert (mail.sent, mail.failed) == (0, 1)
+    assert transport.failures == 6
+    mail.stop()
+
+
+def test_queue_recovers_after_a_failed_attempt(monkeypatch):
+    monkeypatch.setattr(mailer.time, "sleep", lambda seconds: None)
+    transport = FakeTransport(failures=1)
+    mail = MailQueue(transport_factory=lambda: transport, workers=1, max_retries=3)
+    mail.enqueue(messages(1)[0])
+    mail.join()
+    assert transport.sent == ["mail0@example.com"]
+    assert (mail.sent, mail.failed) == (1, 0)
+    mail.stop()
+
+
+def test_transport_reconnects_after_a_dropped_connection(monkeypatch):
+    monkeypatch.setattr(FakeSMTP, "connections", [])
+    monkeypatch.setattr(mailer.smtplib, "SMTP", FakeSMTP)
+    transport = SMTPTransport("localhost", 2525, "user", "secret")
+    first, second = messages(2)
+    transport.send(first)
+    transport.send(second)
+    dropped, reopened = FakeSMTP.connections
+    assert dropped.sent == [] and reopened.sent == ["mail0@example.com", "mail1@example.com"]
+    assert dropped.logins == reopened.logins == 1
+    transport.close()
+
+
+def test_stop_drains_pending_messages():
+    transport = FakeTransport(delay=0.01)
+    mail = MailQueue(transport_factory=lambda: transport, workers=2)
+    for message in messages(10):
+        mail.enqueue(message)
+    mail.stop()
+    assert len(transport.sent) == mail.sent == 10
+    assert transport.closes == 2
@@ -0,0 +1,48 @@
+from dependencies import SessionLocal
+from matching import SkillMatrix, _Levels
+from models import Employee, ProjectRole, Skill
+from schemas import EmployeeRole
+
+
+def test_skill_matrix_picks_up_other_instances_writes_after_ttl(register_employee):
+    register_employee(role="Developer", last_name="Matriz")
+    now = [0.0]
+    matrix = SkillMatrix(ttl=60, clock=lambda: now[0])
+    with SessionLocal() as db:
+        employee_id = db.query(Employee.employee_id).filter(Employee.last_name_1 == "Matriz").scalar()
+        assert matrix.top_candidates(db, [("Zig", 3)], 10) == []
+
+        # Escritura que esta instancia no ve (otro worker): la matriz sigue vigente
+        db.add(Skill(name="Zig", level=3, type="hard", employee_id=employee_id))
+        db.commit()
+        now[0] = 59
+        assert matrix.top_candidates(db, [("Zig", 3)], 10) == []
+
+        now[0] = 61
+        assert matrix.top_candidates(db, [("Zig", 3)], 10) == [(employee_id, 1.0, 1)]
+
+
+def test_levels_are_sparse_and_names_normalized():
+    levels = _Levels()
+    levels.set_employee(1, EmployeeRole.Developer, [("Python", 3), (" python ", 5), ("Go", 2)])
+    levels.set_employee(2, EmployeeRole.Developer, [("GO", 4)])
+    assert levels.columns == {"python": {0: 5}, "go": {0: 2, 1: 4}}
+    # Las skills que ya nadie tiene salen del vocabulario
+    levels.set_employee(1, EmployeeRole.Developer, [("Rust", 1)])
+    assert levels.columns == {"go": {1: 4}, "rust": {0: 1}}
+
+    matrix = SkillMatrix(ttl=float("inf"))
+    matrix.install(levels)
+    assert matrix.top_candidates(None, [("  GO", 4), ("Rust", 2)], 10) == [(2, 0.5, 1), (1, 0.25, 0)]
+
+
+def test_role_requirements_reject_duplicate_skills(client, register_employee):
+    manager = register_employee()
+    with SessionLocal() as db:
+        role = ProjectRole(name="Duplicada")
+        db.add(role)
+        db.commit()
+        role_id = role.role_id
+    response = client.put(f"/project-roles/{role_id}/skills", headers=manager, json=[{"name": "Python", "level": 3}, {"name": " python", "level": 4}])
+    assert response.status_code == 400
+    assert client.get(f"/project-roles/{role_id}/skills", headers=manager).json() == []
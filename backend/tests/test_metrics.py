@@ -0,0 +1,34 @@
+from config import settings
+
+
+def test_pool_and_token_metrics_are_for_managers(client, register_employee):
+    manager = register_employee()
+    developer = register_employee(role="Developer")
+    for path in ("/metrics/pool", "/metrics/tokens"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers=developer).status_code == 403
+        assert client.get(path, headers=manager).status_code == 200
+
+
+def test_prometheus_endpoint_requires_the_metrics_token_when_set(client, monkeypatch):
+    assert client.get("/metrics").status_code == 200
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+
+def test_each_pool_reports_waits_to_its_own_metrics(tmp_path):
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.pool import QueuePool
+    from metrics import PoolMetrics, instrumented_pool, pool_metrics
+
+    own = PoolMetrics()
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}", poolclass=instrumented_pool(QueuePool, own))
+    own.attach(other.pool)
+    before = pool_metrics.snapshot()["waits"]
+    with other.connect() as connection:
+        connection.execute(text("select 1"))
+    assert own.snapshot()["waits"] == own.snapshot()["checkouts"] == 1
+    assert pool_metrics.snapshot()["waits"] == before
+    other.dispose()
@@ -0,0 +1,96 @@
+import argparse
+import io
+import os
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, inspect, text
+import explain_check
+import search
+from dependencies import Base
+from models import Employee, Project
+
+alembic = pytest.importorskip("alembic")
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Índices GIN que search.py crea fuera de la metadata (DDL after_create), solo en PostgreSQL
+SEARCH_INDEXES = {f"ix_{table.name.lower()}_{column}_{kind}" for table, column in search._SEARCH_COLUMNS for kind in ("tsv", "trgm")}
+
+
+def alembic_config(url: str, output: io.StringIO | None = None) -> Config:
+    config = Config(output_buffer=output)
+    config.set_main_option("script_location", os.path.join(BACKEND, "migrations"))
+    config.cmd_opts = argparse.Namespace(x=[f"url={url}"])
+    return config
+
+
+def differences(url: str) -> list:
+    def include(obj, name, kind, reflected, compare_to):
+        return not (kind == "index" and name in SEARCH_INDEXES)
+
+    with create_engine(url).connect() as connection:
+        context = MigrationContext.configure(connection, opts={"compare_type": True, "include_object": include})
+        return compare_metadata(context, Base.metadata)
+
+
+def assert_matches_models(url: str):
+    assert differences(url) == []
+    # compare_metadata no compara Computed: STORED como declara models.py
+    columns = {(table.name, column["name"]): column.get("computed") for table in (Employee.__table__, Project.__table__) for column in inspect(create_engine(url)).get_columns(table.name)}
+    for table, column in search._SEARCH_COLUMNS:
+        assert columns[(table.name, column)]["persisted"] is True
+
+
+def tables(url: str) -> set[str]:
+    return set(inspect(create_engine(url)).get_table_names())
+
+
+def databases(tmp_path) -> list[str]:
+    urls = [f"sqlite:///{tmp_path / 'migrations.db'}"]
+    # Base de PostgreSQL vacía (opcional), p. ej. postgresql://postgres@/scratch?host=/tmp
+    if os.environ.get("TEST_POSTGRES_URL"):
+        urls.append(os.environ["TEST_POSTGRES_URL"])
+    return urls
+
+
+def test_upgrade_matches_models_and_downgrade_removes_everything(tmp_path):
+    for url in databases(tmp_path):
+        command.upgrade(alembic_config(url), "head")
+        assert_matches_models(url)
+        assert explain_check.check(create_engine(url)) == {}
+        command.downgrade(alembic_config(url), "base")
+        assert tables(url) == {"alembic_version"}
+
+
+def test_offline_sql_upgrades_and_downgrades_sqlite(tmp_path):
+    url = f"sqlite:///{tmp_path / 'offline.db'}"
+    upgrade, downgrade = io.StringIO(), io.StringIO()
+    command.upgrade(alembic_config(url, upgrade), "head", sql=True)
+    command.downgrade(alembic_config(url, downgrade), "head:base", sql=True)
+    with sqlite3.connect(tmp_path / "offline.db") as connection:
+        connection.executescript(upgrade.getvalue())
+    assert_matches_models(url)
+    with sqlite3.connect(tmp_path / "offline.db") as connection:
+        connection.executescript(downgrade.getvalue())
+    assert tables(url) == {"alembic_version"}
+
+
+def test_search_columns_are_filled_for_existing_rows(tmp_path):
+    url = f"sqlite:///{tmp_path / 'existing.db'}"
+    command.upgrade(alembic_config(url), "0001_initial")
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text('INSERT INTO "User" (id, email, hashed_password) VALUES (1, \'a@example.com\', \'x\')'))
+        connection.execute(text(
+            'INSERT INTO "Employee" (employee_id, user_id, name, last_name_1, phone_number, location, capability, position, seniority, role) '
+            "VALUES (1, 1, 'Ana', 'Migrada', '1', 'MTY', 'Cloud', 'Dev', 2, 'Manager')"
+        ))
+        connection.execute(text('INSERT INTO "Project" (project_id, projectname, client) VALUES (1, \'Legado\', \'Cliente\')'))
+    command.upgrade(alembic_config(url), "head")
+    with engine.connect() as connection:
+        assert connection.execute(text('SELECT search_name FROM "Employee"')).scalar() == "ana migrada "
+        assert connection.execute(text('SELECT search_document FROM "Project"')).scalar() == "legado cliente "
+        assert connection.execute(text('SELECT token_version FROM "User"')).scalar() == 0
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+import otp_store
+from config import settings
+from dependencies import SessionLocal
+
+
+def test_verifying_a_code_does_not_reset_the_send_limit(register_employee, monkeypatch):
+    monkeypatch.setattr(settings, "OTP_SEND_LIMIT", 2)
+    email = "otp-limit@example.com"
+    register_employee(email=email)
+    now = datetime(2030, 1, 1, 12, 0)
+    with SessionLocal() as db:
+        code = otp_store.issue(db, email, now)
+        otp_store.consume(db, email, code, now)
+        db.commit()
+        # El código usado ya no sirve
+        with pytest.raises(HTTPException) as error:
+            otp_store.consume(db, email, code, now)
+        assert error.value.status_code == 404
+
+        otp_store.issue(db, email, now + timedelta(minutes=1))
+        with pytest.raises(HTTPException) as error:
+            otp_store.issue(db, email, now + timedelta(minutes=2))
+        assert error.value.status_code == 429
+
+        # Al terminar la ventana se puede pedir otro
+        otp_store.issue(db, email, now + timedelta(minutes=settings.OTP_SEND_WINDOW_MINUTES + 1))
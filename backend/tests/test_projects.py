@@ -0,0 +1,79 @@
+from datetime import date
+import pytest
+from conftest import register
+from dependencies import SessionLocal
+from models import Employee, Project
+from utils import encode_cursor
+
+# Nombres repetidos y fechas NULL o iguales: los casos difíciles del keyset
+PROJECTS = [
+    ("Cursor Beta", date(2030, 3, 1)),
+    ("Cursor Alpha", None),
+    ("Cursor Beta", date(2030, 1, 1)),
+    ("Cursor Alpha", date(2030, 1, 1)),
+    ("Cursor Gamma", None),
+    ("Cursor Beta", None),
+    ("Cursor Alpha", date(2030, 3, 1)),
+]
+ORDER_COLUMNS = {"project_id": Project.project_id, "projectname": Project.projectname, "startdate": Project.startdate}
+
+
+@pytest.fixture(scope="module")
+def manager(client):
+    headers = register(client, last_name="Cursores")
+    with SessionLocal() as db:
+        manager_id = db.query(Employee.employee_id).filter(Employee.last_name_1 == "Cursores").scalar()
+        db.add_all(
+            Project(projectname=name, client="Keyset", description="d", startdate=start, enddate=date(2031, 1, 1), manager_id=manager_id, employees_req=1)
+            for name, start in PROJECTS
+        )
+        db.commit()
+    return headers
+
+
+def walk(client, headers, order_by: str, size: int) -> list[int]:
+    ids, cursor = [], None
+    while True:
+        params = {"order_by": order_by, "size": size}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/projects/cursor", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids += [item["project_id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("order_by", ["project_id", "projectname", "startdate"])
+@pytest.mark.parametrize("size", [1, 2, 3])
+def test_cursor_pages_have_no_duplicates_or_gaps(client, manager, order_by, size):
+    column = ORDER_COLUMNS[order_by]
+    with SessionLocal() as db:
+        expected = [project_id for (project_id,) in db.query(Project.project_id).order_by(column.asc().nulls_last(), Project.project_id)]
+    assert walk(client, manager, order_by, size) == expected
+
+
+def test_null_start_dates_come_last_and_ties_break_by_id(client, manager):
+    with SessionLocal() as db:
+        rows = {project_id: start for project_id, start in db.query(Project.project_id, Project.startdate).filter(Project.client == "Keyset")}
+    ordered = [project_id for project_id in walk(client, manager, "startdate", 2) if project_id in rows]
+    dates = [rows[project_id] for project_id in ordered]
+    assert dates == sorted(dates, key=lambda value: (value is None, value or date.min))
+    for previous, current in zip(ordered, ordered[1:]):
+        if rows[previous] == rows[current]:
+            assert previous < current
+
+
+def test_invalid_cursors_are_rejected(client, manager):
+    first = client.get("/projects/cursor", headers=manager, params={"order_by": "projectname", "size": 1}).json()
+    for order_by, cursor in [
+        ("startdate", first["next_cursor"]),  # cursor de otro orden
+        ("projectname", "not-a-cursor"),
+        ("projectname", encode_cursor(["projectname", 1])),
+        ("projectname", encode_cursor({"order_by": "projectname", "value": "x"})),
+        ("startdate", encode_cursor({"order_by": "startdate", "value": "not-a-date", "id": 1})),
+    ]:
+        response = client.get("/projects/cursor", headers=manager, params={"order_by": order_by, "cursor": cursor})
+        assert response.status_code == 400, (order_by, cursor, response.text)
@@ -0,0 +1,130 @@
+import asyncio
+import httpx
+import pytest
+import ratelimit
+from fastapi import FastAPI
+from config import settings
+from ratelimit import Admission, MemoryBuckets, RateLimitMiddleware, Rule
+from utils import create_access_token, token_cache, verify_token
+
+pytestmark = pytest.mark.anyio
+
+inner = FastAPI()
+release = asyncio.Event()
+
+
+@inner.get("/users")
+@inner.post("/auth/token")
+@inner.get("/metrics")
+async def ok():
+    return {"ok": True}
+
+
+@inner.get("/slow")
+async def slow():
+    await release.wait()
+    return {"ok": True}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    previous = ratelimit.get_backend()
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    ratelimit.set_backend(MemoryBuckets(100, clock=clock))
+    yield clock
+    ratelimit.set_backend(previous)
+
+
+def limited(rules, ip="10.0.0.1"):
+    app = RateLimitMiddleware(inner, rules=rules)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(ip, 1234)), base_url="http://test")
+
+
+def bearer(user_id: int, verified: bool = True) -> dict:
+    token = create_access_token({"id": user_id, "role": "Employee"})
+    if verified:
+        # Lo que hace get_current_principal en la primera petición
+        verify_token(token)
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_exceeding_a_rule_returns_429_with_retry_after(clock):
+    async with limited({("POST", "/auth/token"): Rule("login", 2, 60)}) as client:
+        assert [(await client.post("/auth/token")).status_code for _ in range(2)] == [200, 200]
+        response = await client.post("/auth/token")
+        assert response.status_code == 429
+        # Un token cada 30 s
+        assert response.headers["Retry-After"] == "30"
+        clock.now += 30
+        assert (await client.post("/auth/token")).status_code == 200
+
+
+async def test_user_rules_key_by_verified_token_and_fall_back_to_ip(clock):
+    rules = {("GET", "/users"): Rule("search", 1, 60, "user")}
+    first, second = bearer(9_000_001), bearer(9_000_002)
+    async with limited(rules, "10.0.0.1") as client, limited(rules, "10.0.0.2") as other_ip:
+        # Mismo IP, usuarios distintos: buckets distintos
+        assert (await client.get("/users", headers=first)).status_code == 200
+        assert (await client.get("/users", headers=second)).status_code == 200
+        # Mismo usuario desde otra IP: el mismo bucket
+        assert (await other_ip.get("/users", headers=first)).status_code == 429
+        # Sin token, o con uno que nadie verificó todavía, cuenta contra la IP
+        assert (await other_ip.get("/users")).status_code == 200
+        assert (await other_ip.get("/users", headers=bearer(9_000_003, verified=False))).status_code == 429
+        assert (await other_ip.get("/users", headers={"Authorization": "Bearer forged"})).status_code == 429
+
+
+async def test_ip_rules_ignore_the_token(clock):
+    rules = {("POST", "/auth/token"): Rule("login", 1, 60)}
+    async with limited(rules, "10.0.0.3") as client, limited(rules, "10.0.0.4") as other_ip:
+        assert (await client.post("/auth/token", headers=bearer(9_000_004))).status_code == 200
+        assert (await client.post("/auth/token", headers=bearer(9_000_005))).status_code == 429
+        assert (await other_ip.post("/auth/token")).status_code == 200
+
+
+async def test_keying_does_not_verify_tokens(clock, monkeypatch):
+    headers = bearer(9_000_006, verified=False)
+    snapshot = token_cache.snapshot()
+    monkeypatch.setattr("utils.jwt.decode", lambda *args, **kwargs: pytest.fail("verified on the event loop"))
+    async with limited({("GET", "/users"): Rule("search", 5, 60, "user")}) as client:
+        assert (await client.get("/users", headers=headers)).status_code == 200
+    after = token_cache.snapshot()
+    assert (after["hits"], after["misses"]) == (snapshot["hits"], snapshot["misses"])
+
+
+async def test_search_rule_applies_to_the_directory_only_with_search(clock):
+    rule = ratelimit.RULES[("GET", "/users")]
+    assert rule.query == "search"
+    headers = bearer(9_000_007)
+    async with limited({("GET", "/users"): Rule("search", 1, 60, "user", query="search")}) as client:
+        assert [(await client.get("/users?page=1", headers=headers)).status_code for _ in range(3)] == [200] * 3
+        assert (await client.get("/users?search=", headers=headers)).status_code == 200
+        assert (await client.get("/users?search=ana", headers=headers)).status_code == 200
+        assert (await client.get("/users?search=lopez", headers=headers)).status_code == 429
+
+
+async def test_admission_sheds_with_503_at_max_in_flight(clock, monkeypatch):
+    monkeypatch.setattr(ratelimit, "admission", Admission(1))
+    release.clear()
+    async with limited({}) as client:
+        held = asyncio.create_task(client.get("/slow"))
+        while ratelimit.admission.in_flight < 1:
+            await asyncio.sleep(0.01)
+        response = await client.get("/users")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        # El monitoreo no pasa por el control de admisión
+        assert (await client.get("/metrics")).status_code == 200
+        release.set()
+        assert (await asyncio.wait_for(held, 10)).status_code == 200
+        assert ratelimit.admission.in_flight == 0
+        assert (await client.get("/users")).status_code == 200
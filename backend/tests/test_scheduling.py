@@ -0,0 +1,83 @@
+import asyncio
+import httpx
+import pytest
+import scheduling
+from dependencies import SessionLocal
+from main import app
+from models import Developer, Employee, ProjectRole, RoleDeveloper
+from scheduling import ScheduleCache, schedule_cache
+
+
+def test_schedule_cache_expires_after_ttl():
+    now = [0.0]
+    cache = ScheduleCache(ttl=60, clock=lambda: now[0])
+    with SessionLocal() as db:
+        first = cache.get(db)
+        now[0] = 59
+        assert cache.get(db) is first
+        now[0] = 61
+        assert cache.get(db) is not first
+
+
+def test_schedule_loaded_while_invalidated_is_not_kept(monkeypatch):
+    cache = ScheduleCache(ttl=60)
+    load = scheduling.load_schedule
+
+    def load_during_write(db):
+        # Una escritura de esta instancia termina mientras se lee la base
+        cache.invalidate()
+        return load(db)
+
+    with SessionLocal() as db:
+        monkeypatch.setattr(scheduling, "load_schedule", load_during_write)
+        stale = cache.get(db)
+        monkeypatch.setattr(scheduling, "load_schedule", load)
+        assert cache.get(db) is not stale
+
+
+def staffing_fixture(client, register_employee, label: str, developers: int, employees_req: int):
+    """Proyecto con una vacante por llenar (`employees_req`) y Developers nuevos sin asignar."""
+    manager = register_employee(last_name=label)
+    for _ in range(developers):
+        register_employee(role="Developer", last_name=label)
+    project = {"projectName": f"Asignacion {label}", "client": label, "description": "d", "startDate": "2031-03-01", "endDate": "2031-04-01", "employees_req": employees_req}
+    project_id = client.post("/projects", headers=manager, json=project).json()["project_id"]
+    with SessionLocal() as db:
+        role = ProjectRole(name=label, project_id=project_id)
+        db.add(role)
+        db.commit()
+        role_id = role.role_id
+    return manager, project_id, role_id
+
+
+def assigned(role_id: int) -> list[int]:
+    with SessionLocal() as db:
+        return [developer_id for (developer_id,) in db.query(RoleDeveloper.developer_id).filter(RoleDeveloper.project_role_id == role_id)]
+
+
+def test_auto_assign_plans_from_the_database_not_the_cache(client, register_employee):
+    manager, project_id, role_id = staffing_fixture(client, register_employee, "Vigente", developers=2, employees_req=1)
+    with SessionLocal() as db:
+        schedule_cache.get(db)
+        # Otra instancia cubre la vacante: este proceso no recibe la invalidación
+        developer_id = db.query(Employee.employee_id).filter(Employee.last_name_1 == "Vigente", Employee.role == "Developer").first()[0]
+        db.add(Developer(employee_id=developer_id))
+        db.add(RoleDeveloper(developer_id=developer_id, project_role_id=role_id))
+        db.commit()
+    response = client.post("/staffing/auto-assign", headers=manager, json={"project_ids": [project_id]})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"assigned": [], "unfilled": {}}
+    assert assigned(role_id) == [developer_id]
+
+
+@pytest.mark.anyio
+async def test_concurrent_auto_assign_fills_each_vacancy_once(client, register_employee):
+    manager, project_id, role_id = staffing_fixture(client, register_employee, "Carrera", developers=6, employees_req=2)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as async_client:
+        responses = await asyncio.gather(*[
+            async_client.post("/staffing/auto-assign", headers=manager, json={"project_ids": [project_id]}) for _ in range(4)
+        ])
+    assert [response.status_code for response in responses] == [200] * 4
+    assert sum(len(response.json()["assigned"]) for response in responses) == 2
+    developers = assigned(role_id)
+    assert len(developers) == len(set(developers)) == 2
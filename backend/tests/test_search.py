@@ -0,0 +1,67 @@
+import search
+from dependencies import SessionLocal
+from models import Employee
+
+
+def names(response) -> list[str]:
+    assert response.status_code == 200, response.text
+    return [item["last_name_1"] for item in response.json()["items"]]
+
+
+def employee_id(db, last_name: str) -> int:
+    return db.query(Employee.employee_id).filter(Employee.last_name_1 == last_name).scalar()
+
+
+def test_index_matches_token_prefixes(register_employee):
+    register_employee(name="Quiroga", last_name="Prefijolargo")
+    with SessionLocal() as db:
+        target = employee_id(db, "Prefijolargo")
+        ranked, prefix_only = search._employee_index.search(db, "prefijo")
+        assert target in ranked and target not in prefix_only
+        # Dos prefijos que no forman una subcadena del documento: solo el índice los encuentra
+        ranked, prefix_only = search._employee_index.search(db, "quir prefijol")
+        assert target in ranked and target in prefix_only
+        assert search._employee_index.search(db, "prefijolargox") == ([], [])
+
+
+def test_exact_tokens_rank_above_prefix_matches(client, register_employee):
+    manager = register_employee(last_name="Rankeadorextendido")
+    register_employee(last_name="Rankeador")
+    # Ambos coinciden por prefijo; el token exacto suma más puntos
+    assert names(client.get("/users?search=rankeador", headers=manager)) == ["Rankeador", "Rankeadorextendido"]
+
+
+def test_sqlite_fallback_finds_multi_token_prefixes(client, register_employee):
+    manager = register_employee(name="Filiberto", last_name="Respaldo")
+    with SessionLocal() as db:
+        assert db.get_bind().dialect.name == "sqlite"
+    assert names(client.get("/users?search=fili resp", headers=manager)) == ["Respaldo"]
+
+
+def test_employee_index_follows_writes(client, register_employee):
+    manager = register_employee(last_name="Antesdelcambio")
+    assert names(client.get("/users?search=antesdelcambio", headers=manager)) == ["Antesdelcambio"]
+    assert client.put("/profile/edit", headers=manager, json={"last_name_1": "Despuesdelcambio"}).status_code == 200
+    assert names(client.get("/users?search=antesdelcambio", headers=manager)) == []
+    assert names(client.get("/users?search=despuesdel", headers=manager)) == ["Despuesdelcambio"]
+
+    register_employee(last_name="Reciencreado")
+    assert names(client.get("/users?search=reciencre", headers=manager)) == ["Reciencreado"]
+
+
+def test_project_index_follows_create_update_and_delete(client, register_employee):
+    manager = register_employee()
+    project = {"projectName": "Indexado Uno", "client": "Cliente", "description": "d", "startDate": "2030-01-01", "endDate": "2030-06-01", "employees_req": 1}
+
+    def found(term: str) -> list[str]:
+        response = client.get("/projects", headers=manager, params={"search": term})
+        assert response.status_code == 200, response.text
+        return [item["projectName"] for item in response.json()["items"]]
+
+    project_id = client.post("/projects", headers=manager, json=project).json()["project_id"]
+    assert found("indexado un") == ["Indexado Uno"]
+    assert client.put(f"/projects/{project_id}", headers=manager, json={**project, "projectName": "Renombrado Dos"}).status_code == 200
+    assert found("indexado") == []
+    assert found("renombrado do") == ["Renombrado Dos"]
+    assert client.delete(f"/projects/{project_id}", headers=manager).status_code in (200, 204)
+    assert found("renombrado") == []
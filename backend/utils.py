@@ -3,21 +3,108 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from config import settings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
 import bcrypt
+import base64, json, time
+
+def _read_key(value: str | None, path: str | None) -> str | None:
+    if path:
+        with open(path) as key_file:
+            return key_file.read()
+    return value
+
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE_MINUTES = settings.REFRESH_TOKEN_EXPIRE_MINUTES
+# Con RS*/ES* se firma con la llave privada y basta la pública para verificar
+# (instancias de borde pueden verificar sin conocer el secreto)
+ASYMMETRIC = ALGORITHM[:2] in ("RS", "ES", "PS")
+SIGNING_KEY = _read_key(settings.JWT_PRIVATE_KEY, settings.JWT_PRIVATE_KEY_FILE) if ASYMMETRIC else SECRET_KEY
+VERIFYING_KEY = _read_key(settings.JWT_PUBLIC_KEY, settings.JWT_PUBLIC_KEY_FILE) if ASYMMETRIC else SECRET_KEY
 
-def create_access_token(data: dict):
+def _create_token(data: dict, token_type: str, minutes: int) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    expire = datetime.utcnow() + timedelta(minutes=minutes)
+    to_encode.update({"exp": expire, "type": token_type})
+    return jwt.encode(to_encode, SIGNING_KEY, algorithm=ALGORITHM)
 
-def verify_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+def create_access_token(data: dict):
+    return _create_token(data, "access", ACCESS_TOKEN_EXPIRE_MINUTES)
+
+def create_refresh_token(data: dict):
+    return _create_token(data, "refresh", REFRESH_TOKEN_EXPIRE_MINUTES)
+
+
+class TokenCache:
+    """LRU acotado de token verificado -> claims; una entrada vale hasta su `exp`."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.verifications = 0
+        self.verify_seconds_total = 0.0
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            payload = self._entries.get(token)
+            if payload is not None and payload["exp"] > time.time():
+                self._entries.move_to_end(token)
+                self.hits += 1
+                return payload
+            if payload is not None:
+                del self._entries[token]
+            self.misses += 1
+            return None
+
+    def peek(self, token: str) -> dict | None:
+        """Como get() pero sin contar aciertos ni fallos ni tocar el orden del LRU."""
+        with self._lock:
+            payload = self._entries.get(token)
+            if payload is not None and payload["exp"] > time.time():
+                return payload
+            return None
+
+    def put(self, token: str, payload: dict, seconds: float):
+        with self._lock:
+            self.verifications += 1
+            self.verify_seconds_total += seconds
+            if self.max_size <= 0 or "exp" not in payload:
+                return
+            self._entries[token] = payload
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "verifications": self.verifications,
+                "verify_seconds_total": round(self.verify_seconds_total, 6),
+                "verify_seconds_avg": round(self.verify_seconds_total / self.verifications, 6) if self.verifications else 0.0,
+            }
+
+token_cache = TokenCache(settings.JWT_CACHE_SIZE)
+
+
+def _decode_token(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is not None:
         return payload
+    start = time.perf_counter()
+    try:
+        payload = jwt.decode(token, VERIFYING_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -25,12 +112,105 @@ def verify_token(token: str):
             headers={"WWW-Authenticate": "Bearer"},
         
         )
+    token_cache.put(token, payload, time.perf_counter() - start)
+    return payload
+
+def verify_token(token: str):
+    payload = _decode_token(token)
+    # Los tokens emitidos antes de existir "type" son de acceso
+    if payload.get("type", "access") != "access":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+def verify_refresh_token(token: str):
+    payload = _decode_token(token)
+    if payload.get("type") != "refresh":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    return payload
+
+# bcrypt corre en un pool dedicado y acotado para no acaparar el threadpool de las rutas
+_password_executor = None
+_password_pending = 0
+_password_lock = Lock()
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _checkpw(password: bytes, hashed_password: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed_password)
+
+def _get_password_executor():
+    global _password_executor
+    if _password_executor is None:
+        if settings.BCRYPT_EXECUTOR == "process":
+            try:
+                _password_executor = ProcessPoolExecutor(max_workers=settings.BCRYPT_WORKERS)
+            except (OSError, NotImplementedError):
+                # Sin soporte de multiprocessing (p. ej. serverless): bcrypt libera el GIL
+                _password_executor = ThreadPoolExecutor(max_workers=settings.BCRYPT_WORKERS)
+        else:
+            _password_executor = ThreadPoolExecutor(max_workers=settings.BCRYPT_WORKERS)
+    return _password_executor
+
+def _run_password_job(fn, *args):
+    global _password_pending
+    if settings.BCRYPT_EXECUTOR == "inline":
+        return fn(*args)
+    with _password_lock:
+        if _password_pending >= settings.BCRYPT_MAX_PENDING:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        _password_pending += 1
+    try:
+        return _get_password_executor().submit(fn, *args).result()
+    finally:
+        with _password_lock:
+            _password_pending -= 1
+
+def shutdown_password_executor():
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
 
 def hash_password(password: str) -> bytes:
-    bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(bytes, salt)
-    return hashed
+    return _run_password_job(_hashpw, password.encode('utf-8'), settings.BCRYPT_ROUNDS)
+
+def hash_passwords(passwords: list[str]) -> list[bytes]:
+    """Hashea en el pool de contraseñas (importaciones masivas) en ventanas de BCRYPT_WORKERS:
+    un login que llega a mitad del lote espera a lo sumo una ventana, no el lote completo."""
+    args = [(password.encode('utf-8'), settings.BCRYPT_ROUNDS) for password in passwords]
+    if settings.BCRYPT_EXECUTOR == "inline":
+        return [_hashpw(*arg) for arg in args]
+    hashes = []
+    for start in range(0, len(args), settings.BCRYPT_WORKERS):
+        futures = [_get_password_executor().submit(_hashpw, *arg) for arg in args[start:start + settings.BCRYPT_WORKERS]]
+        hashes.extend(future.result() for future in futures)
+    return hashes
 
 def verify_password(plain_password: str, hashed_password: bytes) -> bool:
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password)
\ No newline at end of file
+    return _run_password_job(_checkpw, plain_password.encode('utf-8'), hashed_password)
+
+def password_needs_rehash(hashed_password: bytes) -> bool:
+    # Formato $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split(b"$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+def encode_cursor(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")